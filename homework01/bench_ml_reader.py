@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from ml_reader import read_meteorite_data
+
+CLASSES = ['L5', 'H6', 'EH4', 'Acapulcoite', 'L6', 'LL3-6', 'H5', 'L', 'Diogenite-pm', 'Stone-uncl']
+
+# Function to generate synthetic meteorite records with a fixed seed
+def generate_records(n_rows, seed=332):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n_rows):
+        lat = round(rng.uniform(-90, 90), 5)
+        lon = round(rng.uniform(-180, 180), 5)
+        records.append({
+            'name': f'Site{i}',
+            'id': str(10001 + i),
+            'recclass': rng.choice(CLASSES),
+            'mass (g)': str(round(rng.lognormvariate(6, 2), 2)),
+            'reclat': str(lat),
+            'reclong': str(lon),
+            'GeoLocation': f'({lat}, {lon})'
+        })
+    return records
+
+# Function to write the records in the layout each homework01 reader expects
+def write_dataset(records, directory):
+    paths = {}
+
+    paths['csv'] = os.path.join(directory, 'Meteorite_Landings.csv')
+    with open(paths['csv'], 'w', encoding='utf-8') as f:
+        f.write('name,id,recclass,mass (g),reclat,reclong,GeoLocation\n')
+        for item in records:
+            f.write(f"{item['name']},{item['id']},{item['recclass']},{item['mass (g)']},"
+                    f"{item['reclat']},{item['reclong']},\"{item['GeoLocation']}\"\n")
+
+    paths['json'] = os.path.join(directory, 'Meteorite_Landings.json')
+    with open(paths['json'], 'w', encoding='utf-8') as f:
+        json.dump({'meteorite_landings': records}, f, indent=2)
+
+    paths['xml'] = os.path.join(directory, 'Meteorite_Landings.xml')
+    with open(paths['xml'], 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<data>\n')
+        for item in records:
+            f.write(f"  <meteorite_landings><name>{item['name']}</name><id>{item['id']}</id>"
+                    f"<recclass>{item['recclass']}</recclass><mass_g>{item['mass (g)']}</mass_g>"
+                    f"<reclat>{item['reclat']}</reclat><reclong>{item['reclong']}</reclong>"
+                    f"<GeoLocation>{item['GeoLocation']}</GeoLocation></meteorite_landings>\n")
+        f.write('</data>\n')
+
+    paths['yaml'] = os.path.join(directory, 'Meteorite_Landings.yaml')
+    with open(paths['yaml'], 'w', encoding='utf-8') as f:
+        f.write('meteorite_landings:\n')
+        for item in records:
+            f.write(f"- name: {item['name']}\n  id: '{item['id']}'\n  recclass: {item['recclass']}\n"
+                    f"  mass (g): '{item['mass (g)']}'\n  reclat: '{item['reclat']}'\n"
+                    f"  reclong: '{item['reclong']}'\n  GeoLocation: '{item['GeoLocation']}'\n")
+
+    return paths
+
+# Function to time the best of several loads of one file
+def time_load(path, file_format, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        columns = read_meteorite_data(path, file_format)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(columns)
+
+# Main function to execute the benchmark
+def main():
+    parser = argparse.ArgumentParser(description='Compare load throughput of the meteorite readers per file format.')
+    parser.add_argument('--rows', type=int, default=100000, help='Number of synthetic records.')
+    parser.add_argument('--repeats', type=int, default=3, help='Loads per format; the best time is reported.')
+    parser.add_argument('--formats', nargs='+', default=['csv', 'json', 'xml', 'yaml'], help='Formats to benchmark.')
+    args = parser.parse_args()
+
+    records = generate_records(args.rows)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_dataset(records, directory)
+        print(f"{'format':<8}{'rows':>10}{'MB':>10}{'seconds':>10}{'rows/s':>14}{'MB/s':>10}")
+        for file_format in args.formats:
+            size_mb = os.path.getsize(paths[file_format]) / 1e6
+            seconds, rows = time_load(paths[file_format], file_format, args.repeats)
+            print(f'{file_format:<8}{rows:>10}{size_mb:>10.1f}{seconds:>10.3f}'
+                  f'{rows / seconds:>14,.0f}{size_mb / seconds:>10.1f}')
+
+# Check if the script is being run as the main module
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import csv
+import json
+import math
+import os
+import xml.etree.ElementTree as ET
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The XML files name the mass field 'mass_g'; every other format uses 'mass (g)'
+MASS_KEYS = ('mass (g)', 'mass_g')
+
+class MeteoriteColumns:
+    """
+    Meteorite data in typed columnar form, the common output of every reader.
+
+    Text fields are lists of strings (None when missing); mass, reclat and
+    reclong are float64 NumPy arrays with NaN for missing or invalid values.
+    """
+
+    def __init__(self, name, id, recclass, mass, reclat, reclong):
+        self.name = name
+        self.id = id
+        self.recclass = recclass
+        self.mass = np.asarray(mass, dtype=float)
+        self.reclat = np.asarray(reclat, dtype=float)
+        self.reclong = np.asarray(reclong, dtype=float)
+
+    def __len__(self):
+        return len(self.mass)
+
+# Function to convert a raw field to float, mapping missing or invalid values to NaN
+def to_float(value):
+    if value is None or value == '':
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+# Function to split a '(lat, long)' GeoLocation string into two floats
+def parse_geolocation(value):
+    if not value:
+        return math.nan, math.nan
+    parts = value.strip('()').split(',')
+    if len(parts) != 2:
+        return math.nan, math.nan
+    return to_float(parts[0]), to_float(parts[1])
+
+# Function to build columns from an iterable of record dictionaries
+def columns_from_records(records):
+    name, ids, recclass, mass, reclat, reclong = [], [], [], [], [], []
+    for item in records:
+        name.append(item.get('name'))
+        ids.append(item.get('id'))
+        recclass.append(item.get('recclass'))
+        mass.append(to_float(item.get('mass (g)', item.get('mass_g'))))
+        lat, lon = to_float(item.get('reclat')), to_float(item.get('reclong'))
+        if math.isnan(lat) or math.isnan(lon):
+            # Some files only carry the coordinates in the GeoLocation string
+            lat, lon = parse_geolocation(item.get('GeoLocation'))
+        reclat.append(lat)
+        reclong.append(lon)
+    return MeteoriteColumns(name, ids, recclass, mass, reclat, reclong)
+
+# Function to read a CSV file straight into columns with csv.reader
+def read_csv_columns(filename):
+    with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, [])
+        position = {key: i for i, key in enumerate(header)}
+        mass_key = next((key for key in MASS_KEYS if key in position), None)
+        if 'reclat' not in position or 'reclong' not in position:
+            # Fall back to the record path, which knows how to parse GeoLocation
+            return columns_from_records(dict(zip(header, row)) for row in reader)
+
+        def column(rows, key, convert=None):
+            if key not in position:
+                return [None] * len(rows)
+            i = position[key]
+            values = [row[i] if i < len(row) else None for row in rows]
+            return [convert(value) for value in values] if convert else values
+
+        rows = list(reader)
+        reclat, reclong = column(rows, 'reclat', to_float), column(rows, 'reclong', to_float)
+        if 'GeoLocation' in position:
+            # Same fallback as columns_from_records for rows without usable reclat/reclong
+            geolocations = column(rows, 'GeoLocation')
+            for i, (lat, lon) in enumerate(zip(reclat, reclong)):
+                if math.isnan(lat) or math.isnan(lon):
+                    reclat[i], reclong[i] = parse_geolocation(geolocations[i])
+        return MeteoriteColumns(column(rows, 'name'), column(rows, 'id'), column(rows, 'recclass'),
+                                column(rows, mass_key, to_float) if mass_key else [math.nan] * len(rows),
+                                reclat, reclong)
+
+# Function to read a JSON file with orjson when it is installed, else the C json decoder
+def read_json_columns(filename, array_key='meteorite_landings'):
+    with open(filename, 'rb') as f:
+        data = orjson.loads(f.read()) if orjson is not None else json.load(f)
+    records = data.get(array_key, []) if isinstance(data, dict) else data
+    return columns_from_records(records)
+
+# Function to read an XML file incrementally with ElementTree.iterparse
+def read_xml_columns(filename, record_tag='meteorite_landings'):
+    def records():
+        root = None
+        for event, elem in ET.iterparse(filename, events=('start', 'end')):
+            if root is None:
+                root = elem
+            if event == 'end' and elem.tag == record_tag:
+                yield {child.tag: child.text for child in elem}
+                root.clear()
+    return columns_from_records(records())
+
+# Function to read a YAML file with PyYAML's C loader when it is available
+def read_yaml_columns(filename, array_key='meteorite_landings'):
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(filename, 'r', encoding='utf-8') as yamlfile:
+        data = yaml.load(yamlfile, Loader=loader)
+    records = data.get(array_key, []) if isinstance(data, dict) else (data or [])
+    return columns_from_records(records)
+
+READERS = {
+    'csv': read_csv_columns,
+    'json': read_json_columns,
+    'xml': read_xml_columns,
+    'yaml': read_yaml_columns,
+}
+
+# Function to work out the format of a file from its extension, or from its first bytes
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    if extension == 'yml':
+        extension = 'yaml'
+    if extension in READERS:
+        return extension
+
+    with open(filename, 'rb') as f:
+        head = f.read(4096).lstrip()
+    if head.startswith((b'{', b'[')):
+        return 'json'
+    if head.startswith(b'<'):
+        return 'xml'
+    first_line = head.split(b'\n', 1)[0]
+    if b':' in first_line and not first_line.count(b','):
+        return 'yaml'
+    return 'csv'
+
+# Function to read meteorite data in any supported format into columns
+def read_meteorite_data(filename, file_format=None):
+    file_format = file_format or detect_format(filename)
+    if file_format not in READERS:
+        raise ValueError(f'Unsupported file format {file_format}. Use one of: {", ".join(READERS)}.')
+    return READERS[file_format](filename)
+
+# Function to compute the average mass, ignoring missing values
+def compute_average_mass(columns):
+    masses = columns.mass[~np.isnan(columns.mass)]
+    return float(masses.mean()) if len(masses) else 0
+
+# Function to determine the hemisphere and location based on latitude and longitude
+def check_hemisphere(latitude, longitude):
+    location = 'Northern' if (latitude > 0) else 'Southern'
+    location = f'{location} & Eastern' if (longitude > 0) else f'{location} & Western'
+    return location
+
+# Hemisphere labels indexed by the quadrant codes of hemisphere_codes()
+HEMISPHERES = ['Northern & Eastern', 'Southern & Eastern', 'Northern & Western', 'Southern & Western']
+
+# Function to classify whole coordinate arrays into integer quadrant codes (same rule as check_hemisphere)
+def hemisphere_codes(latitudes, longitudes):
+    return (latitudes <= 0).view(np.uint8) + 2 * (longitudes <= 0).view(np.uint8)
+
+# Function to count how many sites fall in each hemisphere and pair of hemispheres; labels are applied only to the totals
+def compute_hemisphere_statistics(columns):
+    latitudes, longitudes = valid_coordinates(columns)
+    counts = np.bincount(hemisphere_codes(latitudes, longitudes), minlength=len(HEMISPHERES)).tolist()
+    northern_eastern, southern_eastern, northern_western, southern_western = counts
+    statistics = {'Northern': northern_eastern + northern_western, 'Southern': southern_eastern + southern_western}
+    statistics.update(zip(HEMISPHERES, counts))
+    return statistics
+
+# Function to count occurrences of each value in a text column
+def count_occurrences(values):
+    results = {}
+    for value in values:
+        results[value] = results.get(value, 0) + 1
+    return results
+
+# Function to return the latitudes and longitudes of the rows with valid coordinates
+def valid_coordinates(columns):
+    valid = ~(np.isnan(columns.reclat) | np.isnan(columns.reclong))
+    return columns.reclat[valid], columns.reclong[valid]
+
+# Function to compute the geolocation range (latitude and longitude)
+def compute_geolocation_range(columns):
+    latitudes, longitudes = valid_coordinates(columns)
+    if not len(latitudes):
+        return {'latitude_range': (0, 0), 'longitude_range': (0, 0)}
+    return {
+        'latitude_range': (float(latitudes.min()), float(latitudes.max())),
+        'longitude_range': (float(longitudes.min()), float(longitudes.max()))
+    }
+
+# Function to compute the geographical standard deviation
+def compute_geographical_std_deviation(columns):
+    latitudes, longitudes = valid_coordinates(columns)
+    if not len(latitudes):
+        return 0
+    deviation_sum = ((latitudes - latitudes.mean())**2 + (longitudes - longitudes.mean())**2).sum()
+    return math.sqrt(deviation_sum / len(latitudes))
+
+# Function to compute every summary statistic of the columns
+def compute_summary_statistics(columns):
+    return {
+        'average_mass': compute_average_mass(columns),
+        'hemisphere_statistics': compute_hemisphere_statistics(columns),
+        'geolocation_range': compute_geolocation_range(columns),
+        'geographical_std_deviation': compute_geographical_std_deviation(columns),
+        'recclass_occurrences': count_occurrences(columns.recclass)
+    }
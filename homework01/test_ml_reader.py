@@ -0,0 +1,43 @@
+from ml_reader import read_meteorite_data, compute_summary_statistics, detect_format
+from bench_ml_reader import generate_records, write_dataset
+import numpy as np
+import pytest
+
+FORMATS = ['csv', 'json', 'xml', 'yaml']
+
+@pytest.fixture
+def paths(tmp_path):
+    records = generate_records(200, seed=5)
+    for item in records[::7]:
+        # Coordinates only in the GeoLocation string
+        item['reclat'] = ''
+    for item in records[3::11]:
+        item['reclong'] = 'n/a'
+    for item in records[5::13]:
+        item['reclat'] = item['reclong'] = item['GeoLocation'] = ''
+    for item in records[2::17]:
+        item['mass (g)'] = 'unknown'
+    return write_dataset(records, str(tmp_path))
+
+def test_every_format_gives_the_same_columns(paths):
+    expected = read_meteorite_data(paths['json'])
+    assert len(expected) == 200
+    assert np.isnan(expected.reclat).sum() == len(range(5, 200, 13))
+    for file_format in FORMATS:
+        columns = read_meteorite_data(paths[file_format])
+        assert columns.name == expected.name and columns.recclass == expected.recclass
+        for field in ('mass', 'reclat', 'reclong'):
+            assert np.array_equal(getattr(columns, field), getattr(expected, field), equal_nan=True), (file_format, field)
+
+def test_every_format_gives_the_same_statistics(paths):
+    expected = compute_summary_statistics(read_meteorite_data(paths['json']))
+    hemispheres = expected['hemisphere_statistics']
+    assert hemispheres['Northern'] + hemispheres['Southern'] == sum(list(hemispheres.values())[2:])
+    for file_format in FORMATS:
+        assert compute_summary_statistics(read_meteorite_data(paths[file_format])) == expected
+
+def test_detect_format(paths):
+    for file_format in FORMATS:
+        assert detect_format(paths[file_format]) == file_format
+    with pytest.raises(ValueError):
+        read_meteorite_data(paths['csv'], 'parquet')
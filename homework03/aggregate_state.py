@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+import csv
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Iterator, List, Optional
+from aggregates import LandingAggregate
+from filters import RecordFilter
+from ml_data_analysis import iter_data_file
+
+# Bump when the state layout changes so that old state files are rejected
+STATE_VERSION = 2
+# Bytes before a CSV resume offset that are hashed to detect rewritten files
+TAIL_BYTES = 1 << 16
+
+def _tail_digest(filename: str, offset: int) -> str:
+    """SHA-256 of the TAIL_BYTES bytes before offset."""
+    with open(filename, 'rb') as f:
+        f.seek(max(offset - TAIL_BYTES, 0))
+        return hashlib.sha256(f.read(offset - f.tell())).hexdigest()
+
+def _file_digest(filename: str) -> str:
+    """SHA-256 of a whole file (dataset_cache needs numpy, so it is imported only here)."""
+    from dataset_cache import file_digest
+    return file_digest(filename)
+
+def _ends_line(filename: str, offset: int) -> bool:
+    """Whether the byte before offset ends a line (or offset is the start of the file)."""
+    if not offset:
+        return True
+    with open(filename, 'rb') as f:
+        f.seek(offset - 1)
+        return f.read(1) == b'\n'
+
+def _iter_csv_from(filename: str, source: dict, where: Optional[RecordFilter]) -> Iterator[dict]:
+    """
+    Stream the CSV records after source['offset'] (the header is read when
+    starting from 0), updating source['offset'] and source['header'] as rows
+    are consumed so that the next update resumes after the last one.
+    """
+    position = [source['offset']]
+
+    def lines(f):
+        for line in f:
+            position[0] += len(line)
+            yield line.decode('utf-8')
+
+    with open(filename, 'rb') as f:
+        f.seek(source['offset'])
+        reader = csv.reader(lines(f))
+        if not source.get('header'):
+            source['header'] = next(reader, [])
+            source['offset'] = position[0]
+        header = source['header']
+        matches = where.row_matcher(header) if where is not None else None
+        for row in reader:
+            source['offset'] = position[0]
+            if row and (matches is None or matches(row)):
+                yield dict(zip(header, row))
+
+class AggregateState:
+    """
+    A LandingAggregate saved between runs together with the data files folded
+    into it, so that each update only reads what is new: files never seen
+    before are folded in whole, unchanged files are skipped, and CSV files
+    that grew by appended rows are read from where the last update stopped.
+    Any other change to a folded file would count its records twice, so it is
+    reported as an error instead.
+    """
+
+    def __init__(self, aggregate: LandingAggregate, filters: Optional[List[str]] = None):
+        """
+        Args:
+            aggregate (LandingAggregate): Aggregate of the records folded so far.
+            filters (List[str]): Filter expressions every folded record passed.
+        """
+        self.aggregate = aggregate
+        self.filters = list(filters or [])
+        # Absolute path -> size, modification time and either the content digest or, for CSV,
+        # the resume offset with a digest of the bytes before it
+        self.sources = {}
+
+    @classmethod
+    def load(cls, path: str) -> 'AggregateState':
+        """
+        Load a state file written by save().
+
+        Raises:
+            FileNotFoundError: If the state file does not exist.
+            ValueError: If it was written by an incompatible version.
+        """
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('version') != STATE_VERSION:
+            raise ValueError(f'{path} holds aggregate state version {saved.get("version")}, expected {STATE_VERSION}.')
+        state = cls(LandingAggregate.from_dict(saved['aggregate']), saved['filters'])
+        state.sources = saved['sources']
+        return state
+
+    @classmethod
+    def load_or_create(cls, path: str, class_capacity: Optional[int] = None, quantile_k: Optional[int] = 200,
+                       filters: Optional[List[str]] = None) -> 'AggregateState':
+        """
+        Load the state at path, or start an empty one with the given settings
+        if there is none yet. The filters of an existing state cannot change.
+
+        Args:
+            path (str): State file.
+            class_capacity (int): Class counters of a new state (None counts exactly).
+            quantile_k (int): Mass quantile sketch size of a new state (None is exact).
+            filters (List[str]): Filter expressions (None keeps those of an existing state).
+        """
+        try:
+            state = cls.load(path)
+        except FileNotFoundError:
+            return cls(LandingAggregate(class_capacity=class_capacity, quantile_k=quantile_k), filters)
+        if filters is not None and list(filters) != state.filters:
+            raise ValueError(f'{path} was built with filters {state.filters}; start a new state to change them.')
+        return state
+
+    def save(self, path: str) -> None:
+        """Write the state to path atomically, so an interrupted save keeps the previous state."""
+        saved = {'version': STATE_VERSION, 'filters': self.filters, 'sources': self.sources,
+                 'aggregate': self.aggregate.to_dict()}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def update(self, filenames: List[str]) -> int:
+        """
+        Fold the new records of the data files into the aggregate.
+
+        Args:
+            filenames (List[str]): CSV, JSON, XML or YAML files.
+
+        Returns:
+            int: Number of records folded in.
+
+        Raises:
+            ValueError: If a file folded in before changed other than by
+                        appending rows to a CSV file.
+        """
+        where = RecordFilter.parse(self.filters)
+        before = self.aggregate.count
+        for filename in filenames:
+            key = os.path.abspath(filename)
+            stat = os.stat(filename)
+            known = self.sources.get(key)
+            is_csv = filename.lower().endswith('.csv')
+            if known is not None and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                logging.info(f'{filename} is unchanged.')
+                continue
+            # Only the modification time changed (e.g. touched or copied): compare the contents
+            if known is not None and known['size'] == stat.st_size and (
+                    _tail_digest(filename, known['offset']) == known['tail_sha256'] if is_csv
+                    else _file_digest(filename) == known.get('sha256')):
+                logging.info(f'{filename} has a new modification time but the same contents; it is unchanged.')
+                known['mtime_ns'] = stat.st_mtime_ns
+                continue
+
+            if known is not None and not (is_csv and stat.st_size > known['size']
+                                          and _ends_line(filename, known['offset'])
+                                          and _tail_digest(filename, known['offset']) == known['tail_sha256']):
+                raise ValueError(f'{filename} changed since it was folded into the state; only rows appended '
+                                 f'to a CSV file can be folded in. Rebuild the state to include the change.')
+
+            count = self.aggregate.count
+            if is_csv:
+                source = dict(known) if known is not None else {'offset': 0, 'header': None}
+                self.aggregate.update(_iter_csv_from(filename, source, where))
+                # Rows appended while reading are picked up by the next update
+                source.update(size=source['offset'], mtime_ns=os.stat(filename).st_mtime_ns,
+                              tail_sha256=_tail_digest(filename, source['offset']))
+            else:
+                source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _file_digest(filename)}
+                self.aggregate.update(iter_data_file(filename, where=where))
+            self.sources[key] = source
+            logging.info(f'Folded {self.aggregate.count - count} records of {filename} into the state.')
+        return self.aggregate.count - before
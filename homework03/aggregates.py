@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+import logging
+from collections import Counter
+from math import isfinite, sqrt
+from typing import Iterable, Optional
+from sketches import ExactQuantiles, KLLSketch, SpaceSaving
+
+# Mass quantiles reported in the summary, by summary key
+MASS_QUANTILES = {'median_mass': 0.5, 'p90_mass': 0.9, 'p99_mass': 0.99}
+# Hemisphere labels indexed by the quadrant codes of hemisphere_codes()
+HEMISPHERES = ['Northern & Eastern', 'Southern & Eastern', 'Northern & Western', 'Southern & Western']
+
+def check_hemisphere(latitude: float, longitude: float) -> str:
+    """
+    Given latitude and longitude in decimal notation, returns which hemispheres
+    those coordinates land in.
+
+    Args:
+        latitude (float): Latitude in decimal notation.
+        longitude (float): Longitude in decimal notation.
+
+    Returns:
+        location (string): Short string listing two hemispheres.
+    """
+    location = 'Northern' if (latitude > 0) else 'Southern'
+    location = f'{location} & Eastern' if (longitude > 0) else f'{location} & Western'
+    return location
+
+def usable_float(value, key: str) -> Optional[float]:
+    """
+    A record value as a finite float, or None when it is missing, empty, not
+    a number or not finite (NaN or infinite). Only text that is not a number
+    is logged.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        logging.warning(f"Invalid value for key '{key}': {value}")
+        return None
+    return number if isfinite(number) else None
+
+def hemisphere_code(latitude: float, longitude: float) -> int:
+    """Quadrant code (index into HEMISPHERES) of one pair of coordinates."""
+    return (latitude <= 0) + 2 * (longitude <= 0)
+
+def hemisphere_codes(latitudes, longitudes):
+    """
+    Vectorized hemisphere classification: the same rule as check_hemisphere,
+    as integer quadrant codes instead of labels. Labels are only needed for
+    output (HEMISPHERES[code]), so whole arrays are classified without a
+    Python loop or string formatting per row.
+
+    Args:
+        latitudes (array-like): Latitudes in decimal notation (no NaN).
+        longitudes (array-like): Longitudes in decimal notation (no NaN).
+
+    Returns:
+        np.ndarray: Codes 0-3 indexing HEMISPHERES.
+    """
+    import numpy as np
+
+    codes = (np.asarray(latitudes) <= 0).view(np.uint8)
+    return codes + 2 * (np.asarray(longitudes) <= 0).view(np.uint8)
+
+def count_hemispheres(latitudes, longitudes) -> list:
+    """
+    Number of sites in each hemisphere pair, in HEMISPHERES order.
+
+    Args:
+        latitudes (array-like): Latitudes in decimal notation (no NaN).
+        longitudes (array-like): Longitudes in decimal notation (no NaN).
+
+    Returns:
+        list: Four counts indexed by quadrant code.
+    """
+    import numpy as np
+
+    return np.bincount(hemisphere_codes(latitudes, longitudes), minlength=len(HEMISPHERES)).tolist()
+
+class RunningMoments:
+    """
+    Count, mean, variance and extrema of a stream of numbers, kept with
+    Welford's update so that partial results from different shards can be
+    merged exactly (Chan et al.'s parallel formula).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float) -> None:
+        """Fold one value into the moments."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def add_array(self, values) -> None:
+        """Fold an array of values into the moments, ignoring NaN."""
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        batch = RunningMoments()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """Fold the moments of another stream into these ones and return self."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def sum(self) -> float:
+        return self.mean * self.count
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state of the moments."""
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'RunningMoments':
+        """Rebuild moments saved with to_dict."""
+        moments = cls()
+        moments.count, moments.mean, moments.m2 = state['count'], state['mean'], state['m2']
+        moments.min, moments.max = state['min'], state['max']
+        return moments
+
+    @property
+    def variance(self) -> float:
+        """Population variance (0.0 for an empty stream)."""
+        return self.m2 / self.count if self.count else 0.0
+
+class LandingAggregate:
+    """
+    Mergeable summary statistics of meteorite landing records.
+
+    Every field can be combined with the same field of another aggregate, so
+    each shard of a dataset can be summarized independently (e.g. in a worker
+    process) and the partial aggregates reduced into one summary with merge().
+
+    Classes are counted exactly by default. With class_capacity set they are
+    counted approximately with a Space-Saving summary of that many counters,
+    which bounds memory on data with very many distinct (e.g. misspelled)
+    classes and reports an error bound for every count.
+
+    Mass quantiles (median, p90, p99) come from a KLL sketch of quantile_k
+    values, which is exact until the first compaction. quantile_k=None keeps
+    every mass for exact quantiles instead, for small inputs or for checking
+    the sketch.
+
+    Records without a usable mass or pair of coordinates (missing, empty, not
+    a number, NaN or infinite) are counted as invalid and left out of the
+    statistics, the same way for records (add) and typed columns (add_columns).
+    """
+
+    def __init__(self, mass_key: str = 'mass (g)', class_key: str = 'recclass',
+                 class_capacity: Optional[int] = None, quantile_k: Optional[int] = 200):
+        """
+        Args:
+            mass_key (str): Key holding the mass value.
+            class_key (str): Key holding the meteorite class.
+            class_capacity (int): Number of Space-Saving counters for the class
+                                  counts; None counts classes exactly.
+            quantile_k (int): Accuracy parameter of the mass quantile sketch;
+                              None computes exact quantiles.
+        """
+        self.mass_key = mass_key
+        self.class_key = class_key
+        self.class_capacity = class_capacity
+        self.quantile_k = quantile_k
+        self.count = 0
+        self.invalid_mass = 0
+        self.invalid_coordinates = 0
+        self.mass = RunningMoments()
+        self.mass_quantiles = ExactQuantiles() if quantile_k is None else KLLSketch(quantile_k)
+        self.latitude = RunningMoments()
+        self.longitude = RunningMoments()
+        # Site counts indexed by quadrant code; labelled only in summary()
+        self.hemispheres = [0] * len(HEMISPHERES)
+        self.classes = Counter() if class_capacity is None else SpaceSaving(class_capacity)
+
+    def add(self, item: dict) -> None:
+        """
+        Fold one landing record into the aggregate.
+
+        Args:
+            item (dict): Landing record.
+        """
+        self.count += 1
+
+        mass = usable_float(item.get(self.mass_key), self.mass_key)
+        if mass is None:
+            self.invalid_mass += 1
+        else:
+            self.mass.add(mass)
+            self.mass_quantiles.add(mass)
+
+        lat, lon = usable_float(item.get('reclat'), 'reclat'), usable_float(item.get('reclong'), 'reclong')
+        if lat is None or lon is None:
+            self.invalid_coordinates += 1
+        else:
+            self.latitude.add(lat)
+            self.longitude.add(lon)
+            self.hemispheres[hemisphere_code(lat, lon)] += 1
+
+        recclass = item.get(self.class_key)
+        if recclass is not None and recclass != '':
+            self._count_class(recclass)
+
+    def _count_class(self, recclass: str, count: int = 1) -> None:
+        if self.class_capacity is None:
+            self.classes[recclass] += count
+        else:
+            self.classes.add(recclass, count)
+
+    def add_columns(self, columns: dict) -> 'LandingAggregate':
+        """
+        Fold a batch of records held as typed columns (see
+        dataset_cache.parse_landing_columns) into the aggregate and return self.
+        Missing values are NaN in the float columns and '' in recclass. As in
+        add(), non-finite values are skipped and counted as invalid.
+
+        Args:
+            columns (dict): Arrays 'mass', 'reclat', 'reclong' and 'recclass'.
+        """
+        import numpy as np
+
+        lats = np.asarray(columns['reclat'], dtype=float)
+        lons = np.asarray(columns['reclong'], dtype=float)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        lats, lons = lats[valid], lons[valid]
+
+        self.count += len(columns['mass'])
+        masses = np.asarray(columns['mass'], dtype=float)
+        masses = masses[np.isfinite(masses)]
+        self.invalid_mass += len(columns['mass']) - len(masses)
+        self.invalid_coordinates += len(valid) - len(lats)
+        self.mass.add_array(masses)
+        self.mass_quantiles.add_array(masses.tolist())
+        self.latitude.add_array(lats)
+        self.longitude.add_array(lons)
+        for code, count in enumerate(count_hemispheres(lats, lons)):
+            self.hemispheres[code] += count
+        classes, counts = np.unique(np.asarray(columns['recclass']), return_counts=True)
+        for recclass, count in zip(classes.tolist(), counts.tolist()):
+            if recclass != '':
+                self._count_class(recclass, count)
+        return self
+
+    def update(self, items: Iterable[dict]) -> 'LandingAggregate':
+        """Fold a list (or stream) of landing records into the aggregate and return self."""
+        for item in items:
+            self.add(item)
+        return self
+
+    def merge(self, other: 'LandingAggregate') -> 'LandingAggregate':
+        """
+        Fold another aggregate into this one and return self.
+
+        Args:
+            other (LandingAggregate): Aggregate of another part of the data.
+        """
+        if (self.class_capacity is None) != (other.class_capacity is None):
+            raise ValueError('Cannot merge exact and approximate class counts.')
+        if (self.quantile_k is None) != (other.quantile_k is None):
+            raise ValueError('Cannot merge exact and approximate mass quantiles.')
+        self.count += other.count
+        self.invalid_mass += other.invalid_mass
+        self.invalid_coordinates += other.invalid_coordinates
+        self.mass.merge(other.mass)
+        self.mass_quantiles.merge(other.mass_quantiles)
+        self.latitude.merge(other.latitude)
+        self.longitude.merge(other.longitude)
+        for code, count in enumerate(other.hemispheres):
+            self.hemispheres[code] += count
+        if self.class_capacity is None:
+            self.classes.update(other.classes)
+        else:
+            self.classes.merge(other.classes)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serializable state of the aggregate: every counter, moment and
+        sketch, so that an aggregate can be saved, restored with from_dict and
+        extended with new records as if it had never been saved.
+        """
+        return {
+            'mass_key': self.mass_key,
+            'class_key': self.class_key,
+            'class_capacity': self.class_capacity,
+            'quantile_k': self.quantile_k,
+            'count': self.count,
+            'invalid_mass': self.invalid_mass,
+            'invalid_coordinates': self.invalid_coordinates,
+            'mass': self.mass.to_dict(),
+            'mass_quantiles': self.mass_quantiles.to_dict(),
+            'latitude': self.latitude.to_dict(),
+            'longitude': self.longitude.to_dict(),
+            'hemispheres': list(self.hemispheres),
+            'classes': dict(self.classes) if self.class_capacity is None else self.classes.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'LandingAggregate':
+        """Rebuild an aggregate saved with to_dict."""
+        aggregate = cls(state['mass_key'], state['class_key'], state['class_capacity'], state['quantile_k'])
+        aggregate.count = state['count']
+        aggregate.invalid_mass = state['invalid_mass']
+        aggregate.invalid_coordinates = state['invalid_coordinates']
+        aggregate.mass = RunningMoments.from_dict(state['mass'])
+        quantiles = ExactQuantiles if state['quantile_k'] is None else KLLSketch
+        aggregate.mass_quantiles = quantiles.from_dict(state['mass_quantiles'])
+        aggregate.latitude = RunningMoments.from_dict(state['latitude'])
+        aggregate.longitude = RunningMoments.from_dict(state['longitude'])
+        aggregate.hemispheres = list(state['hemispheres'])
+        if state['class_capacity'] is None:
+            aggregate.classes = Counter(state['classes'])
+        else:
+            aggregate.classes = SpaceSaving.from_dict(state['classes'])
+        return aggregate
+
+    def summary(self) -> dict:
+        """
+        Report the aggregate as a dictionary of summary statistics, using the
+        same names as the homework01 reader scripts where they overlap.
+
+        With approximate class counts, 'recclass_occurrences' holds the
+        estimated counts of the tracked classes and the summary adds
+        'recclass_error_bounds' (per class) and 'recclass_max_error' (bound on
+        any class not listed). Mass quantiles are nearest-rank values, exact
+        when 'mass_quantiles_exact' is True.
+
+        Returns:
+            summary (dict): Summary statistics.
+        """
+        summary = {
+            'count': self.count,
+            'invalid_mass_values': self.invalid_mass,
+            'invalid_coordinates': self.invalid_coordinates,
+            'max_mass': self.mass.max if self.mass.count else 0.0,
+            'min_mass': self.mass.min if self.mass.count else 0.0,
+            'average_mass': self.mass.mean,
+            'mass_std_deviation': sqrt(self.mass.variance),
+            'mass_quantiles_exact': self.quantile_k is None or self.mass_quantiles.is_exact,
+            'avg_latitude': self.latitude.mean,
+            'avg_longitude': self.longitude.mean,
+            'geolocation_range': {
+                'latitude_range': (self.latitude.min, self.latitude.max) if self.latitude.count else (0, 0),
+                'longitude_range': (self.longitude.min, self.longitude.max) if self.longitude.count else (0, 0),
+            },
+            'geographical_std_deviation': sqrt(self.latitude.variance + self.longitude.variance),
+            'hemisphere_statistics': dict(zip(HEMISPHERES, self.hemispheres)),
+        }
+        quantiles = self.mass_quantiles.quantiles(MASS_QUANTILES.values()) or [0.0] * len(MASS_QUANTILES)
+        summary.update(zip(MASS_QUANTILES, quantiles))
+        if self.class_capacity is None:
+            summary['recclass_occurrences'] = dict(self.classes.most_common())
+        else:
+            top = self.classes.top()
+            summary['recclass_occurrences'] = {recclass: count for recclass, count, _ in top}
+            summary['recclass_error_bounds'] = {recclass: error for recclass, _, error in top}
+            summary['recclass_max_error'] = self.classes.max_error
+        return summary
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+# The plot stages run without a display
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from generate_landings import FORMATS, parse_dirty_rates, write_dataset
+
+# Stages timed by the benchmark, each on a stream of the whole file
+STAGES = ['read', 'max_mass', 'min_mass', 'avg_lat_lon', 'summary', 'columns', 'parallel_columns', 'density',
+          'scatter']
+# The scatter plot keeps every point in matplotlib, so it is skipped above this size
+SCATTER_MAX_ROWS = 1000000
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+def run_stage(stage: str, path: str, workdir: str) -> dict:
+    """
+    Run one benchmark stage on a data file and measure it. Meant to run in a
+    fresh process so that the peak RSS belongs to this stage alone.
+
+    Args:
+        stage (str): One of STAGES.
+        path (str): Data file.
+        workdir (str): Directory the plots are written to.
+
+    Returns:
+        dict: 'seconds' of wall time and 'peak_rss_mb'.
+    """
+    import ml_data_analysis as mda
+    from dataset_cache import load_landing_columns, parse_landing_columns
+
+    os.chdir(workdir)
+    start = time.perf_counter()
+    if stage == 'read':
+        for _ in mda.iter_data_file(path):
+            pass
+    elif stage == 'max_mass':
+        mda.calculate_max_mass(mda.iter_data_file(path), 'mass (g)')
+    elif stage == 'min_mass':
+        mda.calculate_min_mass(mda.iter_data_file(path), 'mass (g)')
+    elif stage == 'avg_lat_lon':
+        mda.calculate_avg_latitude_longitude(mda.iter_data_file(path))
+    elif stage == 'summary':
+        mda.summarize_landings(mda.iter_data_file(path))
+    elif stage == 'columns':
+        mda.summarize_columns(parse_landing_columns(mda.iter_data_file(path)))
+    elif stage == 'parallel_columns':
+        # CSV files are split into byte ranges parsed by all cores; other formats are parsed serially
+        load_landing_columns(path)
+    elif stage == 'density':
+        grid = mda.compute_density_grid(mda.iter_data_file(path))
+        mda.plot_landing_density(grid, output=os.path.join(workdir, 'meteorite_landing_density.png'))
+    elif stage == 'scatter':
+        mda.plot_landing_sites(mda.iter_data_file(path), show=False)
+    else:
+        raise ValueError(f'Unknown stage {stage!r}; use one of {", ".join(STAGES)}.')
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}
+
+def run_benchmark(sizes: List[int], formats: List[str], stages: List[str], output: Optional[str] = None,
+                  seed: int = 332, dirty: float = 0.0, data_dir: Optional[str] = None) -> List[dict]:
+    """
+    Time every stage on synthetic datasets of every size and format. Each
+    stage runs in its own process, and results are appended to `output` as
+    JSON lines as soon as they are measured, so an interrupted run keeps its
+    results and runs on different commits can be compared.
+
+    Args:
+        sizes (List[int]): Numbers of rows.
+        formats (List[str]): File formats (see generate_landings.FORMATS).
+        stages (List[str]): Stages to time (see STAGES).
+        output (str): JSON lines results file (None to skip writing).
+        seed (int): Seed of the generated data.
+        dirty (float): Rate of every kind of dirty value in the data.
+        data_dir (str): Directory the datasets are written to (default: a
+                        temporary directory removed afterwards).
+
+    Returns:
+        List[dict]: One result per (size, format, stage).
+    """
+    results = []
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as workdir:
+        data_dir = data_dir or workdir
+        for n_rows in sizes:
+            for file_format in formats:
+                path = os.path.join(data_dir, f'landings_{n_rows}.{file_format}')
+                if not os.path.exists(path):
+                    write_dataset(path, n_rows, seed, parse_dirty_rates(dirty), file_format)
+                file_mb = os.path.getsize(path) / 1e6
+                for stage in stages:
+                    if stage == 'scatter' and n_rows > SCATTER_MAX_ROWS:
+                        continue
+                    # A fresh process per stage keeps peak RSS from leaking between stages
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+                        measured = pool.submit(run_stage, stage, path, workdir).result()
+                    result = {
+                        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'stage': stage,
+                        'format': file_format,
+                        'rows': n_rows,
+                        'file_mb': round(file_mb, 3),
+                        'seconds': round(measured['seconds'], 4),
+                        'rows_per_second': round(n_rows / measured['seconds']) if measured['seconds'] else None,
+                        'peak_rss_mb': round(measured['peak_rss_mb'], 1),
+                        'python': platform.python_version(),
+                    }
+                    results.append(result)
+                    if output:
+                        with open(output, 'a', encoding='utf-8') as f:
+                            f.write(json.dumps(result) + '\n')
+                    print_result(result)
+    return results
+
+def print_result(result: dict) -> None:
+    """Print one result as a table row."""
+    print(f"{result['stage']:<18}{result['format']:<6}{result['rows']:>11}{result['file_mb']:>10.1f}"
+          f"{result['seconds']:>10.3f}{result['rows_per_second'] or 0:>14,}{result['peak_rss_mb']:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the ml_data_analysis stages on synthetic data of growing size.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help='Numbers of rows.')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS), help='File formats.')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='Stages to time.')
+    parser.add_argument('--output', default='bench_results.jsonl', help='JSON lines file the results are appended to.')
+    parser.add_argument('--seed', type=int, default=332, help='Seed of the generated data.')
+    parser.add_argument('--dirty', type=float, default=0.0, metavar='RATE',
+                        help='Rate of every kind of dirty value in the data.')
+    parser.add_argument('--data-dir', help='Keep the generated datasets in this directory and reuse them.')
+    args = parser.parse_args()
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+    print(f"{'stage':<18}{'fmt':<6}{'rows':>11}{'MB':>10}{'seconds':>10}{'rows/s':>14}{'RSS MB':>10}")
+    run_benchmark(args.sizes, args.formats, args.stages, args.output, args.seed, args.dirty, args.data_dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+from collections import Counter
+from typing import List, Optional
+import numpy as np
+from great_circle_distance import great_circle_distance_pairs
+from spatial_index import LandingSiteIndex, lat_lon_to_unit_vectors, neighbour_counts
+
+NOISE = -1
+
+def dbscan(index: LandingSiteIndex, eps_km: float, min_samples: int = 5,
+           workers: Optional[int] = None, batch_size: int = 4096) -> np.ndarray:
+    """
+    DBSCAN clustering of landing sites on great-circle distance, e.g. to find
+    strewn fields. A site with at least min_samples sites (itself included)
+    within eps_km is a core site; clusters are the groups of core sites
+    connected through such neighbourhoods plus the non-core sites within
+    eps_km of one of them. Everything else is noise.
+
+    Neighbourhoods come from batched radius queries on the spatial index
+    instead of comparing every pair of sites: a first pass counts the
+    neighbours of every site (in parallel over worker processes), then each
+    cluster is grown breadth-first, querying every core site once.
+
+    Args:
+        index (LandingSiteIndex): Index of the landing sites.
+        eps_km (float): Neighbourhood radius in kilometers.
+        min_samples (int): Minimum neighbourhood size of a core site.
+        workers (int): Worker processes for the counting pass (defaults to
+                       the CPU count; 1 runs in the current process).
+        batch_size (int): Number of sites queried together while growing a
+                          cluster.
+
+    Returns:
+        np.ndarray: Cluster label of every site position (0, 1, ... in order
+                    of discovery; NOISE for noise).
+    """
+    if eps_km < 0 or min_samples < 1:
+        raise ValueError('eps_km must be non-negative and min_samples positive.')
+    labels = np.full(len(index), NOISE)
+    if not len(index):
+        return labels
+
+    core = neighbour_counts(index, eps_km, workers) >= min_samples
+    order = index.tree_order()
+    cluster = 0
+    for seed in order[core[order]].tolist():
+        if labels[seed] != NOISE:
+            continue
+        labels[seed] = cluster
+        frontier = np.array([seed])
+        while len(frontier):
+            batch, frontier = frontier[:batch_size], frontier[batch_size:]
+            reached = index.query_radius_union(index.lats[batch], index.lons[batch], eps_km)
+            reached = reached[labels[reached] == NOISE]
+            labels[reached] = cluster
+            # Only core sites extend the cluster; the others are its border
+            frontier = np.concatenate((frontier, reached[core[reached]]))
+        cluster += 1
+    return labels
+
+def summarize_clusters(index: LandingSiteIndex, labels: np.ndarray, mass_key: str = 'mass (g)',
+                       class_key: str = 'recclass', top_classes: int = 3) -> List[dict]:
+    """
+    Describe each cluster found by dbscan.
+
+    Args:
+        index (LandingSiteIndex): Index the labels were computed on.
+        labels (np.ndarray): Cluster label of every site position.
+        mass_key (str): Record key holding the mass value.
+        class_key (str): Record key holding the meteorite class.
+        top_classes (int): Number of most common classes listed per cluster.
+
+    Returns:
+        List[dict]: One summary per cluster, largest first: 'cluster', 'sites',
+                    'center' (latitude, longitude of the spherical mean),
+                    'radius_km' (farthest site from the center) and, when the
+                    index keeps its records, 'total_mass' and 'top_classes'.
+    """
+    clustered = np.nonzero(labels != NOISE)[0]
+    if not len(clustered):
+        return []
+    cluster_labels = labels[clustered]
+    n_clusters = int(cluster_labels.max()) + 1
+    sizes = np.bincount(cluster_labels, minlength=n_clusters)
+
+    points = lat_lon_to_unit_vectors(index.lats[clustered], index.lons[clustered])
+    sums = np.column_stack([np.bincount(cluster_labels, points[:, d], minlength=n_clusters) for d in range(3)])
+    center_lats = np.degrees(np.arctan2(sums[:, 2], np.hypot(sums[:, 0], sums[:, 1])))
+    center_lons = np.degrees(np.arctan2(sums[:, 1], sums[:, 0]))
+    distances = great_circle_distance_pairs(index.lats[clustered], index.lons[clustered],
+                                            center_lats[cluster_labels], center_lons[cluster_labels])
+    radii = np.zeros(n_clusters)
+    np.maximum.at(radii, cluster_labels, distances)
+
+    summaries = [{'cluster': cluster, 'sites': int(sizes[cluster]),
+                  'center': (float(center_lats[cluster]), float(center_lons[cluster])),
+                  'radius_km': float(radii[cluster])} for cluster in range(n_clusters)]
+
+    if index.records is not None:
+        masses = np.zeros(n_clusters)
+        classes = [Counter() for _ in range(n_clusters)]
+        for position, cluster in zip(clustered.tolist(), cluster_labels.tolist()):
+            record = index.records[position]
+            try:
+                masses[cluster] += float(record.get(mass_key))
+            except (TypeError, ValueError):
+                pass
+            if record.get(class_key) is not None:
+                classes[cluster][record[class_key]] += 1
+        for summary in summaries:
+            summary['total_mass'] = float(masses[summary['cluster']])
+            summary['top_classes'] = classes[summary['cluster']].most_common(top_classes)
+
+    summaries.sort(key=lambda summary: -summary['sites'])
+    return summaries
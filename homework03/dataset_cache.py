@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Sequence
+from typing import Dict, Optional
+import numpy as np
+
+# Bump when the parsed layout changes so that old cache files are not reused
+CACHE_VERSION = 1
+DEFAULT_CACHE_BYTES = 1 << 30
+TEXT_COLUMNS = ('name', 'id', 'recclass')
+FLOAT_COLUMNS = ('mass', 'reclat', 'reclong')
+# Column name -> key of the same value in a landing record
+RECORD_KEYS = {'name': 'name', 'id': 'id', 'recclass': 'recclass',
+               'mass': 'mass (g)', 'reclat': 'reclat', 'reclong': 'reclong'}
+DIGEST_INDEX = 'digests.json'
+
+def to_float(value) -> float:
+    """Convert a raw field to float, mapping missing or invalid values to NaN."""
+    if value is None or value == '':
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def parse_landing_columns(records) -> Dict[str, np.ndarray]:
+    """
+    Convert landing records into typed columns.
+
+    Args:
+        records (Iterable[dict]): A list (or stream) of landing records.
+
+    Returns:
+        Dict[str, np.ndarray]: Unicode arrays for 'name', 'id' and 'recclass'
+                               (empty string when missing) and float64 arrays
+                               for 'mass', 'reclat' and 'reclong' (NaN when
+                               missing or invalid).
+    """
+    values = {column: [] for column in TEXT_COLUMNS + FLOAT_COLUMNS}
+    for item in records:
+        for column in TEXT_COLUMNS:
+            value = item.get(RECORD_KEYS[column])
+            values[column].append('' if value is None else str(value))
+        for column in FLOAT_COLUMNS:
+            values[column].append(to_float(item.get(RECORD_KEYS[column])))
+    columns = {column: np.array(values[column], dtype=str) for column in TEXT_COLUMNS}
+    columns.update({column: np.array(values[column], dtype=float) for column in FLOAT_COLUMNS})
+    return columns
+
+def file_digest(filename: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _write_atomically(path: str, write) -> None:
+    """Write a file through a temporary file in the same directory, then rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def cached_digest(filename: str, cache_dir: str) -> str:
+    """
+    Content digest of a data file. Digests are remembered per (path, size,
+    modification time) in the cache directory, so an unchanged file is only
+    hashed once while any edit to it produces a new digest.
+
+    Args:
+        filename (str): Path to the data file.
+        cache_dir (str): Cache directory.
+
+    Returns:
+        str: Hex digest of the file's contents.
+    """
+    stat = os.stat(filename)
+    signature = f'{os.path.abspath(filename)}:{stat.st_size}:{stat.st_mtime_ns}'
+    index_path = os.path.join(cache_dir, DIGEST_INDEX)
+    try:
+        with open(index_path, 'r') as f:
+            digests = json.load(f)
+    except (FileNotFoundError, ValueError):
+        digests = {}
+
+    if signature not in digests:
+        # Drop entries for older versions of the same file before adding the new one
+        path_prefix = signature.rsplit(':', 2)[0] + ':'
+        digests = {key: value for key, value in digests.items() if not key.startswith(path_prefix)}
+        digests[signature] = file_digest(filename)
+        _write_atomically(index_path, lambda f: f.write(json.dumps(digests).encode()))
+    return digests[signature]
+
+def evict_cache(cache_dir: str, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+    """
+    Delete the least recently used cache files until the cached datasets take
+    at most max_bytes. Cache hits refresh a file's modification time, which
+    serves as its last-use time.
+
+    Args:
+        cache_dir (str): Cache directory.
+        max_bytes (int): Size budget of the cache directory in bytes.
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.name.endswith('.npz'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        logging.info(f'Evicted {path} from the dataset cache.')
+
+def _parse_columns(filename: str, workers: Optional[int]) -> Dict[str, np.ndarray]:
+    from ml_data_analysis import iter_data_file
+    from parallel_csv import parse_csv_columns
+
+    if filename.lower().endswith('.csv'):
+        return parse_csv_columns(filename, workers)
+    return parse_landing_columns(iter_data_file(filename))
+
+def load_landing_columns(filename: str, cache_dir: Optional[str] = None,
+                         max_bytes: int = DEFAULT_CACHE_BYTES, workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Load the typed columns of a data file, from the binary cache when the file
+    has been parsed before.
+
+    Cache entries are .npz files named after the SHA-256 of the source file's
+    contents, so a changed file never hits a stale entry. New entries are
+    followed by an eviction pass that keeps the directory within max_bytes.
+
+    Args:
+        filename (str): Path to a CSV, JSON, XML or YAML data file.
+        cache_dir (str): Cache directory (created if needed). None parses the
+                         file without caching.
+        max_bytes (int): Size budget of the cache directory in bytes.
+        workers (int): Worker processes parsing a large CSV file in parallel
+                       (see parallel_csv.parse_csv_columns; default: all cores).
+
+    Returns:
+        Dict[str, np.ndarray]: Columns as returned by parse_landing_columns.
+    """
+    if cache_dir is None:
+        return _parse_columns(filename, workers)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f'{cached_digest(filename, cache_dir)}-v{CACHE_VERSION}.npz')
+    try:
+        with np.load(path) as cached:
+            columns = {column: cached[column] for column in TEXT_COLUMNS + FLOAT_COLUMNS}
+        os.utime(path)
+        logging.info(f'Loaded {filename} from the dataset cache.')
+        return columns
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        pass
+
+    columns = _parse_columns(filename, workers)
+    _write_atomically(path, lambda f: np.savez(f, **columns))
+    evict_cache(cache_dir, max_bytes)
+    return columns
+
+class ColumnRecords(Sequence):
+    """
+    Read-only list of landing records backed by typed columns. Records are
+    built on access, so code written against lists of dicts (such as the
+    CLI output) can run on cached columns without materializing every row.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], positions: Optional[np.ndarray] = None):
+        """
+        Args:
+            columns (Dict[str, np.ndarray]): Columns as returned by parse_landing_columns.
+            positions (np.ndarray): Rows exposed by this view (default: all).
+        """
+        self.columns = columns
+        self.positions = np.arange(len(columns['mass'])) if positions is None else np.asarray(positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ColumnRecords(self.columns, self.positions[i])
+        row = self.positions[i]
+        record = {}
+        for column, key in RECORD_KEYS.items():
+            value = self.columns[column][row]
+            if column in FLOAT_COLUMNS:
+                record[key] = None if np.isnan(value) else float(value)
+            else:
+                record[key] = str(value) if value != '' else None
+        return record
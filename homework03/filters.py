@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+import operator
+import re
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Short names accepted in filter expressions, by record key
+FIELD_ALIASES = {'mass': 'mass (g)', 'lat': 'reclat', 'latitude': 'reclat',
+                 'lon': 'reclong', 'long': 'reclong', 'longitude': 'reclong', 'class': 'recclass'}
+OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+             '==': operator.eq, '!=': operator.ne}
+PREFIX = '^='
+BBOX = 'bbox'
+
+_COMPARISON = re.compile(r'^\s*(?P<field>.+?)\s*(?P<op><=|>=|==|!=|\^=|<|>)\s*(?P<value>.*?)\s*$')
+_BBOX = re.compile(r'^\s*bbox\s*=\s*(?P<values>.+)$', re.IGNORECASE)
+
+class Condition:
+    """
+    One test on a landing record: a comparison `field op value` (numeric when
+    the value is a number), a prefix test `field ^= text`, or a bounding box
+    on reclat/reclong. Missing and unparsable values never match.
+    """
+
+    def __init__(self, field: Optional[str], op: str, value):
+        """
+        Args:
+            field (str): Record key tested (None for a bounding box).
+            op (str): One of OPERATORS, PREFIX or BBOX.
+            value: Number or string to compare with, or the box as
+                   (min_lat, max_lat, min_lon, max_lon).
+        """
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def __repr__(self) -> str:
+        if self.op == BBOX:
+            return f'bbox={",".join(str(v) for v in self.value)}'
+        return f'{self.field} {self.op} {self.value!r}'
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return ('reclat', 'reclong') if self.op == BBOX else (self.field,)
+
+    def holds(self, get: Callable[[str], object]) -> bool:
+        """
+        Evaluate the condition on a record.
+
+        Args:
+            get (Callable): Returns the raw value of a record key (None when missing).
+
+        Returns:
+            bool: Whether the record passes.
+        """
+        if self.op == BBOX:
+            try:
+                lat, lon = float(get('reclat')), float(get('reclong'))
+            except (TypeError, ValueError):
+                return False
+            min_lat, max_lat, min_lon, max_lon = self.value
+            if not min_lat <= lat <= max_lat:
+                return False
+            if min_lon <= max_lon:
+                return min_lon <= lon <= max_lon
+            # The box crosses the antimeridian
+            return lon >= min_lon or lon <= max_lon
+
+        raw = get(self.field)
+        # Empty CSV fields are missing values, as in the typed columns
+        if raw is None or raw == '':
+            return False
+        if self.op == PREFIX:
+            return str(raw).startswith(self.value)
+        if isinstance(self.value, float):
+            try:
+                raw = float(raw)
+            except (TypeError, ValueError):
+                return False
+            if raw != raw:
+                return False
+            return OPERATORS[self.op](raw, self.value)
+        return OPERATORS[self.op](str(raw), self.value)
+
+def parse_condition(expression: str) -> Condition:
+    """
+    Parse one filter expression, e.g. 'mass > 1000', 'recclass ^= L' or
+    'bbox=30,50,-10,20' (min_lat, max_lat, min_lon, max_lon; a min_lon
+    larger than max_lon wraps across the antimeridian). Field names may be
+    record keys or the short names in FIELD_ALIASES.
+
+    Args:
+        expression (str): The filter expression.
+
+    Returns:
+        Condition: The parsed condition.
+    """
+    match = _BBOX.match(expression)
+    if match:
+        try:
+            values = tuple(float(v) for v in match.group('values').split(','))
+        except ValueError:
+            values = ()
+        if len(values) != 4:
+            raise ValueError(f'Invalid bounding box {expression!r}; use bbox=MIN_LAT,MAX_LAT,MIN_LON,MAX_LON.')
+        return Condition(None, BBOX, values)
+
+    match = _COMPARISON.match(expression)
+    if not match or not match.group('value'):
+        raise ValueError(f"Invalid filter {expression!r}; use 'FIELD OP VALUE' with OP one of "
+                         f"{', '.join(list(OPERATORS) + [PREFIX])}, or bbox=MIN_LAT,MAX_LAT,MIN_LON,MAX_LON.")
+    field = FIELD_ALIASES.get(match.group('field'), match.group('field'))
+    op, value = match.group('op'), match.group('value').strip('\'"')
+    if op != PREFIX:
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    return Condition(field, op, value)
+
+class RecordFilter:
+    """
+    Conjunction of filter conditions, evaluated by the readers while they
+    stream a file so that rejected rows are dropped before they are kept (for
+    CSV, before a dict is even built for them).
+    """
+
+    def __init__(self, conditions: Iterable[Condition] = ()):
+        """
+        Args:
+            conditions (Iterable[Condition]): Conditions that must all hold.
+        """
+        self.conditions = list(conditions)
+
+    @classmethod
+    def parse(cls, expressions: Optional[Iterable[str]]) -> Optional['RecordFilter']:
+        """Build a filter from expressions (see parse_condition); None when there are none."""
+        conditions = [parse_condition(expression) for expression in expressions or []]
+        return cls(conditions) if conditions else None
+
+    def __repr__(self) -> str:
+        return ' and '.join(repr(condition) for condition in self.conditions)
+
+    @property
+    def fields(self) -> List[str]:
+        """Record keys read by the conditions."""
+        return sorted({field for condition in self.conditions for field in condition.fields})
+
+    def matches(self, record: dict) -> bool:
+        """Whether a record (dict) passes every condition."""
+        return all(condition.holds(record.get) for condition in self.conditions)
+
+    def row_matcher(self, header: Sequence[str]) -> Callable[[Sequence[str]], bool]:
+        """
+        Build a test for raw CSV rows (lists of strings) with the given header,
+        so rows can be rejected without building a dict for them.
+
+        Args:
+            header (Sequence[str]): Column names of the CSV file.
+
+        Returns:
+            Callable: Function of a row that returns whether it passes.
+        """
+        positions = {name: i for i, name in enumerate(header)}
+        conditions = self.conditions
+
+        def matches(row: Sequence[str]) -> bool:
+            def get(field):
+                i = positions.get(field)
+                return row[i] if i is not None and i < len(row) else None
+            return all(condition.holds(get) for condition in conditions)
+
+        return matches
+
+    def mask(self, columns: dict):
+        """
+        Evaluate the filter on typed columns (see dataset_cache), with the same
+        result as matches() on the corresponding records.
+
+        Args:
+            columns (dict): Columns as returned by dataset_cache.parse_landing_columns.
+
+        Returns:
+            np.ndarray: Boolean mask of the rows that pass.
+
+        Raises:
+            KeyError: If a condition cannot be evaluated on the cached columns
+                      (a field that is not cached, or a text comparison on a
+                      numeric column).
+        """
+        import numpy as np
+        from dataset_cache import FLOAT_COLUMNS, RECORD_KEYS, to_float
+
+        column_names = {key: column for column, key in RECORD_KEYS.items()}
+        mask = np.ones(len(columns['mass']), dtype=bool)
+        for condition in self.conditions:
+            if condition.op == BBOX:
+                lats, lons = columns['reclat'], columns['reclong']
+                min_lat, max_lat, min_lon, max_lon = condition.value
+                inside = (lats >= min_lat) & (lats <= max_lat)
+                if min_lon <= max_lon:
+                    inside &= (lons >= min_lon) & (lons <= max_lon)
+                else:
+                    inside &= (lons >= min_lon) | (lons <= max_lon)
+                mask &= inside
+                continue
+
+            column = column_names[condition.field]
+            values = columns[column]
+            if condition.op == PREFIX:
+                mask &= (values != '') & np.char.startswith(values.astype(str), condition.value)
+            elif isinstance(condition.value, float):
+                if column not in FLOAT_COLUMNS:
+                    values = np.array([to_float(value) for value in values], dtype=float)
+                mask &= ~np.isnan(values) & OPERATORS[condition.op](values, condition.value)
+            else:
+                if column in FLOAT_COLUMNS:
+                    raise KeyError(condition.field)
+                mask &= (values != '') & OPERATORS[condition.op](values.astype(str), condition.value)
+        return mask
+
+def filter_columns(columns: dict, where: Optional[RecordFilter]) -> dict:
+    """
+    Keep the rows of typed columns that pass a filter.
+
+    Args:
+        columns (dict): Columns as returned by dataset_cache.parse_landing_columns.
+        where (RecordFilter): The filter (None keeps every row).
+
+    Returns:
+        dict: The selected rows of every column.
+    """
+    if where is None:
+        return columns
+    mask = where.mask(columns)
+    return {column: values[mask] for column, values in columns.items()}
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+from typing import Dict, Iterable, Iterator, Optional
+from xml.sax.saxutils import escape
+
+# Class frequencies roughly following the NASA catalogue (ordinary chondrites dominate)
+CLASS_WEIGHTS = {
+    'L6': 82, 'H5': 71, 'L5': 34, 'H6': 27, 'H4': 21, 'LL5': 14, 'LL6': 10, 'L4': 5,
+    'H4/5': 2, 'CM2': 2, 'H3': 1, 'L3': 1, 'CO3': 1, 'Ureilite': 1, 'Iron, IIIAB': 1,
+    'CV3': 1, 'EH3': 1, 'Eucrite-pmict': 1, 'Diogenite': 1, 'Howardite': 1,
+}
+# Find regions as (latitude, longitude, spread in degrees, weight): Antarctic
+# blue-ice fields and hot deserts hold most finds. None spreads the remaining
+# sites uniformly over the globe.
+FIND_REGIONS = [
+    ((-76.7, 159.5, 1.5), 30), ((-72.0, 26.0, 2.0), 18), ((-84.3, 166.0, 1.0), 8),
+    ((20.0, 56.0, 1.5), 8), ((26.0, 16.0, 3.0), 8), ((-24.0, -69.5, 1.5), 5), ((-30.5, 122.0, 3.0), 4),
+    (None, 19),
+]
+NAME_SYLLABLES = ['al', 'an', 'bar', 'be', 'dar', 'el', 'go', 'ka', 'la', 'mi', 'na', 'or',
+                  'ra', 'sa', 'ta', 'ur', 'va', 'zu']
+CSV_FIELDS = ['name', 'id', 'nametype', 'recclass', 'mass (g)', 'fall', 'year', 'reclat', 'reclong', 'GeoLocation']
+FORMATS = ('csv', 'json', 'xml', 'yaml')
+# Kinds of dirty values, each injected into the given fraction of rows
+DIRTY_RATES = {
+    'missing_mass': 0.0,          # empty mass
+    'invalid_mass': 0.0,          # non-numeric mass such as 'unknown'
+    'missing_coordinates': 0.0,   # empty reclat, reclong and GeoLocation
+    'invalid_coordinates': 0.0,   # non-numeric reclat and reclong
+    'class_typo': 0.0,            # misspelled recclass (adds many rare classes)
+}
+
+def _name(rng: random.Random, i: int) -> str:
+    syllables = ''.join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f'{syllables.capitalize()} {i:06d}'
+
+def _location(rng: random.Random) -> tuple:
+    region = rng.choices([region for region, _ in FIND_REGIONS], weights=[weight for _, weight in FIND_REGIONS])[0]
+    if region is None:
+        return math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)
+    lat, lon, spread = region
+    lat = max(-90.0, min(90.0, rng.gauss(lat, spread)))
+    lon = (rng.gauss(lon, spread) + 180) % 360 - 180
+    return lat, lon
+
+def _typo(rng: random.Random, text: str) -> str:
+    position = rng.randrange(len(text))
+    edit = rng.choice(('drop', 'swap', 'case', 'insert'))
+    if edit == 'drop' and len(text) > 1:
+        return text[:position] + text[position + 1:]
+    if edit == 'swap' and position + 1 < len(text):
+        return text[:position] + text[position + 1] + text[position] + text[position + 2:]
+    if edit == 'case':
+        return text[:position] + text[position].swapcase() + text[position + 1:]
+    return text[:position] + rng.choice('abcdefghijklmnopqrstuvwxyz0123456789-') + text[position:]
+
+def generate_records(n_rows: int, seed: int = 332,
+                     dirty_rates: Optional[Dict[str, float]] = None) -> Iterator[dict]:
+    """
+    Generate realistic synthetic meteorite landing records, one at a time so
+    that any number of rows can be written with constant memory. The same
+    seed and rates always yield the same records.
+
+    Args:
+        n_rows (int): Number of records.
+        seed (int): Random seed.
+        dirty_rates (Dict[str, float]): Fraction of rows with each kind of
+                                        dirty value (keys of DIRTY_RATES).
+
+    Yields:
+        dict: Record with the CSV_FIELDS keys, all values as strings.
+    """
+    rates = dict(DIRTY_RATES)
+    for kind, rate in (dirty_rates or {}).items():
+        if kind not in DIRTY_RATES:
+            raise ValueError(f'Unknown dirty value kind {kind!r}; use one of {", ".join(DIRTY_RATES)}.')
+        rates[kind] = rate
+
+    rng = random.Random(seed)
+    classes, class_weights = list(CLASS_WEIGHTS), list(CLASS_WEIGHTS.values())
+    for i in range(n_rows):
+        fell = rng.random() < 0.05
+        lat, lon = _location(rng)
+        recclass = rng.choices(classes, weights=class_weights)[0]
+        # Falls are usually recovered whole; finds are mostly small fragments
+        mass = rng.lognormvariate(8.5 if fell else 3.5, 2.0)
+        record = {
+            'name': _name(rng, i),
+            'id': str(i + 1),
+            'nametype': 'Valid' if rng.random() > 0.001 else 'Relict',
+            'recclass': recclass,
+            'mass (g)': f'{mass:.2f}',
+            'fall': 'Fell' if fell else 'Found',
+            'year': str(rng.randint(1800, 2013) if fell else rng.randint(1969, 2013)),
+            'reclat': f'{lat:.5f}',
+            'reclong': f'{lon:.5f}',
+            'GeoLocation': f'({lat:.5f}, {lon:.5f})',
+        }
+
+        if rates['missing_mass'] and rng.random() < rates['missing_mass']:
+            record['mass (g)'] = ''
+        elif rates['invalid_mass'] and rng.random() < rates['invalid_mass']:
+            record['mass (g)'] = rng.choice(('unknown', 'n/a', '1,5', '?'))
+        if rates['missing_coordinates'] and rng.random() < rates['missing_coordinates']:
+            record['reclat'] = record['reclong'] = record['GeoLocation'] = ''
+        elif rates['invalid_coordinates'] and rng.random() < rates['invalid_coordinates']:
+            record['reclat'], record['reclong'] = rng.choice((('N/A', 'N/A'), ('12.5x', '3'), ('?', '?')))
+        if rates['class_typo'] and rng.random() < rates['class_typo']:
+            record['recclass'] = _typo(rng, recclass)
+        yield record
+
+def _csv_value(value: str) -> str:
+    if any(c in value for c in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def _yaml_value(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+def write_records(records: Iterable[dict], path: str, file_format: Optional[str] = None) -> int:
+    """
+    Write records in the layout the readers of ml_data_analysis expect: CSV
+    with a header row, JSON and YAML with the records under
+    'meteorite_landings', XML with one <meteorite_landings> element per record
+    (mass as <mass_g>). Records are written as they arrive.
+
+    Args:
+        records (Iterable[dict]): Records with the CSV_FIELDS keys.
+        path (str): Output file.
+        file_format (str): One of FORMATS (default: from the file extension).
+
+    Returns:
+        int: Number of records written.
+    """
+    file_format = file_format or os.path.splitext(path)[1].lower().lstrip('.').replace('yml', 'yaml')
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported output format {file_format!r}; use one of {", ".join(FORMATS)}.')
+
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            f.write(','.join(_csv_value(field) for field in CSV_FIELDS) + '\n')
+        elif file_format == 'json':
+            f.write('{"meteorite_landings": [\n')
+        elif file_format == 'xml':
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n<data>\n')
+        else:
+            f.write('meteorite_landings:\n')
+
+        for item in records:
+            if file_format == 'csv':
+                f.write(','.join(_csv_value(item[field]) for field in CSV_FIELDS) + '\n')
+            elif file_format == 'json':
+                f.write((',\n' if count else '') + json.dumps(item))
+            elif file_format == 'xml':
+                children = ''.join(f'<{"mass_g" if field == "mass (g)" else field}>{escape(item[field])}'
+                                   f'</{"mass_g" if field == "mass (g)" else field}>' for field in CSV_FIELDS)
+                f.write(f'  <meteorite_landings>{children}</meteorite_landings>\n')
+            else:
+                f.write('- ' + '\n  '.join(f'{field}: {_yaml_value(item[field])}' for field in CSV_FIELDS) + '\n')
+            count += 1
+
+        if file_format == 'json':
+            f.write('\n]}\n')
+        elif file_format == 'xml':
+            f.write('</data>\n')
+    return count
+
+def write_dataset(path: str, n_rows: int, seed: int = 332, dirty_rates: Optional[Dict[str, float]] = None,
+                  file_format: Optional[str] = None) -> int:
+    """
+    Generate n_rows records (see generate_records) and write them to path.
+
+    Returns:
+        int: Number of records written.
+    """
+    return write_records(generate_records(n_rows, seed, dirty_rates), path, file_format)
+
+def parse_dirty_rates(dirty: float = 0.0, overrides: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Build dirty value rates from one rate for every kind plus 'KIND=RATE' overrides.
+
+    Args:
+        dirty (float): Rate used for every kind.
+        overrides (Iterable[str]): Per-kind rates such as 'invalid_mass=0.05'.
+
+    Returns:
+        Dict[str, float]: Rate of each kind.
+    """
+    rates = dict.fromkeys(DIRTY_RATES, dirty)
+    for override in overrides or []:
+        kind, _, rate = override.partition('=')
+        if kind not in DIRTY_RATES or not rate:
+            raise ValueError(f'Invalid dirty rate {override!r}; use KIND=RATE with KIND one of {", ".join(DIRTY_RATES)}.')
+        rates[kind] = float(rate)
+    return rates
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a seeded synthetic meteorite landing dataset.')
+    parser.add_argument('output', help='Output file; the extension (.csv, .json, .xml, .yaml) selects the format.')
+    parser.add_argument('--rows', type=int, default=1000000, help='Number of records.')
+    parser.add_argument('--seed', type=int, default=332, help='Random seed.')
+    parser.add_argument('--format', choices=FORMATS, help='Output format (default: from the extension).')
+    parser.add_argument('--dirty', type=float, default=0.0, metavar='RATE',
+                        help='Fraction of rows with each kind of dirty value.')
+    parser.add_argument('--dirty-rate', action='append', metavar='KIND=RATE',
+                        help=f'Rate of one kind of dirty value ({", ".join(DIRTY_RATES)}). May be repeated.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    try:
+        rates = parse_dirty_rates(args.dirty, args.dirty_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    count = write_dataset(args.output, args.rows, args.seed, rates, args.format)
+    logging.info(f'Wrote {count} records to {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB).')
+
+if __name__ == '__main__':
+    main()
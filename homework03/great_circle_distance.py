@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
 from math import radians, sin, cos, sqrt, atan2
-from typing import Tuple
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
+
+# NumPy is imported by the vectorized functions only, so that scalar
+# distances do not pay for loading it
+if TYPE_CHECKING:
+    import numpy as np
+
+EARTH_RADIUS_KM = 6371  # Radius of the Earth in kilometers
 
 def calculate_great_circle_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -12,7 +21,7 @@ def calculate_great_circle_distance(lat1: float, lon1: float, lat2: float, lon2:
     Returns:
         float: Great-circle distance between the two points.
     """
-    R = 6371  # Radius of the Earth in kilometers
+    R = EARTH_RADIUS_KM
     lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(radians, [lat1, lon1, lat2, lon2])
 
     dlat = lat2_rad - lat1_rad
@@ -24,8 +33,126 @@ def calculate_great_circle_distance(lat1: float, lon1: float, lat2: float, lon2:
     distance = R * c
     return distance
 
+def _haversine(lat1_rad, lon1_rad, cos_lat1, lat2_rad, lon2_rad, cos_lat2) -> np.ndarray:
+    """
+    Broadcasting core shared by the array functions. Takes coordinates already
+    converted to radians together with the cosine of each latitude, so that
+    callers working block by block only compute those once.
+    """
+    import numpy as np
+
+    a = np.sin((lat2_rad - lat1_rad) / 2) ** 2 + cos_lat1 * cos_lat2 * np.sin((lon2_rad - lon1_rad) / 2) ** 2
+    # Rounding can push a slightly outside [0, 1] for (near) antipodal points
+    a = np.clip(a, 0.0, 1.0)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def great_circle_distance_pairs(lats1, lons1, lats2, lons2) -> np.ndarray:
+    """
+    Calculate the great-circle distance between row-aligned pairs of points,
+    i.e. between (lats1[i], lons1[i]) and (lats2[i], lons2[i]). Inputs follow
+    NumPy broadcasting rules, so scalars can be mixed with arrays.
+
+    Args:
+        lats1, lons1 (array_like): Latitudes and longitudes of the first points.
+        lats2, lons2 (array_like): Latitudes and longitudes of the second points.
+
+    Returns:
+        np.ndarray: Great-circle distances in kilometers.
+    """
+    import numpy as np
+
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=float)) for x in (lats1, lons1, lats2, lons2))
+    return _haversine(lat1, lon1, np.cos(lat1), lat2, lon2, np.cos(lat2))
+
+def great_circle_distance_one_to_many(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """
+    Calculate the great-circle distance from one point to many points.
+
+    Args:
+        lat, lon (float): Latitude and longitude of the reference point.
+        lats, lons (array_like): Latitudes and longitudes of the other points.
+
+    Returns:
+        np.ndarray: Great-circle distance from the reference point to each point.
+    """
+    return great_circle_distance_pairs(lat, lon, lats, lons)
+
+def iter_distance_matrix_blocks(lats1, lons1, lats2=None, lons2=None,
+                                chunk_size: int = 1024) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Produce the pairwise distance matrix between two sets of points block by
+    block. Each block holds chunk_size rows of the full matrix, so peak memory
+    is chunk_size * len(lats2) floats regardless of the number of rows.
+
+    Args:
+        lats1, lons1 (array_like): Latitudes and longitudes of the row points.
+        lats2, lons2 (array_like): Latitudes and longitudes of the column points.
+                                   Defaults to the row points.
+        chunk_size (int): Number of matrix rows per block.
+
+    Yields:
+        Tuple[int, np.ndarray]: Index of the first row of the block and the
+                                block of distances in kilometers.
+    """
+    import numpy as np
+
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be a positive integer.')
+    if (lats2 is None) != (lons2 is None):
+        raise ValueError('lats2 and lons2 must be given together.')
+    lat1 = np.radians(np.asarray(lats1, dtype=float).ravel())
+    lon1 = np.radians(np.asarray(lons1, dtype=float).ravel())
+    if lats2 is None and lons2 is None:
+        lat2, lon2 = lat1, lon1
+    else:
+        lat2 = np.radians(np.asarray(lats2, dtype=float).ravel())
+        lon2 = np.radians(np.asarray(lons2, dtype=float).ravel())
+    cos_lat1 = np.cos(lat1)
+    cos_lat2 = np.cos(lat2)
+
+    for start in range(0, len(lat1), chunk_size):
+        rows = slice(start, start + chunk_size)
+        block = _haversine(lat1[rows, None], lon1[rows, None], cos_lat1[rows, None],
+                           lat2[None, :], lon2[None, :], cos_lat2[None, :])
+        yield start, block
+
+def great_circle_distance_matrix(lats1, lons1, lats2=None, lons2=None,
+                                 chunk_size: Optional[int] = None,
+                                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Calculate the pairwise great-circle distance matrix between two sets of
+    points (or between one set of points and itself).
+
+    With chunk_size set the matrix is filled block by block, which bounds the
+    temporary arrays to chunk_size rows. Combined with out=np.memmap(...) this
+    writes an N x N matrix for large N to disk without holding it in RAM.
+
+    Args:
+        lats1, lons1 (array_like): Latitudes and longitudes of the row points.
+        lats2, lons2 (array_like): Latitudes and longitudes of the column points.
+                                   Defaults to the row points.
+        chunk_size (int): Number of rows computed at a time. None computes the
+                          whole matrix in one broadcast.
+        out (np.ndarray): Optional preallocated (rows, columns) array to fill.
+
+    Returns:
+        np.ndarray: Matrix of great-circle distances in kilometers.
+    """
+    import numpy as np
+
+    n_rows = np.asarray(lats1).size
+    n_cols = n_rows if lats2 is None else np.asarray(lats2).size
+    if out is None:
+        out = np.empty((n_rows, n_cols))
+    elif out.shape != (n_rows, n_cols):
+        raise ValueError(f'out has shape {out.shape}, expected {(n_rows, n_cols)}.')
+
+    for start, block in iter_distance_matrix_blocks(lats1, lons1, lats2, lons2,
+                                                    chunk_size=chunk_size or max(n_rows, 1)):
+        out[start:start + len(block)] = block
+    return out
+
 if __name__ == '__main__':
     # Example usage of the great-circle distance calculation
     distance = calculate_great_circle_distance(40.7128, -74.0060, 34.0522, -118.2437)
     print(f'Great-circle distance: {distance} km')
-
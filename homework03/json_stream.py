@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import json
+import re
+from typing import IO, Iterator
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_SEPARATORS = re.compile(r'[\s,]*')
+
+class ArrayNotFoundError(ValueError):
+    """The input holds no array under the requested key."""
+
+def iter_json_array(f: IO[str], array_key: str = 'meteorite_landings', chunk_size: int = 65536) -> Iterator:
+    """
+    Incrementally read the items of the array stored under array_key in a JSON
+    text stream, yielding one item at a time. The stream is read in chunks of
+    chunk_size characters, so memory use is bounded by the size of a single
+    item rather than the size of the input.
+
+    Args:
+        f (IO[str]): The open JSON text stream.
+        array_key (str): Key of the array holding the records.
+        chunk_size (int): Number of characters read from the stream at a time.
+
+    Yields:
+        One item of the array.
+
+    Raises:
+        ArrayNotFoundError: No array follows array_key.
+        ValueError: The input ends inside the array.
+    """
+    marker = f'"{array_key}"'
+    buffer = ''
+    # Find the opening bracket of the array that follows the key
+    while True:
+        key_pos = buffer.find(marker)
+        if key_pos != -1:
+            bracket_pos = buffer.find('[', key_pos + len(marker))
+            if bracket_pos != -1:
+                buffer = buffer[bracket_pos + 1:]
+                break
+            buffer = buffer[key_pos:]
+        else:
+            buffer = buffer[-len(marker):]
+        chunk = f.read(chunk_size)
+        if not chunk:
+            raise ArrayNotFoundError(f"No '{array_key}' array found in the input.")
+        buffer += chunk
+
+    pos = 0
+    while True:
+        pos = _JSON_SEPARATORS.match(buffer, pos).end()
+        if pos == len(buffer):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError('Unexpected end of input inside the array.')
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = _JSON_DECODER.raw_decode(buffer, pos)
+            # A number cut off by the end of the buffer (e.g. '4.' of '4.5') continues in the next chunk
+            cut = end == len(buffer) or (type(item) in (int, float) and buffer[end] in '.eE')
+            chunk = f.read(chunk_size) if cut else None
+        except json.JSONDecodeError:
+            # The item is split across chunks; read more and try again
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+        if chunk:
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        pos = end
+        yield item
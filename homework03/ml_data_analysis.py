@@ -1,101 +1,193 @@
 #!/usr/bin/env python
+from __future__ import annotations
 
 import argparse
 import json
 import csv
 import logging
-from typing import List
+import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
 from math import radians, sin, cos, sqrt, atan2
 from great_circle_distance import calculate_great_circle_distance 
-import matplotlib.pyplot as plt
+from aggregates import LandingAggregate
+from filters import RecordFilter, filter_columns
+from json_stream import ArrayNotFoundError, iter_json_array
+from profiling import profile_stage
 import sys
 import os
 
+# NumPy, matplotlib and the modules built on them are imported where they are
+# used, so that commands which do not need them start quickly
+if TYPE_CHECKING:
+    import numpy as np
+    from sampling import LandingSample
+    from spatial_index import LandingSiteIndex
+
+DEFAULT_DATA_FILE = '/data/Meteorite_Landings.json'
+
 logging.basicConfig(level=logging.WARNING)
 
-def calculate_max_mass(a_list_of_dicts: List[dict], a_key_string: str) -> float:
+def calculate_max_mass(a_list_of_dicts: Iterable[dict], a_key_string: str) -> float:
     """
     Calculate the maximum mass from the given list of dictionaries.
 
     Args:
-        a_list_of_dicts (List[dict]): A list of dictionaries that each have the
-                                        same set of keys.
+        a_list_of_dicts (Iterable[dict]): A list (or stream) of dictionaries that
+                                        each have the same set of keys.
         a_key_string (str): A key that appears in each dictionary associated with
                                         the desired value.
 
     Returns:
         max_mass (float) : Maximum mass value
     """
-    masses = []
+    max_mass = None
     for item in a_list_of_dicts:
         if a_key_string in item and item[a_key_string] is not None:
             try:
-                masses.append(float(item[a_key_string]))
+                mass = float(item[a_key_string])
             except ValueError:
                 print(f"Invalid value for key '{a_key_string}': {item[a_key_string]}")
-    if masses:
-        return max(masses)
+                continue
+            if max_mass is None or mass > max_mass:
+                max_mass = mass
+    if max_mass is not None:
+        return max_mass
     else:
         return 0.0
 
-def calculate_min_mass(a_list_of_dicts: List[dict], a_key_string: str) -> float:
+def calculate_min_mass(a_list_of_dicts: Iterable[dict], a_key_string: str) -> float:
     """
     Calculate the minimum mass from the given list of dictionaries.
 
     Args:
-        a_list_of_dicts (List[dict]): A list of dictionaries that each have the
-                                        same set of keys.
+        a_list_of_dicts (Iterable[dict]): A list (or stream) of dictionaries that
+                                        each have the same set of keys.
         a_key_string (str): A key that appears in each dictionary associated with
                                         the desired value.
 
     Returns:
         min_mass (float) : Minimum mass value
     """
-    masses = []
+    min_mass = None
     for item in a_list_of_dicts:
         if a_key_string in item and item[a_key_string] is not None:
             try:
-                masses.append(float(item[a_key_string]))
+                mass = float(item[a_key_string])
             except ValueError:
                 print(f"Invalid value for key '{a_key_string}': {item[a_key_string]}")
-    if masses:
-        return min(masses)
+                continue
+            if min_mass is None or mass < min_mass:
+                min_mass = mass
+    if min_mass is not None:
+        return min_mass
     else:
         return 0.0
 
-def calculate_avg_latitude_longitude(a_list_of_dicts: List[dict]) -> tuple:
+def calculate_avg_latitude_longitude(a_list_of_dicts: Iterable[dict]) -> tuple:
     """
     Calculate the average latitude and longitude from a list of dictionaries.
 
     Args:
-        a_list_of_dicts (list): A list of dictionaries, each dict should have the
-                                same set of keys.
+        a_list_of_dicts (Iterable[dict]): A list (or stream) of dictionaries, each
+                                dict should have the same set of keys.
 
     Returns:
         avg_latitude (float): Average latitude value.
         avg_longitude (float): Average longitude value.
     """
-    valid_coordinates = []
+    count = 0
+    lat_sum = 0.0
+    lon_sum = 0.0
 
     for item in a_list_of_dicts:
         try:
             if 'reclat' in item and 'reclong' in item and item['reclat'] is not None and item['reclong'] is not None:
                 lat = float(item['reclat'])
                 lon = float(item['reclong'])
-                valid_coordinates.append((lat, lon))
+                lat_sum += lat
+                lon_sum += lon
+                count += 1
             else:
                 print(f"Skipped entry: {item}")
         except ValueError:
             print(f"Invalid latitude or longitude value: {item['reclat']}, {item['reclong']}")
 
-    if valid_coordinates:
-        avg_latitude = sum(lat for lat, lon in valid_coordinates) / len(valid_coordinates)
-        avg_longitude = sum(lon for lat, lon in valid_coordinates) / len(valid_coordinates)
-        return avg_latitude, avg_longitude
+    if count:
+        return lat_sum / count, lon_sum / count
     else:
         logging.warning('No valid coordinates found.')
         return 0.0, 0.0
 
+def summarize_landings(a_list_of_dicts: Iterable[dict], a_key_string: str = 'mass (g)',
+                       class_capacity: Optional[int] = None, quantile_k: Optional[int] = 200) -> dict:
+    """
+    Compute every summary statistic in a single pass, so the input can be a
+    one-shot stream such as the generators returned by iter_json_file or
+    iter_data_file. Memory use does not depend on the number of records.
+
+    Args:
+        a_list_of_dicts (Iterable[dict]): A list (or stream) of dictionaries, each
+                                dict should have the same set of keys.
+        a_key_string (str): Key holding the mass value.
+        class_capacity (int): Count classes approximately with this many
+                              Space-Saving counters (None counts exactly).
+        quantile_k (int): Accuracy parameter of the mass quantile sketch
+                          (None computes exact quantiles).
+
+    Returns:
+        summary (dict): The LandingAggregate summary (record count, mass and
+                        coordinate statistics, hemisphere and class counts)
+                        plus the great-circle distance between the first two
+                        sites with valid coordinates (None if fewer than two).
+    """
+    aggregate = LandingAggregate(mass_key=a_key_string, class_capacity=class_capacity, quantile_k=quantile_k)
+    first_sites = []
+
+    for item in a_list_of_dicts:
+        aggregate.add(item)
+        if len(first_sites) < 2 and aggregate.latitude.count > len(first_sites):
+            first_sites.append((float(item['reclat']), float(item['reclong'])))
+
+    if not aggregate.latitude.count:
+        logging.warning('No valid coordinates found.')
+
+    summary = aggregate.summary()
+    summary['distance_between_first_sites'] = None
+    if len(first_sites) == 2:
+        (lat1, lon1), (lat2, lon2) = first_sites
+        summary['distance_between_first_sites'] = calculate_great_circle_distance(lat1, lon1, lat2, lon2)
+    return summary
+
+def summarize_columns(columns: dict, class_capacity: Optional[int] = None,
+                      quantile_k: Optional[int] = 200) -> dict:
+    """
+    Vectorized counterpart of summarize_landings for data already held as typed
+    columns (see dataset_cache.load_landing_columns).
+
+    Args:
+        columns (dict): Arrays 'mass', 'reclat', 'reclong' and 'recclass'.
+        class_capacity (int): Count classes approximately with this many
+                              Space-Saving counters (None counts exactly).
+        quantile_k (int): Accuracy parameter of the mass quantile sketch
+                          (None computes exact quantiles).
+
+    Returns:
+        summary (dict): Same keys as summarize_landings.
+    """
+    import numpy as np
+
+    summary = LandingAggregate(class_capacity=class_capacity, quantile_k=quantile_k).add_columns(columns).summary()
+    valid = np.nonzero(np.isfinite(columns['reclat']) & np.isfinite(columns['reclong']))[0]
+    summary['distance_between_first_sites'] = None
+    if len(valid) >= 2:
+        first, second = valid[:2]
+        summary['distance_between_first_sites'] = calculate_great_circle_distance(
+            columns['reclat'][first], columns['reclong'][first],
+            columns['reclat'][second], columns['reclong'][second])
+    elif not len(valid):
+        logging.warning('No valid coordinates found.')
+    return summary
+
 def calculate_distance_between_sites(site1: dict, site2: dict) -> float:
     """
     Calculate the great-circle distance between two landing sites.
@@ -113,14 +205,19 @@ def calculate_distance_between_sites(site1: dict, site2: dict) -> float:
     distance = calculate_great_circle_distance(lat1, lon1, lat2, lon2)
     return distance
 
-def plot_landing_sites(meteorite_data: List[dict]):
+def plot_landing_sites(meteorite_data: Iterable[dict], show: bool = True,
+                       output: str = 'meteorite_landing_sites.png'):
     """
     Plot the meteorite landing sites on a scatter plot and save it as an image.
 
     Args:
-        meteorite_data (list): A list of dictionaries, each dict should have the
-                               same set of keys.
+        meteorite_data (Iterable[dict]): A list (or stream) of dictionaries, each
+                               dict should have the same set of keys.
+        show (bool): Open the plot in a window after saving it.
+        output (str): Path of the image file.
     """
+    import matplotlib.pyplot as plt
+
     latitudes = []
     longitudes = []
 
@@ -141,8 +238,167 @@ def plot_landing_sites(meteorite_data: List[dict]):
     plt.xlabel('Longitude')
     plt.ylabel('Latitude')
     plt.grid(True)
-    plt.savefig('meteorite_landing_sites.png')
-    plt.show()
+    plt.savefig(output)
+    if show:
+        plt.show()
+
+def compute_density_grid(meteorite_data: Iterable[dict], lat_bins: int = 180, lon_bins: int = 360,
+                         batch_size: int = 100000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count the landing sites in each cell of a regular latitude/longitude grid.
+    Records are converted to arrays and binned batch by batch, so the input can
+    be a stream of any length.
+
+    Args:
+        meteorite_data (Iterable[dict]): A list (or stream) of dictionaries, each
+                               dict should have the same set of keys.
+        lat_bins (int): Number of latitude cells between -90 and 90.
+        lon_bins (int): Number of longitude cells between -180 and 180.
+        batch_size (int): Number of sites binned at a time.
+
+    Returns:
+        counts (np.ndarray): Array of shape (lat_bins, lon_bins) with the number
+                             of sites per cell.
+        lat_edges (np.ndarray): Latitude cell edges.
+        lon_edges (np.ndarray): Longitude cell edges.
+    """
+    counts, lat_edges, lon_edges = density_grid_from_coordinates([], [], lat_bins, lon_bins)
+
+    lats, lons = [], []
+    for site in meteorite_data:
+        if site.get('reclat') is None or site.get('reclong') is None:
+            continue
+        try:
+            lats.append(float(site['reclat']))
+            lons.append(float(site['reclong']))
+        except ValueError:
+            print(f"Invalid latitude or longitude value: {site['reclat']}, {site['reclong']}")
+            continue
+        if len(lats) >= batch_size:
+            counts += density_grid_from_coordinates(lats, lons, lat_bins, lon_bins)[0]
+            lats, lons = [], []
+    if lats:
+        counts += density_grid_from_coordinates(lats, lons, lat_bins, lon_bins)[0]
+
+    return counts, lat_edges, lon_edges
+
+def density_grid_from_coordinates(lats, lons, lat_bins: int = 180,
+                                  lon_bins: int = 360) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized core of compute_density_grid for coordinates already held in
+    arrays. NaN coordinates are ignored.
+
+    Args:
+        lats, lons (array_like): Latitudes and longitudes in degrees.
+        lat_bins (int): Number of latitude cells between -90 and 90.
+        lon_bins (int): Number of longitude cells between -180 and 180.
+
+    Returns:
+        tuple: Counts, latitude edges and longitude edges (see compute_density_grid).
+    """
+    import numpy as np
+
+    lat_edges = np.linspace(-90.0, 90.0, lat_bins + 1)
+    lon_edges = np.linspace(-180.0, 180.0, lon_bins + 1)
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    counts, _, _ = np.histogram2d(lats[valid], lons[valid], bins=(lat_edges, lon_edges))
+    return counts.astype(np.int64), lat_edges, lon_edges
+
+def save_density_grid(path: str, grid: Tuple[np.ndarray, np.ndarray, np.ndarray], source: str = '') -> None:
+    """
+    Save a density grid from compute_density_grid to a .npz file.
+
+    Args:
+        path (str): Path of the .npz file.
+        grid (tuple): Counts, latitude edges and longitude edges.
+        source (str): Description of the data the grid was built from, checked
+                      by load_density_grid.
+    """
+    import numpy as np
+
+    counts, lat_edges, lon_edges = grid
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, counts=counts, lat_edges=lat_edges, lon_edges=lon_edges, source=source)
+
+def load_density_grid(path: str, source: str = '') -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Load a density grid saved by save_density_grid.
+
+    Args:
+        path (str): Path of the .npz file.
+        source (str): Expected source description; the cached grid is ignored
+                      if it was built from different data.
+
+    Returns:
+        tuple: Counts, latitude edges and longitude edges, or None if the file
+               is missing or stale.
+    """
+    import numpy as np
+
+    try:
+        with np.load(path) as cached:
+            if str(cached['source']) != source:
+                return None
+            return cached['counts'], cached['lat_edges'], cached['lon_edges']
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+def density_grid_source(filename: str, lat_bins: int, lon_bins: int) -> str:
+    """
+    Describe a data file and grid size for density grid caching. The file size
+    and modification time are included so edits to the file invalidate the cache.
+    """
+    stat = os.stat(filename)
+    return f'{os.path.abspath(filename)}:{stat.st_size}:{stat.st_mtime_ns}:{lat_bins}x{lon_bins}'
+
+def plot_landing_density(grid: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                         output: str = 'meteorite_landing_density.png',
+                         color_scale: str = 'log', vmax: float = None) -> None:
+    """
+    Draw a density grid as a raster image and save it. Rendering only touches
+    the grid, not the sites, so re-rendering a cached grid with a different
+    color scale is fast. Uses the Agg canvas directly, so no display is needed.
+
+    Args:
+        grid (tuple): Counts, latitude edges and longitude edges from
+                      compute_density_grid.
+        output (str): Path of the image file.
+        color_scale (str): 'log', 'sqrt' or 'linear'.
+        vmax (float): Count mapped to the top of the color scale (defaults to
+                      the largest cell count).
+    """
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.colors import LogNorm, Normalize, PowerNorm
+    from matplotlib.figure import Figure
+
+    counts, lat_edges, lon_edges = grid
+    top = vmax if vmax is not None else max(int(counts.max()), 1)
+    if color_scale == 'log':
+        norm = LogNorm(vmin=1, vmax=max(top, 1))
+    elif color_scale == 'sqrt':
+        norm = PowerNorm(gamma=0.5, vmin=0, vmax=top)
+    elif color_scale == 'linear':
+        norm = Normalize(vmin=0, vmax=top)
+    else:
+        raise ValueError(f"Unsupported color scale {color_scale}. Use 'log', 'sqrt' or 'linear'.")
+
+    # Empty cells are left blank rather than drawn as the lowest color
+    image = np.ma.masked_equal(counts, 0)
+
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    mesh = ax.imshow(image, origin='lower', aspect='auto', norm=norm, cmap='viridis', interpolation='nearest',
+                     extent=(lon_edges[0], lon_edges[-1], lat_edges[0], lat_edges[-1]))
+    fig.colorbar(mesh, ax=ax, label='Landing sites per cell')
+    ax.set_title('Meteorite Landing Site Density')
+    ax.set_xlabel('Longitude')
+    ax.set_ylabel('Latitude')
+    ax.grid(True, alpha=0.3)
+    fig.savefig(output)
 
 def read_data_file(filename: str) -> List[dict]:
     """
@@ -198,42 +454,827 @@ def read_json_file(filename: str) -> List[dict]:
         logging.error('File not found. Exiting.')
         return []
 
-def main():
-    logging.basicConfig(level=logging.DEBUG)
+def iter_json_file(filename: str, array_key: str = 'meteorite_landings',
+                   chunk_size: int = 65536, where: Optional[RecordFilter] = None) -> Iterator[dict]:
+    """
+    Incrementally read the items of the array stored under array_key in a JSON
+    file, yielding one dictionary at a time. The file is read in chunks of
+    chunk_size characters, so memory use is bounded by the size of a single
+    item rather than the size of the file.
+
+    Args:
+        filename (str): Path to the JSON file.
+        array_key (str): Key of the array holding the records.
+        chunk_size (int): Number of characters read from the file at a time.
+        where (RecordFilter): Only yield the items that pass this filter;
+                              the others are dropped as soon as they are decoded.
+
+    Yields:
+        dict: One record of the array.
+    """
+    try:
+        f = open(filename, 'r')
+    except FileNotFoundError:
+        logging.error('File not found. Exiting.')
+        return
+
+    with f:
+        try:
+            for item in iter_json_array(f, array_key, chunk_size):
+                if where is None or where.matches(item):
+                    yield item
+        except ArrayNotFoundError:
+            logging.warning(f"No '{array_key}' array found in {filename}.")
+
+def iter_csv_batches(filename: str, batch_size: int = 10000,
+                     where: Optional[RecordFilter] = None) -> Iterator[List[dict]]:
+    """
+    Read a CSV file in batches of at most batch_size rows.
 
+    Args:
+        filename (str): Path to the CSV file.
+        batch_size (int): Maximum number of rows per batch.
+        where (RecordFilter): Only keep the rows that pass this filter. It is
+                              evaluated on the raw csv.reader rows, so no dict
+                              is built for a rejected row.
+
+    Yields:
+        List[dict]: The next batch of rows.
+    """
     try:
-        print("Current working directory:", os.getcwd())  # Add this line
-        json_file_path = '/data/Meteorite_Landings.json'  # Correct the path
-        ml_data = read_json_file(json_file_path)  # Use the correct path and function
+        f = open(filename, 'r', newline='')
     except FileNotFoundError:
-        logging.error('JSON file not found. Exiting.')
+        logging.error('File not found. Exiting.')
         return
 
-    if not ml_data:
-        logging.warning('No data found in the JSON file. Exiting.')
+    with f:
+        batch = []
+        if where is None:
+            rows = csv.DictReader(f)
+        else:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            matches = where.row_matcher(header)
+            rows = (dict(zip(header, row)) for row in reader if matches(row))
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+def normalize_record(item: dict) -> dict:
+    """
+    Bring a record from any of the supported formats to the CSV/JSON layout:
+    the XML files name the mass field 'mass_g', and some YAML files only carry
+    the coordinates in the 'GeoLocation' string.
+
+    Args:
+        item (dict): Landing record (modified in place).
+
+    Returns:
+        dict: The same record.
+    """
+    if 'mass (g)' not in item and 'mass_g' in item:
+        item['mass (g)'] = item.pop('mass_g')
+    if (item.get('reclat') is None or item.get('reclong') is None) and item.get('GeoLocation'):
+        try:
+            item['reclat'], item['reclong'] = (part.strip() for part in item['GeoLocation'].strip('()').split(','))
+        except ValueError:
+            logging.warning(f"Invalid GeoLocation value: {item['GeoLocation']}")
+    return item
+
+def iter_xml_file(filename: str, record_tag: str = 'meteorite_landings',
+                  where: Optional[RecordFilter] = None) -> Iterator[dict]:
+    """
+    Stream records from an XML file with ElementTree.iterparse. Each record
+    element is released as soon as it has been yielded (or rejected).
+
+    Args:
+        filename (str): Path to the XML file.
+        record_tag (str): Tag of the elements holding one record each.
+        where (RecordFilter): Only yield the records that pass this filter.
+
+    Yields:
+        dict: One record of the XML file.
+    """
+    try:
+        events = ET.iterparse(filename, events=('start', 'end'))
+    except FileNotFoundError:
+        logging.error('File not found. Exiting.')
         return
 
-    print(f'Maximum Mass: {calculate_max_mass(ml_data, "mass (g)")} g')
-    print(f'Minimum Mass: {calculate_min_mass(ml_data, "mass (g)")} g')
+    root = None
+    for event, elem in events:
+        if root is None:
+            root = elem
+        if event == 'end' and elem.tag == record_tag:
+            item = normalize_record({child.tag: child.text for child in elem})
+            root.clear()
+            if where is None or where.matches(item):
+                yield item
+
+def iter_yaml_file(filename: str, array_key: str = 'meteorite_landings',
+                   where: Optional[RecordFilter] = None) -> Iterator[dict]:
+    """
+    Read records from a YAML file, using PyYAML's C loader when it is available.
+    PyYAML has no incremental document loader, so the file is parsed as a whole.
+
+    Args:
+        filename (str): Path to the YAML file.
+        array_key (str): Key of the list holding the records.
+        where (RecordFilter): Only yield the records that pass this filter.
+
+    Yields:
+        dict: One record of the YAML file.
+    """
+    import yaml
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=loader)
+    except FileNotFoundError:
+        logging.error('File not found. Exiting.')
+        return
+    # A key present without records loads as None
+    for item in (data or {}).get(array_key) or []:
+        item = normalize_record(item)
+        if where is None or where.matches(item):
+            yield item
 
-    avg_latitude, avg_longitude = calculate_avg_latitude_longitude(ml_data)
-    print(f'Average Latitude: {avg_latitude} degrees')
-    print(f'Average Longitude: {avg_longitude} degrees')
+def iter_data_file(filename: str, where: Optional[RecordFilter] = None) -> Iterator[dict]:
+    """
+    Stream records from a CSV, JSON, XML or YAML file based on the file extension.
 
-    if len(ml_data) >= 2:  # Check if there are at least two entries for site1 and site2
-        site1 = ml_data[0]
-        site2 = ml_data[1]
+    Args:
+        filename (str): Path to the data file.
+        where (RecordFilter): Only yield the records that pass this filter. The
+                              readers evaluate it while parsing, so rejected
+                              records are never collected.
 
-        distance = calculate_distance_between_sites(site1, site2)
-        print(f'Great-circle distance between landing sites: {distance} km')
+    Yields:
+        dict: One record of the data file.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        for batch in iter_csv_batches(filename, where=where):
+            yield from batch
+    elif extension == '.json':
+        yield from iter_json_file(filename, where=where)
+    elif extension == '.xml':
+        yield from iter_xml_file(filename, where=where)
+    elif extension in ('.yaml', '.yml'):
+        yield from iter_yaml_file(filename, where=where)
     else:
+        raise ValueError(f"Unsupported file format for {filename}. Only CSV, JSON, XML and YAML are supported.")
+
+def calculate_site_pair_statistics(index: LandingSiteIndex, workers: int = None) -> dict:
+    """
+    Find the closest and farthest pair of landing sites and summarize the
+    distance from each site to its nearest neighbour. The searches use the
+    spatial index and run in parallel across worker processes.
+
+    Args:
+        index (LandingSiteIndex): Index of the landing sites.
+        workers (int): Number of worker processes (defaults to the CPU count).
+
+    Returns:
+        dict: 'closest_pair' and 'farthest_pair' as (distance_km, position1,
+              position2) tuples or None, and the mean and maximum
+              nearest-neighbour distance in kilometers (None with fewer than
+              two sites).
+    """
+    from spatial_index import farthest_pair, nearest_neighbour_distances
+
+    if len(index) < 2:
         logging.warning('Insufficient data for calculating distance between sites.')
+        return {'closest_pair': None, 'farthest_pair': None,
+                'mean_nearest_neighbour_distance': None, 'max_nearest_neighbour_distance': None}
 
-    plot_landing_sites(ml_data)
+    distances, neighbours = nearest_neighbour_distances(index, workers)
+    site = int(distances.argmin())
+    return {
+        'closest_pair': (float(distances[site]), site, int(neighbours[site])),
+        'farthest_pair': farthest_pair(index, workers),
+        'mean_nearest_neighbour_distance': float(distances.mean()),
+        'max_nearest_neighbour_distance': float(distances.max()),
+    }
 
-if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print("Usage: python scripty.py <filename>")
+def format_site(site: dict, distance_km: float = None) -> str:
+    """
+    Format a landing record as a single line of CLI output.
+
+    Args:
+        site (dict): Dictionary representing the landing site.
+        distance_km (float): Optional distance to print next to the site.
+
+    Returns:
+        str: Description of the site.
+    """
+    text = (f"{site.get('name', '?')} ({site.get('recclass', '?')}, {site.get('mass (g)', '?')} g) "
+            f"at {site.get('reclat')}, {site.get('reclong')}")
+    if distance_km is not None:
+        text += f' - {distance_km:.3f} km'
+    return text
+
+def iter_records(args: argparse.Namespace) -> Iterator[dict]:
+    """Stream the records of the data file that pass the --filter conditions (only the sample with --sample)."""
+    if getattr(args, 'sample', None):
+        return iter(draw_sample(args).records)
+    return iter_data_file(args.filename, where=args.where)
+
+def draw_sample(args: argparse.Namespace) -> LandingSample:
+    """
+    Draw the --sample of the data file in one streaming pass, stratified by
+    recclass with --stratify (memoized on args, so one run reads the file once).
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        LandingSample: The sample.
+    """
+    if getattr(args, 'landing_sample', None) is None:
+        from sampling import LandingSample
+        with profile_stage(getattr(args, 'profiler', None), 'sample'):
+            args.landing_sample = LandingSample.draw(iter_data_file(args.filename, where=args.where), args.sample,
+                                                     'recclass' if args.stratify else None, args.seed)
+        logging.info(f'Sampled {len(args.landing_sample)} of {args.landing_sample.population} records.')
+    return args.landing_sample
+
+def load_columns(args: argparse.Namespace) -> Optional[dict]:
+    """
+    Load the typed columns of the data file through the dataset cache when
+    --cache-dir is given (memoized on args, so one run loads them once). The
+    --filter conditions are applied to the cached columns as a vectorized mask.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        dict: The columns, or None when caching is off, the filter reads
+              fields that are not cached or only a --sample is analyzed.
+    """
+    if not args.cache_dir or getattr(args, 'sample', None):
+        return None
+    if getattr(args, 'columns', None) is None:
+        from dataset_cache import load_landing_columns
+        with profile_stage(getattr(args, 'profiler', None), 'load_columns'):
+            columns = load_landing_columns(args.filename, args.cache_dir, args.cache_size * 1024 ** 2,
+                                           getattr(args, 'workers', None))
+            try:
+                args.columns = filter_columns(columns, args.where)
+            except KeyError as e:
+                logging.info(f'Filter field {e} is not cached; reading {args.filename} instead.')
+                args.cache_dir = None
+                return None
+    return args.columns
+
+def site_index_from_columns(columns: dict) -> LandingSiteIndex:
+    """
+    Build the spatial index of the sites with valid coordinates in typed columns.
+
+    Args:
+        columns (dict): Columns as returned by dataset_cache.parse_landing_columns.
+
+    Returns:
+        LandingSiteIndex: Index whose `records` are aligned with query results.
+    """
+    import numpy as np
+    from dataset_cache import ColumnRecords
+    from spatial_index import LandingSiteIndex
+
+    positions = np.nonzero(~(np.isnan(columns['reclat']) | np.isnan(columns['reclong'])))[0]
+    index = LandingSiteIndex(columns['reclat'][positions], columns['reclong'][positions], positions)
+    index.records = ColumnRecords(columns, positions)
+    return index
+
+def build_site_index(args: argparse.Namespace) -> LandingSiteIndex:
+    """
+    Build the spatial index of the data file, from cached columns when available.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        LandingSiteIndex: Index whose `records` are aligned with query results.
+    """
+    from spatial_index import LandingSiteIndex
+
+    columns = load_columns(args)
+    with profile_stage(getattr(args, 'profiler', None), 'site_index'):
+        if columns is None:
+            return LandingSiteIndex.from_records(iter_records(args))
+        return site_index_from_columns(columns)
+
+def run_site_queries(args: argparse.Namespace) -> None:
+    """
+    Answer the --near/--bbox queries of the CLI using a LandingSiteIndex built
+    from the data file.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    index = build_site_index(args)
+    logging.info(f'Indexed {len(index)} landing sites.')
+    with profile_stage(args.profiler, 'site_queries'):
+        if args.near is not None:
+            lat, lon = args.near
+            if args.radius is not None:
+                distances, positions = index.query_radius(lat, lon, args.radius)
+                print(f'Landing sites within {args.radius} km of {lat}, {lon}: {len(positions)}')
+            else:
+                distances, positions = index.query_nearest(lat, lon, args.k)
+                print(f'{len(positions)} nearest landing sites to {lat}, {lon}:')
+            for distance, position in zip(distances, positions):
+                print(f'  {format_site(index.records[position], distance)}')
+
+        if args.bbox is not None:
+            positions = index.query_bbox(*args.bbox)
+            print(f'Landing sites inside latitude {args.bbox[0]}..{args.bbox[1]}, '
+                  f'longitude {args.bbox[2]}..{args.bbox[3]}: {len(positions)}')
+            for position in positions:
+                print(f'  {format_site(index.records[position])}')
+
+def run_clustering(args: argparse.Namespace) -> None:
+    """
+    Find clusters of landing sites (e.g. strewn fields) with DBSCAN, print a
+    summary of the largest ones and optionally write every site's label.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    from clustering import NOISE, dbscan, summarize_clusters
+
+    index = build_site_index(args)
+    with profile_stage(args.profiler, 'clustering'):
+        labels = dbscan(index, args.clusters, args.min_samples, args.workers)
+        summaries = summarize_clusters(index, labels)
+    print(f'Found {len(summaries)} clusters of landing sites within {args.clusters} km '
+          f'(min_samples={args.min_samples}); {int((labels == NOISE).sum())} of {len(index)} sites are noise.')
+    for summary in summaries[:10]:
+        lat, lon = summary['center']
+        classes = ', '.join(f'{recclass} ({count})' for recclass, count in summary.get('top_classes', []))
+        print(f"  Cluster {summary['cluster']}: {summary['sites']} sites around {lat:.4f}, {lon:.4f} "
+              f"(radius {summary['radius_km']:.1f} km, total mass {summary.get('total_mass', 0.0)} g) {classes}")
+
+    if args.cluster_labels:
+        with open(args.cluster_labels, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['name', 'id', 'reclat', 'reclong', 'cluster'])
+            for position, label in enumerate(labels.tolist()):
+                site = index.records[position]
+                writer.writerow([site.get('name'), site.get('id'), index.lats[position], index.lons[position], label])
+        logging.info(f'Wrote cluster labels to {args.cluster_labels}.')
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    """Arguments shared by the subcommands that analyze one data file: the file, filters, the dataset cache and profiling."""
+    parser.add_argument('filename', nargs='?', default=os.environ.get('ML_DATA_FILE', DEFAULT_DATA_FILE),
+                        help=f'Path to the CSV, JSON, XML or YAML data file (default: $ML_DATA_FILE or '
+                             f'{DEFAULT_DATA_FILE}).')
+    add_filter_argument(parser)
+    parser.add_argument('--cache-dir', default=os.environ.get('ML_CACHE_DIR'),
+                        help='Directory of the binary dataset cache (default: $ML_CACHE_DIR; off when unset).')
+    parser.add_argument('--cache-size', type=int, default=1024, metavar='MB',
+                        help='Size budget of the cache directory in megabytes.')
+    add_profile_arguments(parser)
+
+def add_filter_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--filter', action='append', metavar='EXPR',
+                        help="Only analyze records passing EXPR, e.g. 'mass > 1000', 'recclass ^= L' or "
+                             "'bbox=30,60,-10,30'. May be repeated; all filters must pass.")
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--profile', action='store_true',
+                        help='Report wall time, CPU time and peak traced memory of each stage on stderr '
+                             '(memory tracing slows allocation-heavy stages down).')
+    parser.add_argument('--profile-report', metavar='PATH',
+                        help='Write the stage report as JSON to PATH (implies --profile).')
+    parser.add_argument('--profile-dump', metavar='PATH',
+                        help='Write cProfile statistics of the whole run to PATH (implies --profile).')
+
+def add_statistics_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--class-capacity', type=int, default=None, metavar='N',
+                        help='Count classes approximately with N counters instead of exactly.')
+    parser.add_argument('--exact-quantiles', dest='quantile_k', action='store_const', const=None, default=200,
+                        help='Compute exact mass quantiles instead of sketching them (keeps every mass in memory).')
+
+def add_sample_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--sample', type=int, metavar='N',
+                        help='Analyze a random sample of N records drawn in one pass instead of every record, '
+                             'and report confidence intervals for the means.')
+    parser.add_argument('--stratify', action='store_true',
+                        help='With --sample, draw N records of every recclass (rare classes are kept whole).')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed of --sample (default: a new sample each run).')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help='Confidence level of the intervals reported with --sample.')
+
+def add_rank_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--top', type=int, metavar='K',
+                        help='Keep only the K heaviest records (of every group with --by) instead of sorting all.')
+    parser.add_argument('--by', metavar='FIELD', help="With --top, rank each value of FIELD (e.g. 'recclass') separately.")
+    parser.add_argument('--ascending', action='store_true', help='Rank the lightest records first.')
+    parser.add_argument('--memory', type=int, default=256, metavar='MB',
+                        help='Memory budget of the sort; larger inputs are sorted in runs spilled to disk.')
+    parser.add_argument('--spill-dir', metavar='DIR', help='Directory of the spilled runs (default: the temp directory).')
+    parser.add_argument('--output', metavar='PATH',
+                        help='Write the ranked records to PATH, as CSV for a .csv file and JSON lines otherwise '
+                             '(default: print them).')
+
+def add_workers_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes used for parsing large CSV files and the site pair search '
+                             '(default: all cores).')
+
+def add_plot_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--density', action='store_true',
+                        help='Draw a binned density raster instead of scattering every site.')
+    parser.add_argument('--bins', nargs=2, type=int, default=(180, 360), metavar=('LAT_BINS', 'LON_BINS'),
+                        help='Size of the density grid (default: 180 360, one-degree cells).')
+    parser.add_argument('--density-cache', metavar='PATH',
+                        help='Reuse the binned grid stored at PATH (written on first use).')
+    parser.add_argument('--color-scale', choices=('log', 'sqrt', 'linear'), default='log',
+                        help='Color scale of the density raster.')
+    parser.add_argument('--show', action='store_true', help='Open the scatter plot in a window.')
+    parser.add_argument('--output', metavar='PATH',
+                        help='Image file (default: meteorite_landing_sites.png or meteorite_landing_density.png).')
+
+def add_query_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--near', nargs=2, type=float, metavar=('LAT', 'LON'),
+                        help='List the landing sites nearest to this point.')
+    parser.add_argument('-k', type=int, default=5, help='Number of sites listed by --near.')
+    parser.add_argument('--radius', type=float, metavar='KM',
+                        help='With --near, list every site within this distance instead.')
+    parser.add_argument('--bbox', nargs=4, type=float, metavar=('MIN_LAT', 'MAX_LAT', 'MIN_LON', 'MAX_LON'),
+                        help='List the landing sites inside this latitude/longitude box.')
+
+def add_cluster_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--min-samples', type=int, default=5,
+                        help='Sites within EPS_KM (itself included) needed for a core site of a cluster.')
+    parser.add_argument('--cluster-labels', metavar='PATH',
+                        help='Write the cluster label of every site to this CSV file (-1 is noise).')
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line parser. Each subcommand computes only what it
+    prints; 'all' (also used when no subcommand is given) runs the complete
+    analysis with the flags of the original script.
+    """
+    parser = argparse.ArgumentParser(description='Analyze meteorite landing data from a CSV, JSON, XML or YAML file.')
+    subcommands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    stats = subcommands.add_parser('stats', help='Print the summary statistics.')
+    add_common_arguments(stats)
+    add_statistics_arguments(stats)
+    add_sample_arguments(stats)
+
+    distance = subcommands.add_parser('distance', help='Find the closest and farthest pair of landing sites, '
+                                                       'or the distance between two points.')
+    add_common_arguments(distance)
+    add_workers_argument(distance)
+    distance.add_argument('--between', nargs=4, type=float, metavar=('LAT1', 'LON1', 'LAT2', 'LON2'),
+                          help='Print the great-circle distance between two points without reading any data.')
+
+    plot = subcommands.add_parser('plot', help='Plot the landing sites as a scatter plot or density raster.')
+    add_common_arguments(plot)
+    add_plot_arguments(plot)
+    add_sample_arguments(plot)
+
+    nearest = subcommands.add_parser('nearest', help='List the landing sites near a point or inside a box.')
+    add_common_arguments(nearest)
+    add_query_arguments(nearest)
+
+    clusters = subcommands.add_parser('clusters', help='Find clusters of landing sites (DBSCAN).')
+    add_common_arguments(clusters)
+    clusters.add_argument('clusters', type=float, metavar='EPS_KM', help='Neighbourhood radius in kilometers.')
+    add_cluster_arguments(clusters)
+    add_workers_argument(clusters)
+
+    rank = subcommands.add_parser('rank', help='List the records by mass: all of them (sorted out of core) '
+                                               'or the heaviest K per group.')
+    add_common_arguments(rank)
+    add_rank_arguments(rank)
+
+    update = subcommands.add_parser('update', help='Fold new records into a saved aggregate state and print '
+                                                   'the refreshed statistics.')
+    update.add_argument('state', help='State file (created on first use).')
+    update.add_argument('files', nargs='+', metavar='FILE',
+                        help='Data files. Files folded in before are skipped if unchanged; CSV files that grew '
+                             'are read from where the last update stopped.')
+    add_filter_argument(update)
+    add_statistics_arguments(update)
+    add_profile_arguments(update)
+
+    everything = subcommands.add_parser('all', help='Run the complete analysis (the default).')
+    add_common_arguments(everything)
+    add_statistics_arguments(everything)
+    add_sample_arguments(everything)
+    add_workers_argument(everything)
+    add_plot_arguments(everything)
+    add_query_arguments(everything)
+    everything.add_argument('--clusters', type=float, metavar='EPS_KM',
+                            help='Find clusters of landing sites (DBSCAN) with this neighbourhood radius.')
+    add_cluster_arguments(everything)
+    return parser
+
+def main(argv: Optional[List[str]] = None):
+    logging.basicConfig(level=logging.DEBUG)
+
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Without a subcommand the original command line runs the complete analysis
+    if not argv or (argv[0] not in SUBCOMMANDS and argv[0] not in ('-h', '--help')):
+        argv = ['all'] + argv
+    args = parser.parse_args(argv)
+    try:
+        args.where = RecordFilter.parse(args.filter)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.command == 'nearest' and args.near is None and args.bbox is None:
+        parser.error('nearest needs --near LAT LON or --bbox MIN_LAT MAX_LAT MIN_LON MAX_LON.')
+    if getattr(args, 'sample', None) is not None and (args.sample < 1 or not 0 < args.confidence < 1):
+        parser.error('--sample needs a positive size and --confidence a level between 0 and 1.')
+    if getattr(args, 'top', None) is not None and args.top < 1:
+        parser.error('--top needs a positive number of records.')
+
+    args.profiler = None
+    if args.profile or args.profile_report or args.profile_dump:
+        from profiling import StageProfiler
+        args.profiler = StageProfiler(cprofile=args.profile_dump is not None)
+        args.profiler.start()
+    try:
+        COMMANDS[args.command](args)
+    finally:
+        if args.profiler is not None:
+            args.profiler.stop()
+            print(args.profiler.format_table(), file=sys.stderr)
+            if args.profile_report:
+                args.profiler.write_report(args.profile_report)
+            if args.profile_dump:
+                args.profiler.dump_cprofile(args.profile_dump)
+
+def run_statistics(args: argparse.Namespace) -> Optional[dict]:
+    """
+    Compute and print the summary statistics of the data file.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        dict: The summary, or None when the file holds no data.
+    """
+    columns = load_columns(args)
+    # Without the dataset cache the file is parsed while the statistics are computed
+    with profile_stage(args.profiler, 'statistics' if columns is not None else 'read_and_statistics'):
+        if columns is not None:
+            summary = summarize_columns(columns, args.class_capacity, args.quantile_k)
+        else:
+            summary = summarize_landings(iter_records(args), class_capacity=args.class_capacity,
+                                         quantile_k=args.quantile_k)
+
+    if not summary['count']:
+        logging.warning('No data found in the data file. Exiting.')
+        return None
+
+    sample = draw_sample(args) if getattr(args, 'sample', None) else None
+    if sample is None:
+        print_summary(summary)
+    elif sample.stratify_by is None:
+        print_summary(summary, label='Sample ')
+    # Unweighted statistics of a stratified sample are biased, so only its estimates are printed
+    if sample is not None:
+        print_sample_estimates(sample, args.confidence)
+    if summary['distance_between_first_sites'] is not None:
+        sites = 'landing sites' if sample is None else 'sampled landing sites'
+        print(f'Great-circle distance between {sites}: {summary["distance_between_first_sites"]} km')
+    else:
+        logging.warning('Insufficient data for calculating distance between sites.')
+    return summary
+
+def print_summary(summary: dict, label: str = '') -> None:
+    """
+    Print the main summary statistics (see LandingAggregate.summary).
+
+    Args:
+        summary (dict): The summary.
+        label (str): Prefix of every statistic, e.g. 'Sample ' for the statistics of a sample.
+    """
+    print(f'{label}Maximum Mass: {summary["max_mass"]} g')
+    print(f'{label}Minimum Mass: {summary["min_mass"]} g')
+    approximate = '' if summary['mass_quantiles_exact'] else '~'
+    print(f'{label}Median Mass: {approximate}{summary["median_mass"]} g')
+    print(f'{label}90th / 99th Percentile Mass: {approximate}{summary["p90_mass"]} / {approximate}{summary["p99_mass"]} g')
+
+    print(f'{label}Average Latitude: {summary["avg_latitude"]} degrees')
+    print(f'{label}Average Longitude: {summary["avg_longitude"]} degrees')
+
+    print(f'{label}Most common classes:')
+    for recclass, count in list(summary['recclass_occurrences'].items())[:5]:
+        if 'recclass_error_bounds' in summary:
+            print(f'  {recclass}: {count - summary["recclass_error_bounds"][recclass]}..{count}')
+        else:
+            print(f'  {recclass}: {count}')
+
+def print_sample_estimates(sample: LandingSample, confidence: float) -> None:
+    """Print the size of a sample and the confidence intervals of the population means it estimates."""
+    strata = f' ({len(sample.strata)} recclass strata)' if sample.stratify_by else ''
+    print(f'Statistics of a random sample of {len(sample)} of {sample.population} records{strata}.')
+    labels = {'average_mass': ('Average Mass', 'g'), 'avg_latitude': ('Average Latitude', 'degrees'),
+              'avg_longitude': ('Average Longitude', 'degrees')}
+    for key, estimate in sample.confidence_intervals(confidence).items():
+        if estimate is not None:
+            label, unit = labels[key]
+            print(f'Estimated {label}: {estimate["mean"]} {unit} '
+                  f'({confidence:.0%} CI {estimate["low"]} to {estimate["high"]})')
+    if sample.stratify_by:
+        # Every record is counted in its stratum, so the class counts are exact
+        print('Most common classes:')
+        for recclass, count in sorted(sample.counts.items(), key=lambda item: -item[1])[:5]:
+            print(f'  {recclass}: {count}')
+
+def run_rank(args: argparse.Namespace) -> None:
+    """
+    Rank the records by mass: the --top K of every --by group, found with one
+    bounded heap per group, or the whole file sorted within the --memory
+    budget. The ranked records are printed or written to --output.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    from ranking import external_sort, top_k
+
+    if args.top is not None:
+        with profile_stage(args.profiler, 'top_k'):
+            groups = top_k(iter_records(args), args.top, args.by, args.ascending)
+        ranked = ((rank, item) for group in sorted(groups, key=str)
+                  for rank, item in enumerate(groups[group], start=1))
+    else:
+        ranked = enumerate(external_sort(iter_records(args), args.memory * 1024 ** 2, args.spill_dir,
+                                         args.ascending), start=1)
+    with profile_stage(args.profiler, 'rank_output'):
+        count = write_ranked(ranked, args.output, args.by if args.top is not None else None)
+    if args.output:
+        logging.info(f'Wrote {count} ranked records to {args.output}.')
+
+def write_ranked(ranked: Iterable[Tuple[int, dict]], output: Optional[str] = None,
+                 group_by: Optional[str] = None) -> int:
+    """
+    Print ranked records, or write them with their rank to a CSV (.csv) or JSON lines file.
+
+    Args:
+        ranked (Iterable[Tuple[int, dict]]): (rank, record) pairs.
+        output (str): Output file (None prints the records).
+        group_by (str): Field the records were ranked within; printed records
+                        are headed by the group they belong to.
+
+    Returns:
+        int: Number of records written.
+    """
+    count = 0
+    if output is None:
+        for rank, item in ranked:
+            if group_by is not None and rank == 1:
+                print(f'{group_by}: {item.get(group_by)}')
+            print(f'{rank}. {format_site(item)}')
+            count += 1
+        return count
+
+    with open(output, 'w', encoding='utf-8', newline='') as f:
+        writer = None
+        for rank, item in ranked:
+            if not output.lower().endswith('.csv'):
+                f.write(json.dumps(dict(rank=rank, **item)) + '\n')
+            else:
+                if writer is None:
+                    # Records of one data file share their fields
+                    writer = csv.DictWriter(f, ['rank'] + list(item), restval='', extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow(dict(item, rank=rank))
+            count += 1
+    return count
+
+def run_update(args: argparse.Namespace) -> None:
+    """
+    Fold the new records of the given files into the saved aggregate state
+    and print the statistics of everything folded so far. Only the new
+    records are read, so a daily update costs time proportional to the day's
+    data rather than the whole catalogue.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    from aggregate_state import AggregateState
+
+    try:
+        state = AggregateState.load_or_create(args.state, args.class_capacity, args.quantile_k, args.filter)
+        with profile_stage(args.profiler, 'update'):
+            added = state.update(args.files)
+    except ValueError as e:
+        logging.error(str(e))
         sys.exit(1)
-    main()
+    state.save(args.state)
+    logging.info(f'Folded {added} new records into {args.state}; {state.aggregate.count} records in total.')
+    if state.aggregate.count:
+        print_summary(state.aggregate.summary())
+
+def run_site_pairs(args: argparse.Namespace) -> None:
+    """
+    Print the closest and farthest pair of landing sites and the
+    nearest-neighbour distances, or with --between the distance between two
+    points.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    if getattr(args, 'between', None) is not None:
+        print(f'Great-circle distance: {calculate_great_circle_distance(*args.between)} km')
+        return
 
+    index = build_site_index(args)
+    with profile_stage(args.profiler, 'site_pairs'):
+        pairs = calculate_site_pair_statistics(index, args.workers)
+    if pairs['closest_pair'] is not None:
+        for label, (distance, position1, position2) in (('Closest', pairs['closest_pair']),
+                                                        ('Farthest', pairs['farthest_pair'])):
+            print(f'{label} pair of landing sites: {index.records[position1].get("name")} and '
+                  f'{index.records[position2].get("name")}, {distance} km apart')
+        print(f'Mean nearest-neighbour distance: {pairs["mean_nearest_neighbour_distance"]} km')
+        print(f'Maximum nearest-neighbour distance: {pairs["max_nearest_neighbour_distance"]} km')
+
+def run_plot(args: argparse.Namespace) -> None:
+    """
+    Draw the landing sites as a density raster (--density) or a scatter plot.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    if args.density:
+        render_density_map(args)
+        return
+    from dataset_cache import ColumnRecords
+
+    columns = load_columns(args)
+    with profile_stage(args.profiler, 'scatter_plot'):
+        plot_landing_sites(ColumnRecords(columns) if columns is not None else iter_records(args),
+                           show=args.show, output=args.output or 'meteorite_landing_sites.png')
+
+def run_analysis(args: argparse.Namespace) -> None:
+    """
+    Run the complete analysis of the original command line: site queries,
+    clustering, or the summary statistics followed by the site pair search
+    and a plot.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    if args.near is not None or args.bbox is not None:
+        run_site_queries(args)
+        return
+    if args.clusters is not None:
+        run_clustering(args)
+        return
+
+    print("Current working directory:", os.getcwd())  # Add this line
+    if run_statistics(args) is None:
+        return
+    run_site_pairs(args)
+    run_plot(args)
+
+def render_density_map(args: argparse.Namespace) -> None:
+    """
+    Bin the data file into a density grid (or reuse the cached grid) and
+    render it.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+    """
+    lat_bins, lon_bins = args.bins
+    grid = None
+    # A grid of a sample must not stand in for the grid of the whole file
+    density_cache = args.density_cache if not getattr(args, 'sample', None) else None
+    if density_cache:
+        source = density_grid_source(args.filename, lat_bins, lon_bins)
+        if args.where is not None:
+            source += f' where {args.where}'
+        grid = load_density_grid(density_cache, source)
+    if grid is None:
+        columns = load_columns(args)
+        with profile_stage(args.profiler, 'density_grid'):
+            if columns is not None:
+                grid = density_grid_from_coordinates(columns['reclat'], columns['reclong'], lat_bins, lon_bins)
+            else:
+                grid = compute_density_grid(iter_records(args), lat_bins, lon_bins)
+        if density_cache:
+            save_density_grid(density_cache, grid, source)
+    with profile_stage(args.profiler, 'density_plot'):
+        plot_landing_density(grid, output=args.output or 'meteorite_landing_density.png',
+                             color_scale=args.color_scale)
+
+SUBCOMMANDS = ('stats', 'distance', 'plot', 'nearest', 'clusters', 'rank', 'update', 'all')
+COMMANDS = {'stats': run_statistics, 'distance': run_site_pairs, 'plot': run_plot, 'nearest': run_site_queries,
+            'clusters': run_clustering, 'rank': run_rank, 'update': run_update, 'all': run_analysis}
+
+if __name__ == '__main__':
+    main()
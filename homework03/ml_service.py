@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+from flask import Flask, jsonify, request
+from dataset_cache import load_landing_columns, parse_landing_columns
+from filters import RecordFilter, filter_columns
+from great_circle_distance import calculate_great_circle_distance
+from ml_data_analysis import DEFAULT_DATA_FILE, iter_data_file, site_index_from_columns, summarize_columns
+
+# Query results kept per service (least recently used are dropped first)
+RESULT_CACHE_SIZE = 4096
+# Query points accepted by one /batch request
+MAX_BATCH_POINTS = 10000
+# Sites listed by default in the response of a radius query
+DEFAULT_RADIUS_LIMIT = 100
+
+app = Flask(__name__)
+
+class QueryError(ValueError):
+    """A request with missing or invalid parameters (answered with 400)."""
+
+class LandingService:
+    """
+    A data file held in memory between requests. Its typed columns and spatial
+    index are built once per dataset version, the size and modification time
+    of the file, and rebuilt by the first request after the file changes.
+    Query results are cached under the version they were computed from, so a
+    reload never serves results of the old data.
+    """
+
+    def __init__(self, filename: str, cache_dir: Optional[str] = None, filters: Optional[List[str]] = None,
+                 class_capacity: Optional[int] = None, quantile_k: Optional[int] = 200,
+                 cache_size: int = RESULT_CACHE_SIZE):
+        """
+        Args:
+            filename (str): CSV, JSON, XML or YAML data file.
+            cache_dir (str): Directory of the binary dataset cache (None parses the file).
+            filters (List[str]): Filter expressions every served record passes.
+            class_capacity (int): Class counters of the statistics (None counts exactly).
+            quantile_k (int): Mass quantile sketch size of the statistics (None is exact).
+            cache_size (int): Number of query results kept.
+        """
+        self.filename = filename
+        self.cache_dir = cache_dir
+        self.where = RecordFilter.parse(filters)
+        self.class_capacity = class_capacity
+        self.quantile_k = quantile_k
+        self.cache_size = cache_size
+        self.version = None
+        self.columns = None
+        self.index = None
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def current_version(self) -> str:
+        """Version of the data file on disk."""
+        stat = os.stat(self.filename)
+        return f'{stat.st_size}-{stat.st_mtime_ns}'
+
+    def refresh(self) -> str:
+        """Load the data file if it changed since it was last loaded, and return its version."""
+        version = self.current_version()
+        if version == self.version:
+            return version
+        with self._lock:
+            if version != self.version:
+                columns = load_landing_columns(self.filename, self.cache_dir)
+                try:
+                    columns = filter_columns(columns, self.where)
+                except KeyError:
+                    columns = parse_landing_columns(iter_data_file(self.filename, where=self.where))
+                self.columns, self.index = columns, site_index_from_columns(columns)
+                self.version = version
+                self._results.clear()
+                logging.info(f'Loaded {len(columns["mass"])} records of {self.filename} (version {version}).')
+        return version
+
+    def cached(self, key: tuple, compute: Callable[[], object]):
+        """
+        Return the cached result of a query on the current version, computing
+        and caching it on a miss.
+
+        Args:
+            key (tuple): Query name and parameters.
+            compute (Callable): Computes the result from the loaded data.
+        """
+        key = (self.refresh(),) + key
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        result = compute()
+        with self._lock:
+            if key[0] == self.version:
+                self._results[key] = result
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return result
+
+    def _sites(self, distances, positions) -> List[dict]:
+        return [dict(self.index.records[position], distance_km=float(distance))
+                for distance, position in zip(distances, positions) if position >= 0]
+
+    def stats(self) -> dict:
+        """Summary statistics of the loaded records (see summarize_landings)."""
+        return self.cached(('stats',), lambda: summarize_columns(self.columns, self.class_capacity,
+                                                                 self.quantile_k))
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[dict]:
+        """The k landing sites nearest to a point, nearest first, with their 'distance_km'."""
+        return self.cached(('nearest', lat, lon, k), lambda: self._sites(*self.index.query_nearest(lat, lon, k)))
+
+    def radius(self, lat: float, lon: float, radius_km: float) -> List[dict]:
+        """The landing sites within radius_km of a point, nearest first, with their 'distance_km'."""
+        def compute():
+            distances, positions = self.index.query_radius(lat, lon, radius_km)
+            order = distances.argsort(kind='stable')
+            return self._sites(distances[order], positions[order])
+        return self.cached(('radius', lat, lon, radius_km), compute)
+
+    def nearest_many(self, points: List[tuple], k: int = 1) -> List[List[dict]]:
+        """nearest() for many (lat, lon) points, one list of sites per point."""
+        lats, lons = [lat for lat, _ in points], [lon for _, lon in points]
+        return self.cached(('nearest_many', tuple(points), k), lambda: [
+            self._sites(distances, positions)
+            for distances, positions in zip(*self.index.query_nearest_many(lats, lons, k))])
+
+    def radius_counts(self, points: List[tuple], radius_km: float) -> List[int]:
+        """Number of landing sites within radius_km of each (lat, lon) point, in one batched tree walk."""
+        def compute():
+            offsets, _ = self.index.query_radius_many([lat for lat, _ in points], [lon for _, lon in points],
+                                                      radius_km)
+            return (offsets[1:] - offsets[:-1]).tolist()
+        return self.cached(('radius_counts', tuple(points), radius_km), compute)
+
+def get_service() -> LandingService:
+    """The service of the app, created from $ML_DATA_FILE and $ML_CACHE_DIR on first use."""
+    if 'LANDING_SERVICE' not in app.config:
+        app.config['LANDING_SERVICE'] = LandingService(os.environ.get('ML_DATA_FILE', DEFAULT_DATA_FILE),
+                                                       os.environ.get('ML_CACHE_DIR'))
+    return app.config['LANDING_SERVICE']
+
+def _number(value, name: str, kind: type = float, low: float = None, high: float = None):
+    """Convert a request parameter, raising QueryError if it is missing or out of range."""
+    if value is None:
+        raise QueryError(f'Missing parameter {name!r}.')
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise QueryError(f'Parameter {name!r} must be a {kind.__name__}, got {value!r}.')
+    if number != number or (low is not None and number < low) or (high is not None and number > high):
+        raise QueryError(f'Parameter {name!r} must be between {low} and {high}, got {value!r}.')
+    return number
+
+def _point(values, lat_name: str = 'lat', lon_name: str = 'lon') -> tuple:
+    return (_number(values.get(lat_name), lat_name, low=-90, high=90),
+            _number(values.get(lon_name), lon_name, low=-180, high=180))
+
+@app.errorhandler(QueryError)
+def query_error(e):
+    return jsonify({'error': str(e)}), 400
+
+@app.route('/version', methods=['GET'])
+def get_version():
+    """
+    Report the loaded data file, its version and the number of records and indexed sites.
+    """
+    service = get_service()
+    version = service.refresh()
+    return jsonify({'filename': service.filename, 'version': version,
+                    'records': len(service.columns['mass']), 'sites': len(service.index)})
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """
+    Return the summary statistics of the data file.
+    """
+    return jsonify(get_service().stats())
+
+@app.route('/nearest', methods=['GET'])
+def get_nearest():
+    """
+    Return the k (default 1) landing sites nearest to lat, lon.
+    """
+    lat, lon = _point(request.args)
+    k = _number(request.args.get('k', 1), 'k', int, low=1, high=MAX_BATCH_POINTS)
+    return jsonify({'lat': lat, 'lon': lon, 'sites': get_service().nearest(lat, lon, k)})
+
+@app.route('/radius', methods=['GET'])
+def get_radius():
+    """
+    Return the number of landing sites within km kilometers of lat, lon and
+    the nearest `limit` (default 100) of them.
+    """
+    lat, lon = _point(request.args)
+    radius_km = _number(request.args.get('km'), 'km', low=0)
+    limit = _number(request.args.get('limit', DEFAULT_RADIUS_LIMIT), 'limit', int, low=0)
+    sites = get_service().radius(lat, lon, radius_km)
+    return jsonify({'lat': lat, 'lon': lon, 'km': radius_km, 'count': len(sites), 'sites': sites[:limit]})
+
+@app.route('/distance', methods=['GET'])
+def get_distance():
+    """
+    Return the great-circle distance in kilometers between lat1, lon1 and lat2, lon2.
+    """
+    lat1, lon1 = _point(request.args, 'lat1', 'lon1')
+    lat2, lon2 = _point(request.args, 'lat2', 'lon2')
+    return jsonify({'distance_km': calculate_great_circle_distance(lat1, lon1, lat2, lon2)})
+
+@app.route('/batch', methods=['POST'])
+def post_batch():
+    """
+    Answer one query for many points. The JSON body holds 'points', a list
+    of [lat, lon] pairs, and either 'k' (the nearest k sites of every point)
+    or 'km' (the number of sites within km of every point).
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get('points'), list):
+        raise QueryError("The body must be a JSON object with a 'points' list of [lat, lon] pairs.")
+    if len(body['points']) > MAX_BATCH_POINTS:
+        raise QueryError(f'At most {MAX_BATCH_POINTS} points are accepted per batch.')
+    points = []
+    for point in body['points']:
+        if not isinstance(point, (list, tuple)) or len(point) != 2:
+            raise QueryError(f'Points must be [lat, lon] pairs, got {point!r}.')
+        points.append(_point({'lat': point[0], 'lon': point[1]}))
+
+    service = get_service()
+    if 'km' in body:
+        radius_km = _number(body['km'], 'km', low=0)
+        return jsonify({'km': radius_km, 'counts': service.radius_counts(points, radius_km)})
+    k = _number(body.get('k', 1), 'k', int, low=1, high=MAX_BATCH_POINTS)
+    return jsonify({'k': k, 'sites': service.nearest_many(points, k)})
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve meteorite landing queries from a dataset held in memory.')
+    parser.add_argument('filename', nargs='?', default=os.environ.get('ML_DATA_FILE', DEFAULT_DATA_FILE),
+                        help=f'Path to the CSV, JSON, XML or YAML data file (default: $ML_DATA_FILE or '
+                             f'{DEFAULT_DATA_FILE}).')
+    parser.add_argument('--filter', action='append', metavar='EXPR',
+                        help='Only serve records passing EXPR (see ml_data_analysis.py). May be repeated.')
+    parser.add_argument('--cache-dir', default=os.environ.get('ML_CACHE_DIR'),
+                        help='Directory of the binary dataset cache (default: $ML_CACHE_DIR; off when unset).')
+    parser.add_argument('--host', default='0.0.0.0', help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on.')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    try:
+        service = LandingService(args.filename, args.cache_dir, args.filter)
+    except ValueError as e:
+        parser.error(str(e))
+    # Load before the first request so that it is answered from memory too
+    service.refresh()
+    app.config['LANDING_SERVICE'] = service
+    app.run(debug=False, host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
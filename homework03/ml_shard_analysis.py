@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, reduce
+from typing import List, Optional
+from aggregates import LandingAggregate
+from filters import RecordFilter
+from ml_data_analysis import iter_data_file
+
+def analyze_shard(filename: str, class_capacity: Optional[int] = None,
+                  quantile_k: Optional[int] = 200, where: Optional[RecordFilter] = None) -> LandingAggregate:
+    """
+    Compute the partial aggregate of one shard file.
+
+    Args:
+        filename (str): Path to a CSV, JSON, XML or YAML shard.
+        class_capacity (int): Space-Saving counters for the class counts
+                              (None counts exactly).
+        quantile_k (int): Accuracy parameter of the mass quantile sketch
+                          (None computes exact quantiles).
+        where (RecordFilter): Only aggregate the records passing this filter.
+
+    Returns:
+        LandingAggregate: Aggregate of the shard's records.
+    """
+    aggregate = LandingAggregate(class_capacity=class_capacity, quantile_k=quantile_k)
+    return aggregate.update(iter_data_file(filename, where=where))
+
+def analyze_shards(filenames: List[str], workers: Optional[int] = None,
+                   class_capacity: Optional[int] = None, quantile_k: Optional[int] = 200,
+                   where: Optional[RecordFilter] = None) -> LandingAggregate:
+    """
+    Fan the shard files out to a process pool, where each worker computes the
+    partial aggregate of one shard, and reduce the partial aggregates into one.
+
+    Args:
+        filenames (List[str]): Paths of the shard files.
+        workers (int): Number of worker processes. Defaults to the number of
+                       CPU cores; 1 analyzes the shards in the current process.
+        class_capacity (int): Count classes approximately with this many
+                              Space-Saving counters per shard, which keeps
+                              memory bounded however many distinct classes
+                              the shards hold. None counts exactly.
+        quantile_k (int): Accuracy parameter of the per-shard mass quantile
+                          sketches, which merge into one; None keeps every
+                          mass for exact quantiles.
+        where (RecordFilter): Only aggregate the records passing this filter;
+                              each worker applies it while parsing its shard.
+
+    Returns:
+        LandingAggregate: Aggregate of all shards.
+    """
+    workers = min(workers or os.cpu_count() or 1, max(len(filenames), 1))
+    task = partial(analyze_shard, class_capacity=class_capacity, quantile_k=quantile_k, where=where)
+    initial = LandingAggregate(class_capacity=class_capacity, quantile_k=quantile_k)
+    if workers == 1:
+        partials = map(task, filenames)
+        return reduce(LandingAggregate.merge, partials, initial)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = executor.map(task, filenames)
+        return reduce(LandingAggregate.merge, partials, initial)
+
+def expand_shard_paths(patterns: List[str]) -> List[str]:
+    """
+    Expand glob patterns (e.g. 'shards/*.csv') into a sorted list of files;
+    arguments without wildcards are kept as they are.
+
+    Args:
+        patterns (List[str]): File names or glob patterns.
+
+    Returns:
+        List[str]: Paths of the shard files.
+    """
+    filenames = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        filenames.extend(matches if matches else [pattern])
+    return filenames
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute summary statistics over many meteorite data shards in parallel.')
+    parser.add_argument('shards', nargs='+', help='Shard files (CSV, JSON, XML or YAML) or glob patterns.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes (default: all cores).')
+    parser.add_argument('--class-capacity', type=int, default=None, metavar='N',
+                        help='Count classes approximately with N counters per shard instead of exactly.')
+    parser.add_argument('--exact-quantiles', dest='quantile_k', action='store_const', const=None, default=200,
+                        help='Compute exact mass quantiles instead of sketching them.')
+    parser.add_argument('--filter', action='append', metavar='EXPR',
+                        help="Only aggregate records passing EXPR, e.g. 'mass > 1000' or 'recclass ^= L'. May be repeated.")
+    args = parser.parse_args()
+    try:
+        where = RecordFilter.parse(args.filter)
+    except ValueError as e:
+        parser.error(str(e))
+
+    filenames = expand_shard_paths(args.shards)
+    logging.info(f'Analyzing {len(filenames)} shards.')
+    aggregate = analyze_shards(filenames, args.workers, args.class_capacity, args.quantile_k, where)
+
+    print(json.dumps(aggregate.summary(), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+import csv
+import io
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from dataset_cache import FLOAT_COLUMNS, RECORD_KEYS, TEXT_COLUMNS, to_float
+from filters import RecordFilter
+
+# Bytes per parsed range; files smaller than this are parsed in the current process
+DEFAULT_CHUNK_BYTES = 16 << 20
+_SCAN_BYTES = 1 << 16
+_QUOTE_OR_NEWLINE = re.compile(rb'["\n]')
+
+def count_quotes(filename: str, start: int, end: int) -> int:
+    """Number of double quote characters in bytes [start, end) of a file."""
+    count = 0
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        while start < end:
+            block = f.read(min(_SCAN_BYTES, end - start))
+            if not block:
+                break
+            count += block.count(b'"')
+            start += len(block)
+    return count
+
+def next_record_start(filename: str, offset: int, quoted: bool) -> int:
+    """
+    Find the start of the first record after a byte offset: the byte after the
+    first newline that is not inside a quoted field. Quoted fields may hold
+    newlines, so whether offset lies inside one must be known; it does when an
+    odd number of quotes precede it (an escaped quote "" counts twice).
+
+    Args:
+        filename (str): CSV file.
+        offset (int): Byte offset to search from.
+        quoted (bool): Whether offset lies inside a quoted field.
+
+    Returns:
+        int: Offset of the next record, or the file size if there is none.
+    """
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        for block in iter(lambda: f.read(_SCAN_BYTES), b''):
+            for match in _QUOTE_OR_NEWLINE.finditer(block):
+                if match.group() == b'"':
+                    quoted = not quoted
+                elif not quoted:
+                    return offset + match.end()
+            offset += len(block)
+    return offset
+
+def split_csv_ranges(filename: str, n_ranges: int,
+                     workers: Optional[int] = None) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Split the records of a CSV file into about n_ranges byte ranges that
+    start and end on record boundaries. The quotes of the nominal ranges are
+    counted in parallel; their running parity tells whether each nominal
+    split point lies inside a quoted field, and the split is moved forward to
+    the next record from there.
+
+    Args:
+        filename (str): CSV file.
+        n_ranges (int): Number of nominal ranges.
+        workers (int): Worker processes used to count quotes (1 counts them in
+                       the current process).
+
+    Returns:
+        Tuple[List[str], List[Tuple[int, int]]]: The header row and the
+        (start, end) byte ranges of the records after it.
+    """
+    size = os.path.getsize(filename)
+    header_end = next_record_start(filename, 0, False)
+    with open(filename, 'rb') as f:
+        header = next(csv.reader([f.read(header_end).decode('utf-8').rstrip('\r\n')]), [])
+
+    n_ranges = max(1, min(n_ranges, size - header_end))
+    nominal = [header_end + (size - header_end) * i // n_ranges for i in range(n_ranges + 1)]
+    spans = list(zip(nominal[:-1], nominal[1:]))
+    if n_ranges == 1 or workers == 1:
+        counts = [count_quotes(filename, start, end) for start, end in spans]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, n_ranges)) as executor:
+            counts = list(executor.map(count_quotes, [filename] * n_ranges, *zip(*spans)))
+
+    boundaries = [header_end]
+    quotes = counts[0]
+    for split, count in zip(nominal[1:-1], counts[1:]):
+        start = next_record_start(filename, split, quotes % 2 == 1)
+        # A record longer than a range swallows the split points inside it
+        if start > boundaries[-1]:
+            boundaries.append(start)
+        quotes += count
+    boundaries.append(size)
+    ranges = [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+    return header, ranges
+
+def parse_csv_range(filename: str, start: int, end: int, header: List[str],
+                    where: Optional[RecordFilter] = None) -> Dict[str, np.ndarray]:
+    """
+    Parse the records in bytes [start, end) of a CSV file into typed columns
+    (see dataset_cache.parse_landing_columns).
+
+    Args:
+        filename (str): CSV file.
+        start, end (int): Byte range on record boundaries (see split_csv_ranges).
+        header (List[str]): Header row of the file.
+        where (RecordFilter): Only keep the rows that pass this filter.
+
+    Returns:
+        Dict[str, np.ndarray]: Columns of the records in the range.
+    """
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    rows = csv.reader(io.StringIO(text, newline=''))
+    matches = where.row_matcher(header) if where is not None else None
+    positions = {column: header.index(key) if key in header else None for column, key in RECORD_KEYS.items()}
+    values = {column: [] for column in TEXT_COLUMNS + FLOAT_COLUMNS}
+    for row in rows:
+        if not row or (matches is not None and not matches(row)):
+            continue
+        for column, position in positions.items():
+            value = row[position] if position is not None and position < len(row) else None
+            values[column].append(to_float(value) if column in FLOAT_COLUMNS else value or '')
+    columns = {column: np.array(values[column], dtype=str) for column in TEXT_COLUMNS}
+    columns.update({column: np.array(values[column], dtype=float) for column in FLOAT_COLUMNS})
+    return columns
+
+def parse_csv_columns(filename: str, workers: Optional[int] = None, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                      where: Optional[RecordFilter] = None) -> Dict[str, np.ndarray]:
+    """
+    Parse a CSV file into typed columns with a process pool: the file is split
+    into byte ranges on record boundaries, each worker parses ranges of about
+    chunk_bytes into column chunks, and the chunks are concatenated in file
+    order. The result equals parse_landing_columns(iter_data_file(filename)).
+
+    Args:
+        filename (str): CSV file.
+        workers (int): Number of worker processes. Defaults to the number of
+                       CPU cores; 1 parses the file in the current process.
+        chunk_bytes (int): Approximate size of each parsed range, which bounds
+                           the memory a worker holds at once.
+        where (RecordFilter): Only keep the rows that pass this filter.
+
+    Returns:
+        Dict[str, np.ndarray]: Columns as returned by parse_landing_columns.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_ranges = -(-os.path.getsize(filename) // chunk_bytes)
+    if n_ranges > 1:
+        # At least one range per worker, so that every core is used
+        n_ranges = max(n_ranges, workers)
+    header, ranges = split_csv_ranges(filename, n_ranges, workers)
+    task = partial(parse_csv_range, filename, header=header, where=where)
+    if workers == 1 or len(ranges) <= 1:
+        chunks = [task(start, end) for start, end in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+            chunks = list(executor.map(task, *zip(*ranges)))
+    logging.info(f'Parsed {filename} in {len(ranges)} ranges with {workers} workers.')
+    if not chunks:
+        return task(0, 0)
+    return {column: np.concatenate([chunk[column] for chunk in chunks]) for column in chunks[0]}
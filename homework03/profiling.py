@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import cProfile
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+
+def _children_cpu_seconds() -> float:
+    """User plus system time of terminated child processes (e.g. pool workers)."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+class StageProfiler:
+    """
+    Measures the stages of a run: wall time, CPU time (this process plus
+    worker processes that finished during the stage) and the tracemalloc peak
+    of Python allocations. Stages may nest; a parent's time and peak include
+    those of its children. Optionally the whole run is also recorded with
+    cProfile. Python 3.8 cannot reset the tracemalloc peak, so there a
+    stage's peak is the highest traced memory of the run up to its end.
+    """
+
+    def __init__(self, cprofile: bool = False):
+        """
+        Args:
+            cprofile (bool): Also record every function call with cProfile.
+        """
+        self.stages = []
+        self.total = None
+        self._stack = []
+        self._profile = cProfile.Profile() if cprofile else None
+
+    def start(self) -> None:
+        """Start tracing allocations (and cProfile) and the clock of the whole run."""
+        tracemalloc.start()
+        self._start = (time.perf_counter(), time.process_time(), _children_cpu_seconds())
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stop(self) -> None:
+        """Stop tracing and record the totals of the run."""
+        if self._profile is not None:
+            self._profile.disable()
+        wall, cpu, children = self._start
+        self.total = {
+            'wall_seconds': time.perf_counter() - wall,
+            'cpu_seconds': time.process_time() - cpu + _children_cpu_seconds() - children,
+            'peak_memory_mb': tracemalloc.get_traced_memory()[1] / 1e6,
+        }
+        tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Measure the code run inside the with block as one stage.
+
+        Args:
+            name (str): Stage name; nested stages are reported as 'parent/name'.
+        """
+        traced, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # Resetting the peak below would lose the parent's peak so far
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        entry = {'name': '/'.join([parent['name'] for parent in self._stack] + [name]), 'peak': traced}
+        self._stack.append(entry)
+        start = (time.perf_counter(), time.process_time(), _children_cpu_seconds())
+        try:
+            yield
+        finally:
+            wall, cpu, children = start
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu + _children_cpu_seconds() - children
+            self._stack.pop()
+            entry['peak'] = max(entry['peak'], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], entry['peak'])
+            self.stages.append({'stage': entry['name'], 'wall_seconds': wall, 'cpu_seconds': cpu,
+                                'peak_memory_mb': entry['peak'] / 1e6})
+
+    def report(self) -> dict:
+        """Stages in the order they finished, plus the totals of the run."""
+        return {'command': sys.argv, 'stages': self.stages, 'total': self.total}
+
+    def format_table(self) -> str:
+        """The report as a human-readable table."""
+        lines = [f"{'stage':<28}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}"]
+        rows = self.stages + ([dict(self.total, stage='total')] if self.total else [])
+        for row in rows:
+            lines.append(f"{row['stage']:<28}{row['wall_seconds']:>10.3f}{row['cpu_seconds']:>10.3f}"
+                         f"{row['peak_memory_mb']:>10.1f}")
+        return '\n'.join(lines)
+
+    def write_report(self, path: str) -> None:
+        """Write the report as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def dump_cprofile(self, path: str) -> None:
+        """Write the cProfile statistics (readable with pstats or snakeviz)."""
+        if self._profile is None:
+            raise ValueError('cProfile was not enabled for this profiler.')
+        self._profile.dump_stats(path)
+
+def profile_stage(profiler: Optional[StageProfiler], name: str):
+    """
+    Context manager measuring one stage, or doing nothing when profiling is
+    off, so unprofiled runs pay no tracing cost.
+
+    Args:
+        profiler (StageProfiler): The run's profiler (None when off).
+        name (str): Stage name.
+    """
+    return nullcontext() if profiler is None else profiler.stage(name)
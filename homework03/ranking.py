@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+import heapq
+import json
+import logging
+import os
+import tempfile
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_MEMORY_BYTES = 256 << 20
+# Runs merged at once; more runs are merged in several passes to bound open files
+MAX_MERGE_FILES = 64
+# Estimated bytes per buffered record on top of its serialized JSON
+_RECORD_OVERHEAD = 120
+
+def mass_of(item: dict, mass_key: str = 'mass (g)') -> Optional[float]:
+    """Mass of a record, or None when it is missing or invalid."""
+    try:
+        mass = float(item[mass_key])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return mass if mass == mass else None
+
+def top_k(records: Iterable[dict], k: int, group_by: Optional[str] = None, ascending: bool = False,
+          mass_key: str = 'mass (g)') -> Dict[Optional[str], List[dict]]:
+    """
+    Find the k heaviest (or lightest) records of every group in one pass,
+    keeping a bounded heap per group, so memory grows with k times the number
+    of groups rather than with the stream. Records without a valid mass are
+    skipped; among equal masses the earlier record ranks first.
+
+    Args:
+        records (Iterable[dict]): The stream.
+        k (int): Records kept per group.
+        group_by (str): Record field defining the groups (None ranks all records together).
+        ascending (bool): Keep the lightest records instead.
+        mass_key (str): Key of the mass in the records.
+
+    Returns:
+        Dict[str, List[dict]]: Ranked records per group, best first.
+
+    Raises:
+        ValueError: If k is less than 1.
+    """
+    if k < 1:
+        raise ValueError(f'k must be at least 1, got {k}.')
+    heaps = {}
+    sign = -1 if ascending else 1
+    for position, item in enumerate(records):
+        mass = mass_of(item, mass_key)
+        if mass is None:
+            continue
+        heap = heaps.setdefault(item.get(group_by) if group_by else None, [])
+        # Min-heap of the best k: its root is the first record to drop
+        entry = (sign * mass, -position, item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return {group: [item for _, _, item in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+            for group, heap in heaps.items()}
+
+def _sort_key(ascending: bool, mass_key: str):
+    sign = 1 if ascending else -1
+
+    def key(item: dict) -> tuple:
+        mass = mass_of(item, mass_key)
+        # Records without a valid mass go last
+        return (1, 0.0) if mass is None else (0, sign * mass)
+    return key
+
+def _read_run(f) -> Iterator[dict]:
+    for line in f:
+        yield json.loads(line)
+
+def _write_run(records: Iterable[str], spill_dir: str) -> str:
+    fd, path = tempfile.mkstemp(dir=spill_dir, prefix='run-', suffix='.jsonl')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.writelines(line + '\n' for line in records)
+    return path
+
+def _merge_runs(paths: List[str], key, spill_dir: str) -> str:
+    """Merge sorted run files into one new run file and delete them."""
+    with ExitStack() as stack:
+        runs = [_read_run(stack.enter_context(open(path, encoding='utf-8'))) for path in paths]
+        path = _write_run((json.dumps(item) for item in heapq.merge(*runs, key=key)), spill_dir)
+    for merged in paths:
+        os.unlink(merged)
+    return path
+
+def external_sort(records: Iterable[dict], memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                  spill_dir: Optional[str] = None, ascending: bool = False,
+                  mass_key: str = 'mass (g)') -> Iterator[dict]:
+    """
+    Sort records by mass, heaviest first, within a memory budget. Records are
+    buffered until the budget is used, and each full buffer is sorted and
+    spilled to disk as a run of JSON lines. The runs are then merged lazily.
+    Runs are merged in passes of at most MAX_MERGE_FILES, so any input size
+    can be sorted. Input that fits in the budget is sorted in memory. The sort
+    is stable. Records without a valid mass come last.
+
+    Args:
+        records (Iterable[dict]): The stream.
+        memory_bytes (int): Approximate memory budget of the buffered records.
+        spill_dir (str): Directory of the run files (default: the system
+                         temporary directory). They are removed once the
+                         sorted stream is exhausted or closed.
+        ascending (bool): Sort lightest first instead.
+        mass_key (str): Key of the mass in the records.
+
+    Yields:
+        dict: The records in sorted order.
+    """
+    key = _sort_key(ascending, mass_key)
+    with tempfile.TemporaryDirectory(dir=spill_dir, prefix='ml-sort-') as run_dir:
+        runs, buffer, used = [], [], 0
+        for item in records:
+            line = json.dumps(item)
+            buffer.append((key(item), len(buffer), line))
+            used += len(line) + _RECORD_OVERHEAD
+            if used >= memory_bytes:
+                buffer.sort()
+                runs.append(_write_run((line for _, _, line in buffer), run_dir))
+                buffer, used = [], 0
+        buffer.sort()
+
+        if not runs:
+            for _, _, line in buffer:
+                yield json.loads(line)
+            return
+        if buffer:
+            runs.append(_write_run((line for _, _, line in buffer), run_dir))
+            buffer = None
+        logging.info(f'Spilled {len(runs)} sorted runs to {run_dir}.')
+        while len(runs) > MAX_MERGE_FILES:
+            runs = [_merge_runs(runs[i:i + MAX_MERGE_FILES], key, run_dir)
+                    for i in range(0, len(runs), MAX_MERGE_FILES)]
+        with ExitStack() as stack:
+            streams = [_read_run(stack.enter_context(open(path, encoding='utf-8'))) for path in runs]
+            yield from heapq.merge(*streams, key=key)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import random
+from collections import Counter, deque
+from itertools import count, islice
+from math import exp, floor, fsum, log, sqrt
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Summary keys of the means estimated from a sample, by the record fields they average
+SAMPLED_MEANS = {'average_mass': 'mass (g)', 'avg_latitude': 'reclat', 'avg_longitude': 'reclong'}
+
+def _open_uniform(rng: random.Random) -> float:
+    """Uniform random number in (0, 1), so that its logarithm is finite and negative."""
+    while True:
+        u = rng.random()
+        if u:
+            return u
+
+def reservoir_sample(records: Iterable, size: int, rng: Optional[random.Random] = None) -> Tuple[list, int]:
+    """
+    Draw a uniform random sample of `size` records in one pass over a stream
+    of unknown length (Li's Algorithm L). After the reservoir fills, the
+    number of records to skip before the next replacement is drawn directly,
+    so skipped records cost no random numbers.
+
+    Args:
+        records (Iterable): The stream.
+        size (int): Sample size.
+        rng (random.Random): Source of randomness (seed it for a repeatable sample).
+
+    Returns:
+        Tuple[list, int]: The sample (every record if there are at most size)
+                          and the number of records read.
+    """
+    rng = rng or random.Random()
+    read = count()
+    # zip stops before advancing the counter when the stream ends
+    stream = zip(records, read)
+    sample = [item for item, _ in islice(stream, size)]
+    if size > 0 and len(sample) == size:
+        w = exp(log(_open_uniform(rng)) / size)
+        while True:
+            skip = floor(log(_open_uniform(rng)) / log(1 - w))
+            chosen = next(islice(stream, skip, None), None)
+            if chosen is None:
+                break
+            sample[rng.randrange(size)] = chosen[0]
+            w *= exp(log(_open_uniform(rng)) / size)
+    else:
+        # Nothing to sample, but the records are still counted
+        deque(stream, maxlen=0)
+    return sample, next(read)
+
+def stratified_reservoir_sample(records: Iterable[dict], size: int, key: str = 'recclass',
+                                rng: Optional[random.Random] = None) -> Tuple[Dict[str, list], Dict[str, int]]:
+    """
+    Draw a uniform random sample of up to `size` records from every stratum
+    (records sharing the value of `key`) in one pass, with one reservoir per
+    stratum. Rare strata are kept whole, so memory grows with size times the
+    number of strata.
+
+    Args:
+        records (Iterable[dict]): The stream.
+        size (int): Sample size per stratum.
+        key (str): Record field defining the strata.
+        rng (random.Random): Source of randomness (seed it for a repeatable sample).
+
+    Returns:
+        Tuple[Dict[str, list], Dict[str, int]]: Sample and number of records read per stratum.
+    """
+    rng = rng or random.Random()
+    strata, counts = {}, Counter()
+    for item in records:
+        stratum = item.get(key)
+        counts[stratum] += 1
+        sample = strata.setdefault(stratum, [])
+        if len(sample) < size:
+            sample.append(item)
+        else:
+            position = rng.randrange(counts[stratum])
+            if position < size:
+                sample[position] = item
+    return strata, dict(counts)
+
+def estimate_mean(strata: Iterable[Tuple[List[float], int, int]], confidence: float = 0.95) -> Optional[dict]:
+    """
+    Estimate the population mean of a value from a stratified random sample,
+    with a normal-approximation confidence interval. Records without a valid
+    value are left out: each stratum is weighted by its estimated number of
+    valid values, and the finite population correction shrinks the interval
+    of strata sampled in full to nothing. A simple random sample is one stratum.
+
+    Args:
+        strata (Iterable[Tuple[List[float], int, int]]): Per stratum, the valid
+            values in the sample, the sample size and the number of records read.
+        confidence (float): Confidence level of the interval.
+
+    Returns:
+        dict: 'mean', 'low', 'high' and 'confidence', or None without values.
+    """
+    parts = []
+    for values, sampled, population in strata:
+        if not values:
+            continue
+        n = len(values)
+        mean = fsum(values) / n
+        # A stratum with one valid value contributes no variance estimate
+        variance = fsum((value - mean) ** 2 for value in values) / (n - 1) if n > 1 else 0.0
+        parts.append((population * n / sampled, mean, (1 - sampled / population) * variance / n))
+    if not parts:
+        return None
+    total = fsum(weight for weight, _, _ in parts)
+    mean = fsum(weight * part_mean for weight, part_mean, _ in parts) / total
+    margin = NormalDist().inv_cdf((1 + confidence) / 2) * sqrt(
+        fsum((weight / total) ** 2 * variance for weight, _, variance in parts))
+    return {'mean': mean, 'low': mean - margin, 'high': mean + margin, 'confidence': confidence}
+
+def _mass(item: dict) -> Optional[float]:
+    try:
+        return float(item['mass (g)'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _coordinates(item: dict) -> Optional[Tuple[float, float]]:
+    try:
+        return float(item['reclat']), float(item['reclong'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class LandingSample:
+    """
+    A random sample of landing records drawn in one pass over a stream,
+    either uniform or stratified by a field such as recclass, with the
+    number of records read per stratum so that population means can be
+    estimated with confidence intervals.
+    """
+
+    def __init__(self, strata: Dict[Optional[str], list], counts: Dict[Optional[str], int],
+                 stratify_by: Optional[str] = None):
+        """
+        Args:
+            strata (Dict[str, list]): Sampled records per stratum (one stratum, None, when not stratified).
+            counts (Dict[str, int]): Records read per stratum.
+            stratify_by (str): Field defining the strata (None for a uniform sample).
+        """
+        self.strata = strata
+        self.counts = counts
+        self.stratify_by = stratify_by
+
+    @classmethod
+    def draw(cls, records: Iterable[dict], size: int, stratify_by: Optional[str] = None,
+             seed: Optional[int] = None) -> 'LandingSample':
+        """
+        Sample a stream of records.
+
+        Args:
+            records (Iterable[dict]): The stream.
+            size (int): Sample size (per stratum when stratified).
+            stratify_by (str): Field defining the strata (None samples uniformly).
+            seed (int): Random seed (None draws a different sample every time).
+        """
+        rng = random.Random(seed)
+        if stratify_by is None:
+            sample, read = reservoir_sample(records, size, rng)
+            return cls({None: sample}, {None: read})
+        strata, counts = stratified_reservoir_sample(records, size, stratify_by, rng)
+        return cls(strata, counts, stratify_by)
+
+    @property
+    def records(self) -> List[dict]:
+        """Every sampled record."""
+        return [item for sample in self.strata.values() for item in sample]
+
+    @property
+    def population(self) -> int:
+        """Number of records read."""
+        return sum(self.counts.values())
+
+    def __len__(self) -> int:
+        return sum(len(sample) for sample in self.strata.values())
+
+    def confidence_intervals(self, confidence: float = 0.95) -> Dict[str, Optional[dict]]:
+        """
+        Estimated population means of the mass, latitude and longitude (see
+        estimate_mean), keyed like the summary statistics (SAMPLED_MEANS).
+        """
+        values = {key: [] for key in SAMPLED_MEANS}
+        for stratum, sample in self.strata.items():
+            masses = [mass for mass in map(_mass, sample) if mass is not None]
+            coordinates = [point for point in map(_coordinates, sample) if point is not None]
+            for key, stratum_values in (('average_mass', masses), ('avg_latitude', [lat for lat, _ in coordinates]),
+                                        ('avg_longitude', [lon for _, lon in coordinates])):
+                values[key].append((stratum_values, len(sample), self.counts[stratum]))
+        return {key: estimate_mean(strata, confidence) for key, strata in values.items()}
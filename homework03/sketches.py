@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+import heapq
+import random
+from math import ceil
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary (Metwally et al.) that keeps at most
+    `capacity` counters no matter how many distinct items the stream holds.
+
+    Every tracked item has an estimated count and an error; its true count lies
+    in [count - error, count]. Any item that is not tracked occurred at most
+    `max_error` times, so every item with a true count above max_error is
+    guaranteed to be tracked. max_error is at most total / capacity.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity (int): Maximum number of counters kept.
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be a positive integer.')
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        # Bound on untracked items inherited from merges with fewer counters in use
+        self.floor = 0
+        # Min-heap of (count, item). Counts only grow, so entries may be stale
+        # (lower than the current count); they are refreshed when they surface.
+        self._heap = []
+
+    def _pop_min(self) -> Tuple[int, Hashable]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts[item] == count:
+                return count, item
+            heapq.heappush(self._heap, (self.counts[item], item))
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        """
+        Count `count` occurrences of an item.
+
+        Args:
+            item (Hashable): The item (e.g. a recclass string).
+            count (int): Number of occurrences.
+        """
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = self.floor + count
+            self.errors[item] = self.floor
+            heapq.heappush(self._heap, (self.floor + count, item))
+        else:
+            # Replace the smallest counter; the new item inherits its count as error
+            min_count, min_item = self._pop_min()
+            del self.counts[min_item]
+            del self.errors[min_item]
+            self.counts[item] = min_count + count
+            self.errors[item] = min_count
+            heapq.heappush(self._heap, (min_count + count, item))
+
+    @property
+    def max_error(self) -> int:
+        """Upper bound on the count of any item that is not tracked."""
+        if len(self.counts) < self.capacity:
+            return self.floor
+        return min(self.counts.values())
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """
+        Fold another summary into this one and return self. An item missing
+        from one summary may still have occurred up to that summary's
+        max_error times, so that amount is added to its count and error. The
+        merged counters are then cut back to the largest `capacity`; every
+        dropped counter is no larger than the smallest one kept, so max_error
+        still bounds the untracked items.
+
+        Args:
+            other (SpaceSaving): Summary of another part of the stream.
+        """
+        own_floor, other_floor = self.max_error, other.max_error
+        counts, errors = {}, {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = self.counts.get(item, own_floor) + other.counts.get(item, other_floor)
+            errors[item] = self.errors.get(item, own_floor) + other.errors.get(item, other_floor)
+        kept = heapq.nlargest(self.capacity, counts.items(), key=lambda pair: (pair[1], str(pair[0])))
+
+        self.total += other.total
+        self.counts = dict(kept)
+        self.errors = {item: errors[item] for item in self.counts}
+        self.floor = own_floor + other_floor
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def top(self, k: int = None) -> List[Tuple[Hashable, int, int]]:
+        """
+        The k items with the largest estimated counts.
+
+        Args:
+            k (int): Number of items (default: all tracked items).
+
+        Returns:
+            List[Tuple[Hashable, int, int]]: (item, estimated count, error)
+                                             tuples, largest first.
+        """
+        ranked = sorted(self.counts.items(), key=lambda pair: (-pair[1], str(pair[0])))
+        if k is not None:
+            ranked = ranked[:k]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state of the summary (items must be JSON values)."""
+        return {'capacity': self.capacity, 'total': self.total, 'floor': self.floor,
+                'counters': [[item, count, self.errors[item]] for item, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'SpaceSaving':
+        """Rebuild a summary saved with to_dict."""
+        summary = cls(state['capacity'])
+        summary.total = state['total']
+        summary.floor = state['floor']
+        for item, count, error in state['counters']:
+            summary.counts[item] = count
+            summary.errors[item] = error
+        summary._heap = [(count, item) for item, count in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+def _weighted_quantiles(items: List[Tuple[float, int]], total: int, qs: Iterable[float]) -> List[float]:
+    """Nearest-rank quantiles of (value, weight) pairs: the smallest value whose cumulative weight reaches q * total."""
+    items = sorted(items)
+    results = []
+    for q in qs:
+        if not 0 <= q <= 1:
+            raise ValueError('Quantiles must lie between 0 and 1.')
+        target, cumulative = q * total, 0
+        for value, weight in items:
+            cumulative += weight
+            if cumulative >= target:
+                results.append(value)
+                break
+    return results
+
+class ExactQuantiles:
+    """
+    Exact quantiles of a stream, found by keeping every value. Has the same
+    interface as KLLSketch; meant for small inputs and for checking the
+    sketch's accuracy.
+    """
+
+    def __init__(self):
+        self.values = []
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    def add(self, value: float) -> None:
+        self.values.append(value)
+
+    def add_array(self, values) -> None:
+        """Add a sequence of values (NaN must already be removed)."""
+        self.values.extend(float(value) for value in values)
+
+    def merge(self, other: 'ExactQuantiles') -> 'ExactQuantiles':
+        self.values.extend(other.values)
+        return self
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """Nearest-rank quantiles for each q in qs (empty list for an empty stream)."""
+        if not self.values:
+            return []
+        return _weighted_quantiles([(value, 1) for value in self.values], self.count, qs)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank q-quantile, or None for an empty stream."""
+        return (self.quantiles([q]) or [None])[0]
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state (every value)."""
+        return {'values': list(self.values)}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'ExactQuantiles':
+        """Rebuild an instance saved with to_dict."""
+        quantiles = cls()
+        quantiles.values = list(state['values'])
+        return quantiles
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty). Values are kept in a stack
+    of compactors; level h holds values that each stand for 2**h inputs. When
+    a level fills up it is sorted and every other value (starting at a random
+    offset) is promoted to the next level, so memory stays around 3k values
+    however long the stream is, while the rank error of a quantile stays
+    around 1.7 / k. Until the first compaction the sketch is exact.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = 0):
+        """
+        Args:
+            k (int): Accuracy parameter; the size of the top compactor.
+            seed (int): Seed for the compaction offsets (None for a random seed).
+        """
+        if k < 2:
+            raise ValueError('k must be at least 2.')
+        self.k = k
+        self.count = 0
+        self.levels = [[]]
+        self._rng = random.Random(seed)
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return 2 * ceil(self.k * (2 / 3) ** depth) + 1
+
+    def _grow(self) -> None:
+        self.levels.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self._grow()
+                values.sort()
+                # An odd value out stays behind so that the weight is preserved exactly
+                keep = [values.pop()] if len(values) % 2 else []
+                offset = self._rng.randint(0, 1)
+                self.levels[level + 1].extend(values[offset::2])
+                self.levels[level] = keep
+                # Growing shrinks the lower capacities, so recheck from the bottom
+                level = 0
+                continue
+            level += 1
+        self._size = sum(len(values) for values in self.levels)
+
+    @property
+    def is_exact(self) -> bool:
+        """True while no value has been compacted, i.e. quantiles are exact."""
+        return len(self.levels) == 1
+
+    def add(self, value: float) -> None:
+        """Add one value to the sketch."""
+        self.levels[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self._size > self._max_size:
+            self._compress()
+
+    def add_array(self, values) -> None:
+        """Add a sequence of values (NaN must already be removed)."""
+        values = [float(value) for value in values]
+        self.levels[0].extend(values)
+        self.count += len(values)
+        self._size += len(values)
+        if self._size > self._max_size:
+            self._compress()
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """
+        Fold another sketch into this one and return self. Levels of equal
+        weight are concatenated and then compacted as usual.
+
+        Args:
+            other (KLLSketch): Sketch of another part of the stream.
+        """
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, values in enumerate(other.levels):
+            self.levels[level].extend(values)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """Approximate nearest-rank quantiles for each q in qs (empty list for an empty stream)."""
+        if not self.count:
+            return []
+        items = [(value, 1 << level) for level, values in enumerate(self.levels) for value in values]
+        return _weighted_quantiles(items, sum(weight for _, weight in items), qs)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate nearest-rank q-quantile, or None for an empty stream."""
+        return (self.quantiles([q]) or [None])[0]
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serializable state of the sketch, including the random generator
+        so that a restored sketch compacts exactly like the original would.
+        """
+        version, internal, gauss_next = self._rng.getstate()
+        return {'k': self.k, 'count': self.count, 'levels': [list(values) for values in self.levels],
+                'rng': [version, list(internal), gauss_next]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'KLLSketch':
+        """Rebuild a sketch saved with to_dict."""
+        sketch = cls(state['k'])
+        sketch.count = state['count']
+        sketch.levels = [list(values) for values in state['levels']]
+        version, internal, gauss_next = state['rng']
+        sketch._rng.setstate((version, tuple(internal), gauss_next))
+        sketch._size = sum(len(values) for values in sketch.levels)
+        sketch._max_size = sum(sketch._capacity(level) for level in range(len(sketch.levels)))
+        return sketch
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+import heapq
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import sin, pi
+from typing import Iterable, Optional, Tuple
+import numpy as np
+from great_circle_distance import EARTH_RADIUS_KM, great_circle_distance_pairs
+
+def lat_lon_to_unit_vectors(lats, lons) -> np.ndarray:
+    """
+    Convert latitude and longitude in degrees to points on the unit sphere.
+
+    Args:
+        lats, lons (array_like): Latitudes and longitudes in degrees.
+
+    Returns:
+        np.ndarray: Array of shape (n, 3) with the x, y, z coordinates.
+    """
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+def chord_to_km(chord):
+    """
+    Convert a straight-line (chord) distance between two points on the unit
+    sphere into the great-circle distance in kilometers.
+    """
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.clip(np.asarray(chord) / 2, 0.0, 1.0))
+
+def km_to_chord(distance_km: float) -> float:
+    """
+    Convert a great-circle distance in kilometers into the equivalent chord
+    length on the unit sphere. Distances beyond half the circumference map to
+    the diameter.
+    """
+    angle = min(max(distance_km, 0.0) / EARTH_RADIUS_KM, pi)
+    return 2 * sin(angle / 2)
+
+class LandingSiteIndex:
+    """
+    KD-tree over the unit-sphere coordinates of landing sites.
+
+    Straight-line distance between points on the unit sphere increases
+    monotonically with great-circle distance, so nearest-neighbour and radius
+    queries on the 3D points give the same answers as the haversine formula.
+    Each node also keeps the latitude/longitude bounds of its points so that
+    bounding-box queries can prune whole subtrees.
+
+    Query results are positions into the arrays the index was built from; use
+    the `ids` attribute to map them back to the source records.
+    """
+
+    def __init__(self, lats, lons, ids: Optional[Iterable] = None, leaf_size: int = 16):
+        """
+        Build the index.
+
+        Args:
+            lats, lons (array_like): Latitudes and longitudes in degrees.
+            ids (Iterable): Optional identifiers of the points (e.g. the
+                            position of each site in the source data).
+                            Defaults to 0..n-1.
+            leaf_size (int): Maximum number of points stored in a leaf.
+        """
+        self.lats = np.asarray(lats, dtype=float).ravel()
+        self.lons = np.asarray(lons, dtype=float).ravel()
+        if self.lats.shape != self.lons.shape:
+            raise ValueError('lats and lons must have the same length.')
+        self.ids = np.arange(len(self.lats)) if ids is None else np.asarray(list(ids))
+        if len(self.ids) != len(self.lats):
+            raise ValueError('ids must have the same length as lats and lons.')
+        self.leaf_size = max(int(leaf_size), 1)
+        self.records = None
+        self._build()
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], keep_records: bool = True,
+                     leaf_size: int = 16) -> 'LandingSiteIndex':
+        """
+        Build an index from meteorite landing records, skipping entries without
+        valid 'reclat'/'reclong' values.
+
+        Args:
+            records (Iterable[dict]): A list (or stream) of landing records.
+            keep_records (bool): Keep the indexed records on the `records`
+                                 attribute, aligned with query results.
+            leaf_size (int): Maximum number of points stored in a leaf.
+
+        Returns:
+            LandingSiteIndex: The index; `ids` holds each site's position in
+                              the input.
+        """
+        lats, lons, ids, kept = [], [], [], []
+        for position, item in enumerate(records):
+            if item.get('reclat') is None or item.get('reclong') is None:
+                continue
+            try:
+                lat, lon = float(item['reclat']), float(item['reclong'])
+            except ValueError:
+                logging.warning(f"Invalid latitude or longitude value: {item['reclat']}, {item['reclong']}")
+                continue
+            lats.append(lat)
+            lons.append(lon)
+            ids.append(position)
+            if keep_records:
+                kept.append(item)
+        index = cls(lats, lons, ids, leaf_size=leaf_size)
+        if keep_records:
+            index.records = kept
+        return index
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _build(self):
+        n = len(self.lats)
+        points = lat_lon_to_unit_vectors(self.lats, self.lons)
+        perm = np.arange(n)
+
+        # Node arrays, indexed by node number. Leaves have left == -1.
+        self._start, self._end, self._left, self._right = [], [], [], []
+        self._box_lo, self._box_hi, self._lat_lon_bounds = [], [], []
+
+        if n == 0:
+            self._points, self._perm = points, perm
+            self._box_lo_array = self._box_hi_array = np.empty((0, 3))
+            return
+
+        def new_node(start, end):
+            node_points = points[start:end]
+            node_lats = self.lats[perm[start:end]]
+            node_lons = self.lons[perm[start:end]]
+            self._start.append(start)
+            self._end.append(end)
+            self._left.append(-1)
+            self._right.append(-1)
+            self._box_lo.append(tuple(node_points.min(axis=0).tolist()))
+            self._box_hi.append(tuple(node_points.max(axis=0).tolist()))
+            self._lat_lon_bounds.append((float(node_lats.min()), float(node_lats.max()),
+                                         float(node_lons.min()), float(node_lons.max())))
+            return len(self._start) - 1
+
+        stack = [new_node(0, n)]
+        while stack:
+            node = stack.pop()
+            start, end = self._start[node], self._end[node]
+            if end - start <= self.leaf_size:
+                continue
+            lo, hi = self._box_lo[node], self._box_hi[node]
+            dim = max(range(3), key=lambda d: hi[d] - lo[d])
+            mid = (start + end) // 2
+            order = np.argpartition(points[start:end, dim], mid - start)
+            points[start:end] = points[start:end][order]
+            perm[start:end] = perm[start:end][order]
+            self._left[node] = new_node(start, mid)
+            self._right[node] = new_node(mid, end)
+            stack.extend((self._left[node], self._right[node]))
+
+        self._points = points
+        self._perm = perm
+        self._box_lo_array = np.array(self._box_lo)
+        self._box_hi_array = np.array(self._box_hi)
+
+    def _box_distance_sq(self, node: int, q: Tuple[float, float, float]) -> float:
+        """Squared distance from q to the bounding box of a node."""
+        total = 0.0
+        for lo, hi, x in zip(self._box_lo[node], self._box_hi[node], q):
+            if x < lo:
+                total += (lo - x) ** 2
+            elif x > hi:
+                total += (x - hi) ** 2
+        return total
+
+    def query_nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k landing sites nearest to a point.
+
+        Args:
+            lat, lon (float): Latitude and longitude of the query point.
+            k (int): Number of neighbours to return.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Great-circle distances in kilometers
+                                           and positions of the sites, nearest
+                                           first.
+        """
+        if k < 1 or not len(self):
+            return np.empty(0), np.empty(0, dtype=int)
+        q = tuple(lat_lon_to_unit_vectors([lat], [lon])[0].tolist())
+        q_arr = np.asarray(q)
+
+        best = []  # max-heap of (-squared chord, position)
+        to_visit = [(0.0, 0)]
+        while to_visit:
+            node_dist, node = heapq.heappop(to_visit)
+            if len(best) == k and node_dist > -best[0][0]:
+                break
+            if self._left[node] == -1:
+                start, end = self._start[node], self._end[node]
+                dist_sq = ((self._points[start:end] - q_arr) ** 2).sum(axis=1)
+                for offset in np.argsort(dist_sq)[:k]:
+                    d = dist_sq[offset]
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, start + offset))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, start + offset))
+                    else:
+                        break
+            else:
+                for child in (self._left[node], self._right[node]):
+                    child_dist = self._box_distance_sq(child, q)
+                    if len(best) < k or child_dist <= -best[0][0]:
+                        heapq.heappush(to_visit, (child_dist, child))
+
+        best.sort(reverse=True)
+        chords = np.sqrt([-d for d, _ in best])
+        positions = self._perm[[slot for _, slot in best]]
+        return chord_to_km(chords), positions
+
+    def query_radius(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find all landing sites within radius_km of a point.
+
+        Args:
+            lat, lon (float): Latitude and longitude of the query point.
+            radius_km (float): Search radius in kilometers.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Great-circle distances in kilometers
+                                           and positions of the sites, nearest
+                                           first.
+        """
+        if not len(self):
+            return np.empty(0), np.empty(0, dtype=int)
+        q = tuple(lat_lon_to_unit_vectors([lat], [lon])[0].tolist())
+        q_arr = np.asarray(q)
+        # Small tolerance so points exactly on the radius are not lost to rounding
+        radius_sq = km_to_chord(radius_km) ** 2 + 1e-15
+
+        slots, dists = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance_sq(node, q) > radius_sq:
+                continue
+            if self._left[node] == -1:
+                start, end = self._start[node], self._end[node]
+                dist_sq = ((self._points[start:end] - q_arr) ** 2).sum(axis=1)
+                inside = np.nonzero(dist_sq <= radius_sq)[0]
+                slots.append(start + inside)
+                dists.append(dist_sq[inside])
+            else:
+                stack.extend((self._left[node], self._right[node]))
+
+        if not slots:
+            return np.empty(0), np.empty(0, dtype=int)
+        slots = np.concatenate(slots)
+        dists = np.concatenate(dists)
+        order = np.argsort(dists, kind='stable')
+        return chord_to_km(np.sqrt(dists[order])), self._perm[slots[order]]
+
+    def query_bbox(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> np.ndarray:
+        """
+        Find all landing sites inside a latitude/longitude box. A box with
+        min_lon > max_lon wraps across the antimeridian.
+
+        Args:
+            min_lat, max_lat (float): Latitude bounds in degrees (inclusive).
+            min_lon, max_lon (float): Longitude bounds in degrees (inclusive).
+
+        Returns:
+            np.ndarray: Sorted positions of the sites inside the box.
+        """
+        if not len(self):
+            return np.empty(0, dtype=int)
+        if min_lon > max_lon:
+            boxes = [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon)]
+        else:
+            boxes = [(min_lat, max_lat, min_lon, max_lon)]
+
+        found = []
+        for box_min_lat, box_max_lat, box_min_lon, box_max_lon in boxes:
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                node_min_lat, node_max_lat, node_min_lon, node_max_lon = self._lat_lon_bounds[node]
+                if (node_max_lat < box_min_lat or node_min_lat > box_max_lat or
+                        node_max_lon < box_min_lon or node_min_lon > box_max_lon):
+                    continue
+                start, end = self._start[node], self._end[node]
+                if (node_min_lat >= box_min_lat and node_max_lat <= box_max_lat and
+                        node_min_lon >= box_min_lon and node_max_lon <= box_max_lon):
+                    found.append(self._perm[start:end])
+                elif self._left[node] == -1:
+                    positions = self._perm[start:end]
+                    lats, lons = self.lats[positions], self.lons[positions]
+                    inside = ((lats >= box_min_lat) & (lats <= box_max_lat) &
+                              (lons >= box_min_lon) & (lons <= box_max_lon))
+                    found.append(positions[inside])
+                else:
+                    stack.extend((self._left[node], self._right[node]))
+
+        if not found:
+            return np.empty(0, dtype=int)
+        return np.unique(np.concatenate(found))
+
+    def tree_order(self) -> np.ndarray:
+        """
+        Positions of all sites in the order of the tree's leaves. Consecutive
+        positions are spatially close, so batches of queries taken in this
+        order only touch a small part of the tree.
+        """
+        return self._perm.copy()
+
+    def _radius_join(self, query_points: np.ndarray, radius_sq: float,
+                     mode: str = 'pairs') -> Tuple[np.ndarray, list, list]:
+        """
+        Batched radius search: walk the tree once for a whole batch of query
+        points, carrying along at each node only the queries that can still
+        reach it. Nodes lying completely inside a query's radius are taken
+        whole without computing distances.
+
+        Args:
+            query_points (np.ndarray): Unit vectors of the query points.
+            radius_sq (float): Squared chord radius.
+            mode (str): 'count' only counts the neighbours of each query,
+                        'pairs' also collects the matching (row, slot) pairs,
+                        'union' collects the slots within reach of any query.
+
+        Returns:
+            Tuple[np.ndarray, list, list]: Neighbour count of each query point,
+                                           and lists of row and slot arrays
+                                           ('union' leaves the rows empty).
+        """
+        counts = np.zeros(len(query_points), dtype=int)
+        rows_found, slots_found = [], []
+        stack = [(0, np.arange(len(query_points)))]
+        while stack:
+            node, rows = stack.pop()
+            q = query_points[rows]
+            lo, hi = self._box_lo_array[node], self._box_hi_array[node]
+            near = np.maximum(lo - q, 0) + np.maximum(q - hi, 0)
+            reaches = (near * near).sum(axis=1) <= radius_sq
+            if not reaches.all():
+                rows, q = rows[reaches], q[reaches]
+                if not len(rows):
+                    continue
+
+            start, end = self._start[node], self._end[node]
+            far = np.maximum(np.abs(q - lo), np.abs(q - hi))
+            covers = (far * far).sum(axis=1) <= radius_sq
+            if covers.any():
+                counts[rows[covers]] += end - start
+                if mode == 'union':
+                    # Every point of the node is already reached
+                    slots_found.append(np.arange(start, end))
+                    continue
+                if mode == 'pairs':
+                    rows_found.append(np.repeat(rows[covers], end - start))
+                    slots_found.append(np.tile(np.arange(start, end), int(covers.sum())))
+                rows, q = rows[~covers], q[~covers]
+                if not len(rows):
+                    continue
+
+            if self._left[node] == -1:
+                inside = ((q[:, None, :] - self._points[start:end][None, :, :]) ** 2).sum(axis=2) <= radius_sq
+                counts[rows] += inside.sum(axis=1)
+                if mode == 'pairs':
+                    row_offsets, slot_offsets = np.nonzero(inside)
+                    rows_found.append(rows[row_offsets])
+                    slots_found.append(start + slot_offsets)
+                elif mode == 'union':
+                    slots_found.append(start + np.nonzero(inside.any(axis=0))[0])
+            else:
+                stack.append((self._left[node], rows))
+                stack.append((self._right[node], rows))
+        return counts, rows_found, slots_found
+
+    def query_radius_many(self, lats, lons, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run query_radius for many query points in one batched walk of the tree.
+        Batches of nearby points (see tree_order) are answered fastest.
+
+        Args:
+            lats, lons (array_like): Latitudes and longitudes of the query points.
+            radius_km (float): Search radius in kilometers.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: offsets and positions; the sites
+                                           within radius_km of query point i
+                                           are positions[offsets[i]:offsets[i + 1]]
+                                           (in no particular order).
+        """
+        query_points = lat_lon_to_unit_vectors(np.ravel(lats), np.ravel(lons))
+        offsets = np.zeros(len(query_points) + 1, dtype=int)
+        if not len(self) or not len(query_points):
+            return offsets, np.empty(0, dtype=int)
+        radius_sq = km_to_chord(radius_km) ** 2 + 1e-15
+        counts, rows, slots = self._radius_join(query_points, radius_sq)
+        np.cumsum(counts, out=offsets[1:])
+        if not rows:
+            return offsets, np.empty(0, dtype=int)
+        rows, slots = np.concatenate(rows), np.concatenate(slots)
+        return offsets, self._perm[slots[np.argsort(rows, kind='stable')]]
+
+    def query_radius_union(self, lats, lons, radius_km: float) -> np.ndarray:
+        """
+        Find the landing sites within radius_km of any of the query points,
+        without materializing each query's own neighbour list.
+
+        Args:
+            lats, lons (array_like): Latitudes and longitudes of the query points.
+            radius_km (float): Search radius in kilometers.
+
+        Returns:
+            np.ndarray: Sorted positions of the sites.
+        """
+        query_points = lat_lon_to_unit_vectors(np.ravel(lats), np.ravel(lons))
+        if not len(self) or not len(query_points):
+            return np.empty(0, dtype=int)
+        radius_sq = km_to_chord(radius_km) ** 2 + 1e-15
+        _, _, slots = self._radius_join(query_points, radius_sq, mode='union')
+        if not slots:
+            return np.empty(0, dtype=int)
+        return np.sort(self._perm[np.unique(np.concatenate(slots))])
+
+    def query_nearest_many(self, lats, lons, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run query_nearest for many query points.
+
+        Args:
+            lats, lons (array_like): Latitudes and longitudes of the query points.
+            k (int): Number of neighbours per query point.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Arrays of shape (m, k) with distances
+                                           in kilometers and site positions.
+                                           Missing neighbours (fewer than k
+                                           sites) are filled with inf and -1.
+        """
+        lats = np.asarray(lats, dtype=float).ravel()
+        lons = np.asarray(lons, dtype=float).ravel()
+        distances = np.full((len(lats), k), np.inf)
+        positions = np.full((len(lats), k), -1, dtype=int)
+        for row, (lat, lon) in enumerate(zip(lats, lons)):
+            d, p = self.query_nearest(lat, lon, k)
+            distances[row, :len(d)] = d
+            positions[row, :len(p)] = p
+        return distances, positions
+
+_worker_index = None
+
+def _init_worker(lats, lons, leaf_size):
+    """Rebuild the index once in each worker process of a pool."""
+    global _worker_index
+    _worker_index = LandingSiteIndex(lats, lons, leaf_size=leaf_size)
+
+def _nearest_other(index: LandingSiteIndex, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest other site for each site in positions start..stop-1."""
+    positions = np.arange(start, stop)
+    distances, neighbours = index.query_nearest_many(index.lats[start:stop], index.lons[start:stop], k=2)
+    # The site itself normally comes first; if a duplicate location was
+    # returned first instead, that duplicate is already the answer
+    is_self = neighbours[:, 0] == positions
+    column = is_self.astype(int)
+    rows = np.arange(len(positions))
+    return distances[rows, column], neighbours[rows, column]
+
+def _farthest_other(index: LandingSiteIndex, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Farthest site for each site in positions start..stop-1."""
+    lats = index.lats[start:stop]
+    lons = index.lons[start:stop]
+    # The farthest site from a point is the site nearest to its antipode
+    antipode_lons = np.where(lons > 0, lons - 180.0, lons + 180.0)
+    _, neighbours = index.query_nearest_many(-lats, antipode_lons, k=1)
+    neighbours = neighbours[:, 0]
+    distances = great_circle_distance_pairs(lats, lons, index.lats[neighbours], index.lons[neighbours])
+    return distances, neighbours
+
+def _count_within(index: LandingSiteIndex, start: int, stop: int, radius_km: float) -> Tuple[np.ndarray]:
+    """Number of sites within radius_km of each site in tree slots start..stop-1."""
+    radius_sq = km_to_chord(radius_km) ** 2 + 1e-15
+    counts, _, _ = index._radius_join(index._points[start:stop], radius_sq, mode='count')
+    return (counts,)
+
+_TASKS = {'nearest': _nearest_other, 'farthest': _farthest_other, 'count': _count_within}
+
+def _worker_task(kind: str, start: int, stop: int, *args) -> Tuple[np.ndarray, ...]:
+    return _TASKS[kind](_worker_index, start, stop, *args)
+
+def _map_sites(index: LandingSiteIndex, kind: str, workers: Optional[int],
+               chunk_size: int, *args) -> Tuple[np.ndarray, ...]:
+    """
+    Run a per-site search ('nearest', 'farthest' or 'count') over all sites,
+    split into chunks and spread over a process pool when more than one
+    worker is used.
+    """
+    n = len(index)
+    workers = workers or os.cpu_count() or 1
+    chunks = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        results = [_TASKS[kind](index, start, stop, *args) for start, stop in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(index.lats, index.lons, index.leaf_size)) as executor:
+            futures = [executor.submit(_worker_task, kind, start, stop, *args) for start, stop in chunks]
+            results = [future.result() for future in futures]
+    if not results:
+        return np.empty(0), np.empty(0, dtype=int)
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+def nearest_neighbour_distances(index: LandingSiteIndex, workers: Optional[int] = None,
+                                chunk_size: int = 20000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the nearest other landing site of every site in the index.
+
+    Args:
+        index (LandingSiteIndex): Index of the landing sites.
+        workers (int): Number of worker processes. Defaults to the number of
+                       CPU cores; 1 runs in the current process.
+        chunk_size (int): Number of sites handled per task.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: For each site, the distance in kilometers
+                                       to its nearest neighbour and that
+                                       neighbour's position (inf and -1 when
+                                       the index holds a single site).
+    """
+    return _map_sites(index, 'nearest', workers, chunk_size)
+
+def neighbour_counts(index: LandingSiteIndex, radius_km: float, workers: Optional[int] = None,
+                     chunk_size: int = 20000) -> np.ndarray:
+    """
+    Count the landing sites within radius_km of every site (the site itself
+    included), using batched tree walks over spatially contiguous chunks.
+
+    Args:
+        index (LandingSiteIndex): Index of the landing sites.
+        radius_km (float): Radius in kilometers.
+        workers (int): Number of worker processes (see nearest_neighbour_distances).
+        chunk_size (int): Number of sites handled per task.
+
+    Returns:
+        np.ndarray: Count for each site position.
+    """
+    counts = np.zeros(len(index), dtype=int)
+    if len(index):
+        # Chunks of tree slots are spatially compact; map the result back to positions
+        counts[index._perm] = _map_sites(index, 'count', workers, chunk_size, radius_km)[0]
+    return counts
+
+def closest_pair(index: LandingSiteIndex, workers: Optional[int] = None,
+                 chunk_size: int = 20000) -> Optional[Tuple[float, int, int]]:
+    """
+    Find the two landing sites closest to each other.
+
+    Args:
+        index (LandingSiteIndex): Index of the landing sites.
+        workers (int): Number of worker processes (see nearest_neighbour_distances).
+        chunk_size (int): Number of sites handled per task.
+
+    Returns:
+        Tuple[float, int, int]: Distance in kilometers and positions of the two
+                                sites, or None if there are fewer than two sites.
+    """
+    if len(index) < 2:
+        return None
+    distances, neighbours = nearest_neighbour_distances(index, workers, chunk_size)
+    site = int(np.argmin(distances))
+    return float(distances[site]), site, int(neighbours[site])
+
+def farthest_pair(index: LandingSiteIndex, workers: Optional[int] = None,
+                  chunk_size: int = 20000) -> Optional[Tuple[float, int, int]]:
+    """
+    Find the two landing sites farthest from each other.
+
+    Args:
+        index (LandingSiteIndex): Index of the landing sites.
+        workers (int): Number of worker processes (see nearest_neighbour_distances).
+        chunk_size (int): Number of sites handled per task.
+
+    Returns:
+        Tuple[float, int, int]: Distance in kilometers and positions of the two
+                                sites, or None if there are fewer than two sites.
+    """
+    if len(index) < 2:
+        return None
+    distances, neighbours = _map_sites(index, 'farthest', workers, chunk_size)
+    site = int(np.argmax(distances))
+    return float(distances[site]), site, int(neighbours[site])
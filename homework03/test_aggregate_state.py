@@ -0,0 +1,68 @@
+from aggregate_state import AggregateState
+from ml_data_analysis import summarize_landings, iter_data_file
+import json
+import os
+import pytest
+
+header = 'name,recclass,mass (g),reclat,reclong\n'
+rows = [
+    'Aachen,L5,21,50.775,6.08333\n',
+    'Aarhus,H6,720,56.18333,10.23333\n',
+    'Abee,EH4,107000,54.21667,-113\n',
+    'Achiras,L6,780,-33.16667,-64.95\n',
+    '"Acfer, 001",L6,abc,,\n',
+]
+
+def test_update_folds_only_new_records(tmp_path):
+    data, extra, state_path = tmp_path / 'landings.csv', tmp_path / 'extra.json', str(tmp_path / 'state.json')
+    data.write_text(header + ''.join(rows[:2]))
+    extra.write_text(json.dumps({'meteorite_landings': [{'name': 'Abo', 'mass (g)': '5', 'recclass': 'L6'}]}))
+
+    state = AggregateState.load_or_create(state_path)
+    assert state.update([str(data), str(extra)]) == 3
+    state.save(state_path)
+
+    # Appended rows are read from where the last update stopped; the JSON file is skipped
+    with open(data, 'a') as f:
+        f.write(''.join(rows[2:]))
+    state = AggregateState.load_or_create(state_path)
+    assert state.update([str(data), str(extra)]) == 3
+    assert state.update([str(data)]) == 0
+    state.save(state_path)
+
+    records = list(iter_data_file(str(data)))
+    expected = summarize_landings(records[:2] + list(iter_data_file(str(extra))) + records[2:])
+    summary = AggregateState.load(state_path).aggregate.summary()
+    assert summary == {key: value for key, value in expected.items() if key != 'distance_between_first_sites'}
+
+def test_update_rejects_rewritten_files(tmp_path):
+    data, state_path = tmp_path / 'landings.csv', str(tmp_path / 'state.json')
+    data.write_text(header + ''.join(rows[:3]))
+    state = AggregateState.load_or_create(state_path, filters=['mass > 100'])
+    assert state.update([str(data)]) == 2
+    state.save(state_path)
+
+    data.write_text(header + ''.join(rows[1:4]) + rows[0])
+    with pytest.raises(ValueError):
+        AggregateState.load_or_create(state_path).update([str(data)])
+    with pytest.raises(ValueError):
+        AggregateState.load_or_create(state_path, filters=['mass > 10'])
+    # An interrupted save would leave no temporary files behind
+    assert sorted(os.listdir(tmp_path)) == ['landings.csv', 'state.json']
+
+def test_update_skips_touched_files_with_the_same_contents(tmp_path):
+    data, extra = tmp_path / 'landings.csv', tmp_path / 'extra.json'
+    data.write_text(header + ''.join(rows[:2]))
+    extra.write_text(json.dumps({'meteorite_landings': [{'name': 'Abo', 'mass (g)': '5', 'recclass': 'L6'}]}))
+    state = AggregateState.load_or_create(str(tmp_path / 'state.json'))
+    assert state.update([str(data), str(extra)]) == 3
+
+    for path in (data, extra):
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert state.update([str(data), str(extra)]) == 0
+
+    # Same size, different contents
+    extra.write_text(json.dumps({'meteorite_landings': [{'name': 'Abo', 'mass (g)': '6', 'recclass': 'L6'}]}))
+    with pytest.raises(ValueError):
+        state.update([str(extra)])
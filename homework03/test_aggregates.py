@@ -0,0 +1,109 @@
+from aggregates import HEMISPHERES, LandingAggregate, RunningMoments, check_hemisphere, count_hemispheres, hemisphere_codes
+from dataset_cache import parse_landing_columns
+import json
+import numpy as np
+import pytest
+
+data = [
+    {'mass (g)': '21', 'reclat': '50.775', 'reclong': '6.08333', 'recclass': 'L5'},
+    {'mass (g)': '720', 'reclat': '56.18333', 'reclong': '10.23333', 'recclass': 'H6'},
+    {'mass (g)': '107000', 'reclat': '54.21667', 'reclong': '-113', 'recclass': 'EH4'},
+    {'mass (g)': '780', 'reclat': '-33.16667', 'reclong': '-64.95', 'recclass': 'L6'},
+    {'mass (g)': 'abc', 'reclat': None, 'reclong': None, 'recclass': 'L6'},
+]
+
+def test_check_hemisphere():
+    assert check_hemisphere(50.775, 6.08333) == 'Northern & Eastern'
+    assert check_hemisphere(-1, -1) == 'Southern & Western'
+    assert check_hemisphere(0, 0) == 'Southern & Western'
+
+def test_hemisphere_codes_match_check_hemisphere():
+    lats = np.array([50.775, -1.0, 0.0, 12.0, -33.2, 0.0])
+    lons = np.array([6.08333, -1.0, 0.0, -113.0, 64.9, 5.0])
+    codes = hemisphere_codes(lats, lons)
+    assert [HEMISPHERES[code] for code in codes] == [check_hemisphere(a, b) for a, b in zip(lats, lons)]
+    assert count_hemispheres(lats, lons) == [1, 2, 1, 2]
+
+def test_running_moments_merge():
+    values = [1.0, 4.0, 9.0, 16.0, 25.0, -3.5]
+    whole = RunningMoments()
+    for value in values:
+        whole.add(value)
+    left, right = RunningMoments(), RunningMoments()
+    for value in values[:2]:
+        left.add(value)
+    for value in values[2:]:
+        right.add(value)
+    left.merge(right)
+    assert left.count == whole.count
+    assert left.mean == pytest.approx(whole.mean)
+    assert left.variance == pytest.approx(whole.variance)
+    assert (left.min, left.max) == (-3.5, 25.0)
+    assert RunningMoments().merge(whole).mean == whole.mean
+
+def test_landing_aggregate_summary():
+    summary = LandingAggregate().update(data).summary()
+    assert summary['count'] == 5
+    assert summary['invalid_mass_values'] == 1
+    assert summary['max_mass'] == 107000.0
+    assert summary['min_mass'] == 21.0
+    assert summary['average_mass'] == pytest.approx((21 + 720 + 107000 + 780) / 4)
+    assert summary['hemisphere_statistics']['Northern & Eastern'] == 2
+    assert summary['hemisphere_statistics']['Southern & Western'] == 1
+    assert summary['recclass_occurrences'] == {'L6': 2, 'L5': 1, 'H6': 1, 'EH4': 1}
+    assert summary['geolocation_range']['latitude_range'] == (-33.16667, 56.18333)
+    assert (summary['median_mass'], summary['p90_mass']) == (720.0, 107000.0)
+    assert summary['mass_quantiles_exact']
+
+def test_landing_aggregate_merge_matches_single_pass():
+    whole = LandingAggregate().update(data).summary()
+    merged = LandingAggregate().update(data[:3]).merge(LandingAggregate().update(data[3:])).summary()
+    assert merged['count'] == whole['count']
+    assert merged['average_mass'] == pytest.approx(whole['average_mass'])
+    assert merged['geographical_std_deviation'] == pytest.approx(whole['geographical_std_deviation'])
+    assert merged['hemisphere_statistics'] == whole['hemisphere_statistics']
+    assert merged['recclass_occurrences'] == whole['recclass_occurrences']
+    assert merged['median_mass'] == whole['median_mass']
+
+def test_landing_aggregate_approximate_classes():
+    summary = LandingAggregate(class_capacity=2).update(data).summary()
+    assert list(summary['recclass_occurrences'])[0] == 'L6'
+    assert len(summary['recclass_occurrences']) == 2
+    assert summary['recclass_occurrences']['L6'] - summary['recclass_error_bounds']['L6'] <= 2
+    assert summary['recclass_max_error'] >= 1
+    with pytest.raises(ValueError):
+        LandingAggregate().merge(LandingAggregate(class_capacity=2))
+
+def test_landing_aggregate_exact_quantiles():
+    exact = LandingAggregate(quantile_k=None).update(data)
+    exact.add_columns({'mass': [5.0, float('nan')], 'reclat': [1.0, 2.0], 'reclong': [1.0, 2.0], 'recclass': ['L5', '']})
+    summary = exact.summary()
+    assert summary['mass_quantiles_exact']
+    assert (summary['median_mass'], summary['p99_mass']) == (720.0, 107000.0)
+    with pytest.raises(ValueError):
+        LandingAggregate().merge(LandingAggregate(quantile_k=None))
+
+@pytest.mark.parametrize('class_capacity, quantile_k', [(None, 200), (2, None)])
+def test_landing_aggregate_state_round_trip(class_capacity, quantile_k):
+    aggregate = LandingAggregate(class_capacity=class_capacity, quantile_k=quantile_k).update(data[:3])
+    restored = LandingAggregate.from_dict(json.loads(json.dumps(aggregate.to_dict())))
+    restored.update(data[3:])
+    expected = LandingAggregate(class_capacity=class_capacity, quantile_k=quantile_k).update(data)
+    assert restored.summary() == expected.summary()
+
+def test_records_and_columns_give_the_same_summary():
+    rows = data + [
+        {'mass (g)': 'nan', 'reclat': 'nan', 'reclong': '5', 'recclass': ''},
+        {'mass (g)': '', 'reclat': '', 'reclong': '', 'recclass': 'H6'},
+        {'mass (g)': 'inf', 'reclat': '10', 'reclong': 'inf', 'recclass': None},
+        {'mass (g)': '5', 'reclat': '-10', 'reclong': '-20'},
+    ]
+    by_record = LandingAggregate(quantile_k=None).update(rows).summary()
+    by_column = LandingAggregate(quantile_k=None).add_columns(parse_landing_columns(rows)).summary()
+    assert by_record.keys() == by_column.keys()
+    for key, value in by_record.items():
+        assert by_column[key] == (pytest.approx(value) if isinstance(value, float) else value), key
+    assert (by_record['invalid_mass_values'], by_record['invalid_coordinates']) == (4, 4)
+    assert by_record['average_mass'] == pytest.approx((21 + 720 + 107000 + 780 + 5) / 5)
+    assert by_record['geolocation_range']['longitude_range'] == (-113.0, 10.23333)
+    assert '' not in by_record['recclass_occurrences']
@@ -0,0 +1,64 @@
+from clustering import NOISE, dbscan, summarize_clusters
+from great_circle_distance import great_circle_distance_matrix
+from spatial_index import LandingSiteIndex
+import numpy as np
+import pytest
+
+rng = np.random.default_rng(39)
+lats = rng.uniform(-60, 60, 400)
+lons = rng.uniform(-180, 180, 400)
+# Six dense groups of 40 sites, one of them across the antimeridian
+centers = [(10, 20), (-35, 140), (50, -100), (0, 179.9), (65, 30), (-10, -60)]
+for i, (lat, lon) in enumerate(centers):
+    lats[i * 40:(i + 1) * 40] = lat + rng.normal(0, 0.2, 40)
+    lons[i * 40:(i + 1) * 40] = (lon + rng.normal(0, 0.2, 40) + 180) % 360 - 180
+
+def brute_force_dbscan(eps_km, min_samples):
+    neighbours = great_circle_distance_matrix(lats, lons) <= eps_km
+    core = neighbours.sum(axis=1) >= min_samples
+    labels = np.full(len(lats), NOISE)
+    cluster = 0
+    for seed in np.nonzero(core)[0]:
+        if labels[seed] != NOISE:
+            continue
+        labels[seed] = cluster
+        stack = [seed]
+        while stack:
+            site = stack.pop()
+            for other in np.nonzero(neighbours[site])[0]:
+                if labels[other] == NOISE:
+                    labels[other] = cluster
+                    if core[other]:
+                        stack.append(other)
+        cluster += 1
+    return labels, core
+
+@pytest.mark.parametrize('eps_km, min_samples', [(50, 5), (300, 3), (1000, 10)])
+def test_dbscan_matches_brute_force(eps_km, min_samples):
+    index = LandingSiteIndex(lats, lons, leaf_size=8)
+    labels = dbscan(index, eps_km, min_samples, workers=1, batch_size=16)
+    expected, core = brute_force_dbscan(eps_km, min_samples)
+    # Same noise, and the same partition of the core sites (border sites may
+    # legitimately go to either of two neighbouring clusters)
+    assert list(labels == NOISE) == list(expected == NOISE)
+    pairs = set(zip(labels[core], expected[core]))
+    assert len(pairs) == len(set(labels[core])) == len(set(expected[core]))
+
+def test_summarize_clusters():
+    records = [{'mass (g)': '10', 'recclass': 'L6' if i % 2 else 'H5', 'reclat': lat, 'reclong': lon}
+               for i, (lat, lon) in enumerate(zip(lats, lons))]
+    index = LandingSiteIndex.from_records(records)
+    labels = dbscan(index, 100, 10, workers=1)
+    summaries = summarize_clusters(index, labels)
+    assert len(summaries) == 6
+    assert sum(summary['sites'] for summary in summaries) == int((labels != NOISE).sum())
+    assert all(summary['radius_km'] < 100 for summary in summaries)
+    antimeridian = [s for s in summaries if abs(abs(s['center'][1]) - 180) < 1]
+    assert len(antimeridian) == 1 and abs(antimeridian[0]['center'][0]) < 1
+    assert summaries[0]['total_mass'] == 10.0 * summaries[0]['sites']
+    assert {recclass for recclass, _ in summaries[0]['top_classes']} == {'L6', 'H5'}
+
+def test_dbscan_empty_and_invalid():
+    assert len(dbscan(LandingSiteIndex([], []), 10)) == 0
+    with pytest.raises(ValueError):
+        dbscan(LandingSiteIndex(lats, lons), 10, min_samples=0)
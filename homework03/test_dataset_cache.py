@@ -0,0 +1,63 @@
+from dataset_cache import load_landing_columns, parse_landing_columns, evict_cache, ColumnRecords
+from ml_data_analysis import summarize_landings, summarize_columns
+from generate_landings import generate_records
+import numpy as np
+import os
+import pytest
+
+def write_csv(path, rows):
+    lines = ['name,id,recclass,mass (g),reclat,reclong']
+    lines += [','.join(row) for row in rows]
+    path.write_text('\n'.join(lines) + '\n')
+
+def test_parse_landing_columns():
+    columns = parse_landing_columns([{'name': 'a', 'mass (g)': '10', 'reclat': '1', 'reclong': '2', 'recclass': 'L5'},
+                                     {'name': None, 'mass (g)': 'x', 'reclat': None, 'reclong': '3'}])
+    assert list(columns['name']) == ['a', '']
+    assert columns['mass'][0] == 10.0 and np.isnan(columns['mass'][1])
+    assert np.isnan(columns['reclat'][1])
+
+def test_load_landing_columns_uses_cache(tmp_path):
+    data = tmp_path / 'ml.csv'
+    write_csv(data, [('a', '1', 'L5', '10', '1.5', '2.5'), ('b', '2', 'H6', '20', '-3', '4')])
+    cache_dir = str(tmp_path / 'cache')
+    first = load_landing_columns(str(data), cache_dir)
+    cached = [name for name in os.listdir(cache_dir) if name.endswith('.npz')]
+    assert len(cached) == 1
+    second = load_landing_columns(str(data), cache_dir)
+    assert list(second['name']) == ['a', 'b']
+    assert np.array_equal(first['mass'], second['mass'])
+
+def test_load_landing_columns_invalidates_changed_file(tmp_path):
+    data = tmp_path / 'ml.csv'
+    cache_dir = str(tmp_path / 'cache')
+    write_csv(data, [('a', '1', 'L5', '10', '1.5', '2.5')])
+    load_landing_columns(str(data), cache_dir)
+    write_csv(data, [('a', '1', 'L5', '10', '1.5', '2.5'), ('b', '2', 'H6', '20', '-3', '4')])
+    os.utime(data, ns=(1, 1))
+    assert len(load_landing_columns(str(data), cache_dir)['mass']) == 2
+
+def test_evict_cache(tmp_path):
+    for i, name in enumerate(['old.npz', 'mid.npz', 'new.npz']):
+        path = tmp_path / name
+        path.write_bytes(b'x' * 100)
+        os.utime(path, ns=(i * 10 ** 9, i * 10 ** 9))
+    evict_cache(str(tmp_path), max_bytes=250)
+    assert sorted(os.listdir(tmp_path)) == ['mid.npz', 'new.npz']
+
+def test_column_records():
+    columns = parse_landing_columns([{'name': 'a', 'mass (g)': '10', 'reclat': '1', 'reclong': '2'},
+                                     {'name': 'b', 'mass (g)': None, 'reclat': '3', 'reclong': '4'}])
+    records = ColumnRecords(columns)
+    assert len(records) == 2
+    assert records[1] == {'name': 'b', 'id': None, 'recclass': None, 'mass (g)': None, 'reclat': 3.0, 'reclong': 4.0}
+    assert [record['name'] for record in records[::-1]] == ['b', 'a']
+
+def test_summarize_columns_matches_summarize_landings():
+    records = list(generate_records(500, seed=11, dirty_rates={'invalid_mass': 0.05}))
+    expected = summarize_landings(records)
+    obtained = summarize_columns(parse_landing_columns(records))
+    for key in ('count', 'max_mass', 'min_mass', 'avg_latitude', 'avg_longitude', 'distance_between_first_sites'):
+        assert obtained[key] == pytest.approx(expected[key])
+    assert obtained['hemisphere_statistics'] == expected['hemisphere_statistics']
+    assert obtained['recclass_occurrences'] == expected['recclass_occurrences']
@@ -0,0 +1,59 @@
+from filters import RecordFilter, filter_columns, parse_condition
+from dataset_cache import parse_landing_columns
+from ml_data_analysis import iter_data_file, iter_json_file
+import json
+import pytest
+
+records = [
+    {'name': 'Aachen', 'id': '1', 'recclass': 'L5', 'mass (g)': '21', 'reclat': '50.775', 'reclong': '6.08333'},
+    {'name': 'Aarhus', 'id': '2', 'recclass': 'H6', 'mass (g)': '720', 'reclat': '56.18333', 'reclong': '10.23333'},
+    {'name': 'Abee', 'id': '6', 'recclass': 'EH4', 'mass (g)': '107000', 'reclat': '54.21667', 'reclong': '-113'},
+    {'name': 'Acapulco', 'id': '10', 'recclass': 'LL6', 'mass (g)': 'abc', 'reclat': '16.88333', 'reclong': '179.5'},
+    {'name': 'Achiras', 'id': '370', 'recclass': 'L6', 'mass (g)': '780', 'reclat': None, 'reclong': None},
+]
+
+@pytest.mark.parametrize('expressions, names', [
+    (['mass > 500'], ['Aarhus', 'Abee', 'Achiras']),
+    (['mass >= 720', 'mass < 1000'], ['Aarhus', 'Achiras']),
+    (['recclass ^= L'], ['Aachen', 'Acapulco', 'Achiras']),
+    (['class == H6'], ['Aarhus']),
+    (['id > 5'], ['Abee', 'Acapulco', 'Achiras']),
+    (['bbox=50,60,0,20'], ['Aachen', 'Aarhus']),
+    (['bbox=0,60,170,-100'], ['Abee', 'Acapulco']),
+])
+def test_filter_matches_records_and_columns(expressions, names):
+    where = RecordFilter.parse(expressions)
+    assert [item['name'] for item in records if where.matches(item)] == names
+    columns = filter_columns(parse_landing_columns(records), where)
+    assert columns['name'].tolist() == names
+
+@pytest.mark.parametrize('expression', ['class != H6', 'class == H6', 'class ^= H', 'mass != 720', 'name != x'])
+def test_missing_values_agree_across_paths(expression):
+    sparse = [dict(item, recclass=recclass) for item, recclass in zip(records, ['H6', '', None, 'L5', ''])]
+    sparse[1]['mass (g)'] = ''
+    where = RecordFilter.parse([expression])
+    header = list(records[0])
+    matcher = where.row_matcher(header)
+    by_record = [item['name'] for item in sparse if where.matches(item)]
+    by_row = [item['name'] for item in sparse if matcher([item[key] or '' for key in header])]
+    by_column = filter_columns(parse_landing_columns(sparse), where)['name'].tolist()
+    assert by_record == by_row == by_column
+
+def test_parse_condition_errors():
+    assert parse_condition('mass (g) <= 10').field == 'mass (g)'
+    assert RecordFilter.parse([]) is None
+    for expression in ['mass', 'mass >', 'bbox=1,2,3']:
+        with pytest.raises(ValueError):
+            parse_condition(expression)
+
+def test_readers_apply_filter(tmp_path):
+    where = RecordFilter.parse(['recclass ^= L', 'mass > 20'])
+    expected = [item['name'] for item in records if where.matches(item)]
+    csv_path = tmp_path / 'landings.csv'
+    lines = ['name,id,recclass,mass (g),reclat,reclong']
+    lines += [','.join(item[key] or '' for key in records[0]) for item in records]
+    csv_path.write_text('\n'.join(lines) + '\n')
+    json_path = tmp_path / 'landings.json'
+    json_path.write_text(json.dumps({'meteorite_landings': records}))
+    assert [item['name'] for item in iter_data_file(str(csv_path), where=where)] == expected
+    assert [item['name'] for item in iter_json_file(str(json_path), where=where)] == expected
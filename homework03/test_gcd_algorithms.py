@@ -1,6 +1,12 @@
 from great_circle_distance import calculate_great_circle_distance
+from great_circle_distance import (great_circle_distance_pairs, great_circle_distance_one_to_many,
+                                   great_circle_distance_matrix, iter_distance_matrix_blocks)
+import numpy as np
 import pytest
 
+lats = [40.7128, 34.0522, 0.0, 45.0, -45.0, 89.9]
+lons = [-74.0060, -118.2437, 0.0, 0.0, 180.0, -179.9]
+
 def test_calculate_great_circle_distance():
     # Example coordinates and their correct expected distances
     test_cases = [
@@ -14,6 +20,35 @@ def test_calculate_great_circle_distance():
         obtained_distance = calculate_great_circle_distance(lat1, lon1, lat2, lon2)
         assert obtained_distance == expected_distance
 
+def test_great_circle_distance_pairs():
+    obtained = great_circle_distance_pairs(lats, lons, lats[::-1], lons[::-1])
+    expected = [calculate_great_circle_distance(a, b, c, d)
+                for a, b, c, d in zip(lats, lons, lats[::-1], lons[::-1])]
+    assert obtained == pytest.approx(expected, abs=1.0e-06)
+
+def test_great_circle_distance_pairs_scalars():
+    obtained = great_circle_distance_pairs(10, 20, 30, 40)
+    assert obtained == pytest.approx(calculate_great_circle_distance(10, 20, 30, 40), abs=1.0e-06)
+
+def test_great_circle_distance_one_to_many():
+    obtained = great_circle_distance_one_to_many(lats[0], lons[0], lats, lons)
+    expected = [calculate_great_circle_distance(lats[0], lons[0], a, b) for a, b in zip(lats, lons)]
+    assert obtained == pytest.approx(expected, abs=1.0e-06)
+
+def test_great_circle_distance_matrix():
+    expected = np.array([[calculate_great_circle_distance(a, b, c, d) for c, d in zip(lats, lons)]
+                         for a, b in zip(lats, lons)])
+    assert np.allclose(great_circle_distance_matrix(lats, lons), expected, atol=1.0e-06)
+    assert np.allclose(great_circle_distance_matrix(lats, lons, chunk_size=4), expected, atol=1.0e-06)
+    assert great_circle_distance_matrix(lats[:2], lons[:2], lats, lons).shape == (2, 6)
+
+def test_iter_distance_matrix_blocks():
+    blocks = list(iter_distance_matrix_blocks(lats, lons, chunk_size=4))
+    assert [start for start, block in blocks] == [0, 4]
+    assert [block.shape for start, block in blocks] == [(4, 6), (2, 6)]
+    with pytest.raises(ValueError):
+        next(iter_distance_matrix_blocks(lats, lons, lats2=lats))
+
 if __name__ == '__main__':
     # Run the tests using pytest
     pytest.main(['-v', 'test_great_circle_distance.py'])
@@ -0,0 +1,40 @@
+from generate_landings import generate_records, parse_dirty_rates, write_dataset
+from bench_ml_analysis import run_benchmark
+from ml_data_analysis import iter_data_file, summarize_landings
+import json
+import pytest
+
+def test_generate_records_is_seeded():
+    first = list(generate_records(200, seed=1))
+    assert first == list(generate_records(200, seed=1))
+    assert first != list(generate_records(200, seed=2))
+    assert all(-90 <= float(item['reclat']) <= 90 and -180 <= float(item['reclong']) <= 180 for item in first)
+    assert all(float(item['mass (g)']) > 0 for item in first)
+
+def test_dirty_rates():
+    rates = parse_dirty_rates(0.0, ['invalid_mass=0.1', 'missing_coordinates=0.2'])
+    summary = summarize_landings(generate_records(5000, dirty_rates=rates))
+    assert summary['count'] == 5000
+    assert 400 < summary['invalid_mass_values'] < 600
+    assert 850 < summary['invalid_coordinates'] < 1150
+    for bad in [['mass=0.1'], ['invalid_mass']]:
+        with pytest.raises(ValueError):
+            parse_dirty_rates(0.0, bad)
+
+@pytest.mark.parametrize('file_format', ['csv', 'json', 'xml', 'yaml'])
+def test_written_formats_read_back(tmp_path, file_format):
+    path = str(tmp_path / f'landings.{file_format}')
+    assert write_dataset(path, 300, seed=7, dirty_rates={'class_typo': 0.2}) == 300
+    expected = list(generate_records(300, seed=7, dirty_rates={'class_typo': 0.2}))
+    records = list(iter_data_file(path))
+    assert [item['name'] for item in records] == [item['name'] for item in expected]
+    assert [item['recclass'] for item in records] == [item['recclass'] for item in expected]
+    assert [float(item['mass (g)']) for item in records] == [float(item['mass (g)']) for item in expected]
+
+def test_run_benchmark_records_results(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    results = run_benchmark([100], ['csv'], ['read', 'summary'], str(output))
+    assert [result['stage'] for result in results] == ['read', 'summary']
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert lines == results
+    assert all(result['rows'] == 100 and result['seconds'] > 0 and result['peak_rss_mb'] > 0 for result in lines)
@@ -0,0 +1,19 @@
+from json_stream import ArrayNotFoundError, iter_json_array
+import io
+import json
+import pytest
+
+records = [{'name': 'Aachen', 'mass (g)': '21', 'note': 'a ] in a string, {and} braces'},
+           {'name': 'Aarhus', 'mass (g)': '720'},
+           [1, 2, {'nested': [3]}], 'text', 4.5, None]
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 65536])
+def test_iter_json_array_across_chunks(chunk_size):
+    text = json.dumps({'other': {'meteorite_landings': 0}, 'meteorite_landings': records}, indent=1)
+    assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == records
+
+def test_iter_json_array_errors():
+    with pytest.raises(ArrayNotFoundError):
+        list(iter_json_array(io.StringIO('{"other": []}')))
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"meteorite_landings": [{"name": "a"},'), chunk_size=4))
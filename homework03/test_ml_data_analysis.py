@@ -1,5 +1,15 @@
 from ml_data_analysis import calculate_max_mass, calculate_min_mass, calculate_avg_latitude_longitude, calculate_distance_between_sites
+from ml_data_analysis import summarize_landings, iter_json_file, iter_csv_batches, read_json_file
+from ml_data_analysis import calculate_site_pair_statistics
+from ml_data_analysis import compute_density_grid, save_density_grid, load_density_grid, plot_landing_density
+from ml_data_analysis import main
+from spatial_index import LandingSiteIndex
 
+import json
+import ml_data_analysis
+import os
+import subprocess
+import sys
 import pytest
 
 sample_data = [
@@ -32,3 +42,104 @@ def test_calculate_distance_between_sites():
     site1 = {'reclat': '10', 'reclong': '20'}
     site2 = {'reclat': '30', 'reclong': '40'}
     assert calculate_distance_between_sites(site1, site2) == pytest.approx(3040.6028180682, abs=1e-3)
+
+def test_calculate_max_min_mass_stream():
+    assert calculate_max_mass(iter(sample_data), 'mass (g)') == 400.0
+    assert calculate_min_mass(iter(sample_data), 'mass (g)') == 100.0
+
+def test_summarize_landings():
+    data = [{'mass (g)': '100', 'reclat': '10', 'reclong': '20'},
+            {'mass (g)': '300', 'reclat': '30', 'reclong': '40'},
+            {'mass (g)': None, 'reclat': None, 'reclong': None}]
+    summary = summarize_landings(iter(data))
+    assert summary['count'] == 3
+    assert summary['max_mass'] == 300.0
+    assert summary['min_mass'] == 100.0
+    assert (summary['avg_latitude'], summary['avg_longitude']) == (20.0, 30.0)
+    assert summary['distance_between_first_sites'] == pytest.approx(3040.6028180682, abs=1e-3)
+
+SAMPLE_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Meteorite_Landings.json')
+
+def test_iter_json_file_matches_read_json_file():
+    streamed = list(iter_json_file(SAMPLE_JSON, chunk_size=64))
+    assert streamed and streamed == read_json_file(SAMPLE_JSON)
+
+def test_iter_json_file_missing():
+    assert list(iter_json_file('does_not_exist.json')) == []
+
+def test_iter_csv_batches(tmp_path):
+    path = tmp_path / 'ml.csv'
+    path.write_text('name,mass (g),GeoLocation\na,1,"(1.0, 2.0)"\nb,2,"(3.0, 4.0)"\nc,3,"(5.0, 6.0)"\n')
+    batches = list(iter_csv_batches(str(path), batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert batches[0][0]['GeoLocation'] == '(1.0, 2.0)'
+
+def test_calculate_site_pair_statistics():
+    index = LandingSiteIndex([10, 30, 10.5], [20, 40, 20])
+    pairs = calculate_site_pair_statistics(index, workers=1)
+    assert sorted(pairs['closest_pair'][1:]) == [0, 2]
+    assert pairs['closest_pair'][0] == pytest.approx(55.597, abs=1e-3)
+    assert sorted(pairs['farthest_pair'][1:]) in ([0, 1], [1, 2])
+    assert pairs['max_nearest_neighbour_distance'] >= pairs['mean_nearest_neighbour_distance']
+
+def test_compute_density_grid():
+    data = [{'reclat': '10.5', 'reclong': '20.5'}, {'reclat': '10.2', 'reclong': '20.9'},
+            {'reclat': '-45', 'reclong': '179.5'}, {'reclat': None, 'reclong': None}]
+    counts, lat_edges, lon_edges = compute_density_grid(iter(data), lat_bins=18, lon_bins=36, batch_size=2)
+    assert counts.shape == (18, 36)
+    assert counts.sum() == 3
+    assert counts[10, 20] == 2
+    assert counts[4, 35] == 1
+
+def test_density_grid_cache(tmp_path):
+    grid = compute_density_grid([{'reclat': '1', 'reclong': '2'}], lat_bins=4, lon_bins=8)
+    path = str(tmp_path / 'grid.npz')
+    save_density_grid(path, grid, source='a')
+    counts, lat_edges, lon_edges = load_density_grid(path, source='a')
+    assert (counts == grid[0]).all()
+    assert load_density_grid(path, source='b') is None
+    assert load_density_grid(str(tmp_path / 'missing.npz'), source='a') is None
+
+def test_plot_landing_density(tmp_path):
+    grid = compute_density_grid([{'reclat': '1', 'reclong': '2'}], lat_bins=4, lon_bins=8)
+    for scale in ('log', 'sqrt', 'linear'):
+        output = tmp_path / f'{scale}.png'
+        plot_landing_density(grid, output=str(output), color_scale=scale)
+        assert output.stat().st_size > 0
+    with pytest.raises(ValueError):
+        plot_landing_density(grid, output=str(tmp_path / 'bad.png'), color_scale='cubic')
+
+def write_landings(tmp_path):
+    path = tmp_path / 'landings.json'
+    path.write_text(json.dumps({'meteorite_landings': [
+        {'name': 'Aachen', 'recclass': 'L5', 'mass (g)': '21', 'reclat': '50.775', 'reclong': '6.08333'},
+        {'name': 'Aarhus', 'recclass': 'H6', 'mass (g)': '720', 'reclat': '56.18333', 'reclong': '10.23333'},
+        {'name': 'Abee', 'recclass': 'EH4', 'mass (g)': '107000', 'reclat': '54.21667', 'reclong': '-113'},
+    ]}))
+    return str(path)
+
+def test_subcommands(tmp_path, capsys):
+    path = write_landings(tmp_path)
+    main(['stats', path])
+    output = capsys.readouterr().out
+    assert 'Maximum Mass: 107000.0 g' in output and 'pair of landing sites' not in output
+
+    main(['distance', '--between', '0', '0', '0', '90'])
+    assert capsys.readouterr().out.startswith('Great-circle distance: 10007.5')
+
+    main(['nearest', path, '--near', '56', '10', '-k', '1'])
+    assert 'Aarhus' in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(['nearest', path])
+
+    # Without a subcommand the original command line still works
+    main([path, '--near', '56', '10', '-k', '1'])
+    assert 'Aarhus' in capsys.readouterr().out
+
+def test_stats_does_not_import_plotting(tmp_path):
+    path = write_landings(tmp_path)
+    code = (f"import sys; sys.path.insert(0, {os.path.dirname(ml_data_analysis.__file__)!r}); "
+            f"import ml_data_analysis; ml_data_analysis.main(['stats', {path!r}]); "
+            "print(sorted(m for m in ('numpy', 'matplotlib') if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().endswith('[]')
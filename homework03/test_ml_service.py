@@ -0,0 +1,67 @@
+from ml_service import LandingService, app
+import json
+import os
+import pytest
+
+def write_landings(path, landings):
+    path.write_text(json.dumps({'meteorite_landings': [
+        {'name': name, 'recclass': recclass, 'mass (g)': mass, 'reclat': lat, 'reclong': lon}
+        for name, recclass, mass, lat, lon in landings]}))
+    return str(path)
+
+LANDINGS = [
+    ('Aachen', 'L5', '21', '50.775', '6.08333'),
+    ('Aarhus', 'H6', '720', '56.18333', '10.23333'),
+    ('Abee', 'EH4', '107000', '54.21667', '-113'),
+    ('Acapulco', 'Acapulcoite', '1914', '16.88333', '-99.9'),
+]
+
+@pytest.fixture
+def client(tmp_path):
+    path = write_landings(tmp_path / 'landings.json', LANDINGS)
+    app.config['LANDING_SERVICE'] = LandingService(path)
+    yield app.test_client()
+    del app.config['LANDING_SERVICE']
+
+def test_stats_and_version(client):
+    stats = client.get('/stats').get_json()
+    assert stats['count'] == 4 and stats['max_mass'] == 107000.0
+    assert stats['recclass_occurrences']['L5'] == 1
+    version = client.get('/version').get_json()
+    assert version['records'] == 4 and version['sites'] == 4
+
+def test_nearest_radius_and_distance(client):
+    sites = client.get('/nearest?lat=56&lon=10&k=2').get_json()['sites']
+    assert [site['name'] for site in sites] == ['Aarhus', 'Aachen']
+    assert sites[0]['distance_km'] < sites[1]['distance_km']
+
+    radius = client.get('/radius?lat=53&lon=8&km=500&limit=1').get_json()
+    assert radius['count'] == 2 and [site['name'] for site in radius['sites']] == ['Aachen']
+
+    distance = client.get('/distance?lat1=0&lon1=0&lat2=0&lon2=90').get_json()
+    assert distance['distance_km'] == pytest.approx(10007.5, abs=0.1)
+
+def test_batch(client):
+    response = client.post('/batch', json={'points': [[56, 10], [17, -100]], 'k': 1})
+    assert [[site['name'] for site in sites] for sites in response.get_json()['sites']] == [['Aarhus'], ['Acapulco']]
+    response = client.post('/batch', json={'points': [[53, 8], [0, 0]], 'km': 500})
+    assert response.get_json()['counts'] == [2, 0]
+
+@pytest.mark.parametrize('query', ['/nearest?lat=56', '/nearest?lat=91&lon=0', '/nearest?lat=x&lon=0',
+                                   '/radius?lat=0&lon=0', '/nearest?lat=0&lon=0&k=0'])
+def test_invalid_queries(client, query):
+    response = client.get(query)
+    assert response.status_code == 400 and 'error' in response.get_json()
+
+def test_invalid_batch(client):
+    assert client.post('/batch', json={'points': [[1, 2, 3]]}).status_code == 400
+    assert client.post('/batch', data='not json').status_code == 400
+
+def test_reload_on_new_version(client, tmp_path):
+    service = app.config['LANDING_SERVICE']
+    assert client.get('/nearest?lat=0&lon=0').get_json()['sites'][0]['name'] == 'Aachen'
+    write_landings(tmp_path / 'landings.json', LANDINGS + [('Null Island', 'H5', '5', '0.1', '0.1')])
+    # Modification times can be too coarse to tell quick rewrites apart
+    os.utime(service.filename, ns=(0, 10 ** 9))
+    assert client.get('/nearest?lat=0&lon=0').get_json()['sites'][0]['name'] == 'Null Island'
+    assert client.get('/stats').get_json()['count'] == 5
@@ -0,0 +1,53 @@
+from ml_shard_analysis import analyze_shards, expand_shard_paths
+from ml_data_analysis import iter_yaml_file
+from generate_landings import generate_records
+from aggregates import LandingAggregate
+import json
+import pytest
+
+def write_shards(tmp_path):
+    records = list(generate_records(30, seed=7))
+    csv_lines = ['name,id,recclass,mass (g),reclat,reclong,GeoLocation']
+    for item in records[:10]:
+        csv_lines.append(f"{item['name']},{item['id']},{item['recclass']},{item['mass (g)']},"
+                         f"{item['reclat']},{item['reclong']},\"{item['GeoLocation']}\"")
+    (tmp_path / 'shard1.csv').write_text('\n'.join(csv_lines) + '\n')
+    (tmp_path / 'shard2.json').write_text(json.dumps({'meteorite_landings': records[10:20]}))
+    xml_items = ''.join(f"<meteorite_landings><name>{item['name']}</name><recclass>{item['recclass']}</recclass>"
+                        f"<mass_g>{item['mass (g)']}</mass_g><reclat>{item['reclat']}</reclat>"
+                        f"<reclong>{item['reclong']}</reclong></meteorite_landings>" for item in records[20:25])
+    (tmp_path / 'shard3.xml').write_text(f'<data>{xml_items}</data>')
+    yaml_items = ''.join(f"- name: {item['name']}\n  recclass: {item['recclass']}\n  mass (g): '{item['mass (g)']}'\n"
+                         f"  GeoLocation: '{item['GeoLocation']}'\n" for item in records[25:])
+    (tmp_path / 'shard4.yaml').write_text('meteorite_landings:\n' + yaml_items)
+    return records
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_analyze_shards_matches_single_file(tmp_path, workers):
+    records = write_shards(tmp_path)
+    expected = LandingAggregate().update(records).summary()
+    obtained = analyze_shards(expand_shard_paths([str(tmp_path / 'shard*')]), workers=workers).summary()
+    assert obtained['count'] == expected['count'] == 30
+    assert obtained['average_mass'] == pytest.approx(expected['average_mass'])
+    assert obtained['avg_latitude'] == pytest.approx(expected['avg_latitude'])
+    assert obtained['geographical_std_deviation'] == pytest.approx(expected['geographical_std_deviation'])
+    assert obtained['hemisphere_statistics'] == expected['hemisphere_statistics']
+    assert obtained['recclass_occurrences'] == expected['recclass_occurrences']
+
+def test_iter_yaml_file_without_records(tmp_path):
+    path = tmp_path / 'empty.yaml'
+    path.write_text('meteorite_landings:\n')
+    assert list(iter_yaml_file(str(path))) == []
+
+def test_expand_shard_paths(tmp_path):
+    write_shards(tmp_path)
+    assert [p.rsplit('/', 1)[1] for p in expand_shard_paths([str(tmp_path / '*.csv'), 'other.json'])[:1]] == ['shard1.csv']
+    assert expand_shard_paths(['other.json']) == ['other.json']
+
+def test_analyze_shards_approximate_classes(tmp_path):
+    records = write_shards(tmp_path)
+    expected = LandingAggregate().update(records).summary()['recclass_occurrences']
+    summary = analyze_shards(expand_shard_paths([str(tmp_path / 'shard*')]), workers=2, class_capacity=4).summary()
+    assert len(summary['recclass_occurrences']) <= 4
+    for recclass, count in summary['recclass_occurrences'].items():
+        assert count - summary['recclass_error_bounds'][recclass] <= expected[recclass] <= count
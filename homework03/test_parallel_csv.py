@@ -0,0 +1,62 @@
+from parallel_csv import next_record_start, parse_csv_columns, split_csv_ranges
+from dataset_cache import parse_landing_columns
+from filters import RecordFilter
+from generate_landings import write_dataset
+from ml_data_analysis import iter_data_file
+import numpy as np
+import pytest
+
+def assert_columns_equal(expected, actual):
+    assert expected.keys() == actual.keys()
+    for column in expected:
+        assert np.array_equal(expected[column], actual[column], equal_nan=expected[column].dtype.kind == 'f'), column
+
+def write_quoted_csv(path):
+    # Quoted fields holding commas, escaped quotes and newlines
+    lines = ['name,id,recclass,mass (g),reclat,reclong,GeoLocation']
+    for i in range(50):
+        name = f'"Site, ""{i}""\nnorth"' if i % 3 == 0 else f'Site {i}'
+        lines.append(f'{name},{i},L{i % 6},{i * 10},{i - 25}.5,{i * 3},"({i - 25}.5, {i * 3}.0)"')
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+def test_next_record_start(tmp_path):
+    path = tmp_path / 'a.csv'
+    path.write_bytes(b'a,b\n"x\ny",1\nz,2\n')
+    assert next_record_start(str(path), 0, False) == 4
+    # Inside the quoted field the first newline is not a record boundary
+    assert next_record_start(str(path), 6, True) == 12
+    assert next_record_start(str(path), 16, False) == 16
+
+@pytest.mark.parametrize('n_ranges', [1, 2, 7, 40])
+def test_split_csv_ranges_on_record_boundaries(tmp_path, n_ranges):
+    path = write_quoted_csv(tmp_path / 'quoted.csv')
+    header, ranges = split_csv_ranges(path, n_ranges, workers=1)
+    assert header[-1] == 'GeoLocation'
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    with open(path, 'rb') as f:
+        data = f.read()
+    for start, _ in ranges:
+        assert data[start - 1:start] == b'\n' and data[:start].count(b'"') % 2 == 0
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parse_csv_columns_matches_serial_parse(tmp_path, workers):
+    path = write_quoted_csv(tmp_path / 'quoted.csv')
+    expected = parse_landing_columns(iter_data_file(path))
+    assert expected['name'][0] == 'Site, "0"\nnorth'
+    assert_columns_equal(expected, parse_csv_columns(path, workers=workers, chunk_bytes=256))
+
+def test_parse_csv_columns_generated_and_filtered(tmp_path):
+    path = str(tmp_path / 'landings.csv')
+    write_dataset(path, 2000, seed=5, dirty_rates={'invalid_mass': 0.05, 'missing_coordinates': 0.05})
+    assert_columns_equal(parse_landing_columns(iter_data_file(path)),
+                         parse_csv_columns(path, workers=2, chunk_bytes=4096))
+    where = RecordFilter.parse(['mass > 100'])
+    assert_columns_equal(parse_landing_columns(iter_data_file(path, where=where)),
+                         parse_csv_columns(path, workers=1, chunk_bytes=4096, where=where))
+
+def test_parse_csv_columns_header_only(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_text('name,id,recclass,mass (g),reclat,reclong\n')
+    columns = parse_csv_columns(str(path))
+    assert all(len(values) == 0 for values in columns.values())
@@ -0,0 +1,47 @@
+from profiling import StageProfiler, profile_stage
+import json
+import pstats
+import tracemalloc
+
+def test_nested_stages(tmp_path):
+    profiler = StageProfiler(cprofile=True)
+    profiler.start()
+    with profiler.stage('outer'):
+        big = [0] * 1000000
+        del big
+        with profiler.stage('inner'):
+            sum(range(100000))
+    profiler.stop()
+
+    stages = {stage['stage']: stage for stage in profiler.stages}
+    assert list(stages) == ['outer/inner', 'outer']
+    # The outer peak survives the peak reset of the inner stage
+    assert stages['outer']['peak_memory_mb'] >= 8
+    assert stages['outer/inner']['peak_memory_mb'] < stages['outer']['peak_memory_mb']
+    assert stages['outer']['wall_seconds'] >= stages['outer/inner']['wall_seconds']
+    assert profiler.total['wall_seconds'] >= stages['outer']['wall_seconds']
+    assert 'outer/inner' in profiler.format_table()
+
+    profiler.write_report(str(tmp_path / 'report.json'))
+    report = json.loads((tmp_path / 'report.json').read_text())
+    assert [stage['stage'] for stage in report['stages']] == ['outer/inner', 'outer']
+    profiler.dump_cprofile(str(tmp_path / 'run.prof'))
+    assert pstats.Stats(str(tmp_path / 'run.prof')).total_calls > 0
+
+def test_stages_without_reset_peak(monkeypatch):
+    # Python 3.8 has no tracemalloc.reset_peak
+    monkeypatch.delattr(tracemalloc, 'reset_peak')
+    profiler = StageProfiler()
+    profiler.start()
+    with profiler.stage('load'):
+        big = [0] * 1000000
+        del big
+    with profiler.stage('plot'):
+        pass
+    profiler.stop()
+    peaks = [stage['peak_memory_mb'] for stage in profiler.stages]
+    assert peaks[0] >= 8 and peaks[1] >= peaks[0]
+
+def test_profile_stage_off():
+    with profile_stage(None, 'anything'):
+        pass
@@ -0,0 +1,64 @@
+from sampling import LandingSample, estimate_mean, reservoir_sample, stratified_reservoir_sample
+from collections import Counter
+from generate_landings import generate_records
+from ml_data_analysis import main, summarize_landings
+import random
+import pytest
+
+def test_reservoir_sample_is_uniform():
+    rng = random.Random(1)
+    counts = Counter()
+    for _ in range(10000):
+        sample, read = reservoir_sample(range(20), 5, rng)
+        assert read == 20 and len(set(sample)) == 5
+        counts.update(sample)
+    # Every item is expected 2500 times
+    assert all(2300 < count < 2700 for count in counts.values())
+
+def test_reservoir_sample_short_stream():
+    assert reservoir_sample(iter(range(3)), 5) == ([0, 1, 2], 3)
+    assert reservoir_sample(range(3), 0) == ([], 3)
+
+def test_stratified_reservoir_sample():
+    records = [{'recclass': 'L6' if i % 10 else 'H5', 'i': i} for i in range(1000)]
+    strata, counts = stratified_reservoir_sample(records, 50, rng=random.Random(2))
+    assert counts == {'L6': 900, 'H5': 100}
+    assert all(len(sample) == 50 for sample in strata.values())
+    assert all(item['recclass'] == recclass for recclass, sample in strata.items() for item in sample)
+
+def test_estimate_mean():
+    values = [float(v) for v in range(100)]
+    # A stratum sampled in full has no sampling error
+    assert estimate_mean([(values, 100, 100)]) == {'mean': 49.5, 'low': 49.5, 'high': 49.5, 'confidence': 0.95}
+    estimate = estimate_mean([(values[:10], 10, 1000)])
+    assert estimate['low'] < 4.5 < estimate['high']
+    # Strata are weighted by their population, not their sample size
+    assert estimate_mean([([0.0], 1, 1), ([10.0], 1, 3)])['mean'] == 7.5
+    assert estimate_mean([([], 5, 10)]) is None
+
+@pytest.mark.parametrize('stratify_by', [None, 'recclass'])
+def test_confidence_intervals_cover_population_means(stratify_by):
+    records = list(generate_records(20000, seed=11))
+    full = summarize_landings(records)
+    sample = LandingSample.draw(records, 1000 if stratify_by is None else 100, stratify_by, seed=3)
+    assert sample.population == 20000
+    for key, estimate in sample.confidence_intervals(0.999).items():
+        assert estimate['low'] <= full[key] <= estimate['high']
+
+def test_stats_sample(tmp_path, capsys):
+    path = tmp_path / 'landings.json'
+    path.write_text('{"meteorite_landings": [' + ','.join(
+        f'{{"name": "s{i}", "recclass": "L{i % 3}", "mass (g)": "{i}", "reclat": "{i % 90}", "reclong": "0"}}'
+        for i in range(500)) + ']}')
+    main(['stats', str(path), '--sample', '50', '--seed', '1'])
+    output = capsys.readouterr().out
+    assert 'random sample of 50 of 500 records' in output and 'Estimated Average Mass' in output
+    # Statistics computed on the sample itself are labelled as such
+    assert 'Sample Maximum Mass' in output and '\nMaximum Mass' not in output
+    main(['stats', str(path), '--sample', '10', '--stratify', '--seed', '1'])
+    output = capsys.readouterr().out
+    assert 'random sample of 30 of 500 records (3 recclass strata)' in output
+    # Only the weighted estimates and the exact class counts of a stratified sample are printed
+    assert 'Maximum Mass' not in output and '  L2: 166' in output
+    with pytest.raises(SystemExit):
+        main(['stats', str(path), '--sample', '0'])
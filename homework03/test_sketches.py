@@ -0,0 +1,111 @@
+from collections import Counter
+import json
+import random
+from sketches import ExactQuantiles, KLLSketch, SpaceSaving
+import pytest
+
+def zipf_stream(n, seed):
+    rng = random.Random(seed)
+    return [f'class{int(rng.paretovariate(1.2))}' for _ in range(n)]
+
+def check_bounds(sketch, stream):
+    true_counts = Counter(stream)
+    for item, count, error in sketch.top():
+        assert count - error <= true_counts[item] <= count
+    for item, count in true_counts.items():
+        if item not in sketch.counts:
+            assert count <= sketch.max_error
+
+def test_space_saving_exact_below_capacity():
+    sketch = SpaceSaving(10)
+    for item in ['L6', 'H5', 'L6', 'L5', 'L6']:
+        sketch.add(item)
+    assert sketch.top(2) == [('L6', 3, 0), ('H5', 1, 0)]
+    assert sketch.max_error == 0
+    assert sketch.total == 5
+
+def test_space_saving_error_bounds():
+    stream = zipf_stream(20000, seed=1)
+    sketch = SpaceSaving(50)
+    for item in stream:
+        sketch.add(item)
+    assert len(sketch.counts) == 50
+    assert sketch.max_error <= len(stream) / 50
+    check_bounds(sketch, stream)
+    assert sketch.top(1)[0][0] == Counter(stream).most_common(1)[0][0]
+
+def test_space_saving_merge():
+    stream = zipf_stream(20000, seed=2)
+    shards = [stream[i::4] for i in range(4)]
+    merged = SpaceSaving(50)
+    for shard in shards:
+        sketch = SpaceSaving(50)
+        for item in shard:
+            sketch.add(item)
+        merged.merge(sketch)
+    assert merged.total == len(stream)
+    check_bounds(merged, stream)
+
+def test_space_saving_rejects_empty_capacity():
+    with pytest.raises(ValueError):
+        SpaceSaving(0)
+
+def rank_error(sorted_values, value, q):
+    below = sum(1 for v in sorted_values if v < value)
+    return abs(below / len(sorted_values) - q)
+
+def test_kll_exact_on_small_input():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    sketch, exact = KLLSketch(k=50), ExactQuantiles()
+    sketch.add_array(values)
+    exact.add_array(values)
+    assert sketch.is_exact
+    assert sketch.quantiles([0, 0.5, 0.9, 1]) == exact.quantiles([0, 0.5, 0.9, 1]) == [1.0, 3.0, 5.0, 5.0]
+    assert KLLSketch().quantile(0.5) is None
+
+def test_kll_accuracy_against_exact():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(6, 2) for _ in range(50000)]
+    sketch = KLLSketch(k=200)
+    for value in values:
+        sketch.add(value)
+    assert not sketch.is_exact
+    assert sum(len(level) for level in sketch.levels) < 2000
+    sorted_values = sorted(values)
+    for q, value in zip([0.5, 0.9, 0.99], sketch.quantiles([0.5, 0.9, 0.99])):
+        assert rank_error(sorted_values, value, q) < 0.01
+
+def test_kll_merge():
+    rng = random.Random(4)
+    values = [rng.expovariate(1) for _ in range(40000)]
+    merged = KLLSketch(k=200)
+    for i in range(4):
+        shard = KLLSketch(k=200, seed=i)
+        shard.add_array(values[i::4])
+        merged.merge(shard)
+    assert merged.count == len(values)
+    sorted_values = sorted(values)
+    for q, value in zip([0.5, 0.9, 0.99], merged.quantiles([0.5, 0.9, 0.99])):
+        assert rank_error(sorted_values, value, q) < 0.01
+
+def test_state_round_trip():
+    stream = zipf_stream(20000, seed=5)
+    summary = SpaceSaving(50)
+    for item in stream[:10000]:
+        summary.add(item)
+    restored = SpaceSaving.from_dict(json.loads(json.dumps(summary.to_dict())))
+    for item in stream[10000:]:
+        summary.add(item)
+        restored.add(item)
+    assert restored.top() == summary.top() and restored.max_error == summary.max_error
+
+    rng = random.Random(9)
+    values = [rng.lognormvariate(3, 2) for _ in range(20000)]
+    for sketch in (KLLSketch(50), ExactQuantiles()):
+        sketch.add_array(values[:10000])
+        restored = type(sketch).from_dict(json.loads(json.dumps(sketch.to_dict())))
+        sketch.add_array(values[10000:])
+        restored.add_array(values[10000:])
+        # The random offsets continue where they stopped, so compaction is identical
+        assert restored.quantiles([0.1, 0.5, 0.99]) == sketch.quantiles([0.1, 0.5, 0.99])
+        assert restored.count == sketch.count
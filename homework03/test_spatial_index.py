@@ -0,0 +1,80 @@
+from spatial_index import LandingSiteIndex, nearest_neighbour_distances, neighbour_counts, closest_pair, farthest_pair
+from great_circle_distance import great_circle_distance_one_to_many, great_circle_distance_matrix
+import numpy as np
+import pytest
+
+rng = np.random.default_rng(332)
+lats = np.degrees(np.arcsin(rng.uniform(-1, 1, 500)))
+lons = rng.uniform(-180, 180, 500)
+index = LandingSiteIndex(lats, lons, leaf_size=8)
+
+def test_query_nearest():
+    distances = great_circle_distance_one_to_many(12.5, -40.0, lats, lons)
+    obtained_distances, positions = index.query_nearest(12.5, -40.0, k=5)
+    assert obtained_distances == pytest.approx(np.sort(distances)[:5], abs=1.0e-06)
+    assert list(positions) == list(np.argsort(distances)[:5])
+
+def test_query_radius():
+    distances = great_circle_distance_one_to_many(-30.0, 150.0, lats, lons)
+    obtained_distances, positions = index.query_radius(-30.0, 150.0, 2000)
+    assert set(positions) == set(np.nonzero(distances <= 2000)[0])
+    assert list(obtained_distances) == sorted(obtained_distances)
+
+def test_query_radius_many_and_union():
+    query_lats, query_lons = [-30.0, 10.0, 80.0], [150.0, -20.0, 0.0]
+    offsets, positions = index.query_radius_many(query_lats, query_lons, 1500)
+    expected = [set(np.nonzero(great_circle_distance_one_to_many(lat, lon, lats, lons) <= 1500)[0])
+                for lat, lon in zip(query_lats, query_lons)]
+    assert [set(positions[offsets[i]:offsets[i + 1]]) for i in range(3)] == expected
+    assert list(index.query_radius_union(query_lats, query_lons, 1500)) == sorted(set().union(*expected))
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_neighbour_counts(workers):
+    expected = (great_circle_distance_matrix(lats, lons) <= 800).sum(axis=1)
+    assert list(neighbour_counts(index, 800, workers=workers, chunk_size=150)) == list(expected)
+
+def test_query_bbox():
+    inside = (lats >= -20) & (lats <= 35) & (lons >= 10) & (lons <= 80)
+    assert list(index.query_bbox(-20, 35, 10, 80)) == list(np.nonzero(inside)[0])
+
+def test_query_bbox_antimeridian():
+    inside = (lats >= 0) & (lats <= 60) & ((lons >= 170) | (lons <= -170))
+    assert list(index.query_bbox(0, 60, 170, -170)) == list(np.nonzero(inside)[0])
+
+def test_from_records_skips_invalid_coordinates():
+    records = [{'reclat': '10', 'reclong': '20'}, {'reclat': None, 'reclong': None},
+               {'reclat': 'abc', 'reclong': '1'}, {'reclat': '30', 'reclong': '40'}]
+    site_index = LandingSiteIndex.from_records(records)
+    assert len(site_index) == 2
+    assert list(site_index.ids) == [0, 3]
+    distances, positions = site_index.query_nearest(29, 41, k=1)
+    assert site_index.records[positions[0]] is records[3]
+
+def test_empty_index():
+    empty = LandingSiteIndex([], [])
+    assert len(empty.query_nearest(0, 0, k=3)[1]) == 0
+    assert len(empty.query_radius(0, 0, 100)[1]) == 0
+    assert len(empty.query_bbox(-90, 90, -180, 180)) == 0
+
+def test_nearest_neighbour_distances():
+    matrix = great_circle_distance_matrix(lats, lons)
+    np.fill_diagonal(matrix, np.inf)
+    distances, neighbours = nearest_neighbour_distances(index, workers=1, chunk_size=128)
+    assert distances == pytest.approx(matrix.min(axis=1), abs=1.0e-06)
+    assert list(neighbours) == list(matrix.argmin(axis=1))
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_closest_and_farthest_pair(workers):
+    matrix = great_circle_distance_matrix(lats, lons)
+    np.fill_diagonal(matrix, np.inf)
+    distance, site1, site2 = closest_pair(index, workers=workers, chunk_size=128)
+    assert distance == pytest.approx(matrix.min(), abs=1.0e-06)
+    assert matrix[site1, site2] == pytest.approx(distance, abs=1.0e-06)
+    np.fill_diagonal(matrix, -1)
+    distance, site1, site2 = farthest_pair(index, workers=workers, chunk_size=128)
+    assert distance == pytest.approx(matrix.max(), abs=1.0e-06)
+
+def test_pairs_need_two_sites():
+    single = LandingSiteIndex([10.0], [20.0])
+    assert closest_pair(single) is None
+    assert farthest_pair(single) is None
@@ -1,20 +1,242 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 import requests
 import redis
 import csv
 import json
+import logging
+import os
+import threading
+from collections import OrderedDict
 
 app = Flask(__name__)
-redis_client = redis.StrictRedis(host='localhost', port=6379, db=0)
+logging.basicConfig(level=logging.INFO)
+redis_client = redis.StrictRedis(host='localhost', port=6379, db=0, decode_responses=True)
 
+# Each load writes a new generation of keys: every gene as compact JSON under
+# gene:<generation>:<hgnc_id>, and genes:ids:<generation>, a sorted set of the
+# ids scored by their row in the HGNC file so that the ids come back in file
+# order. Without a generation the keys are gene:<hgnc_id> and genes:ids, the
+# layout of earlier versions of the API.
+GENE_KEY_PREFIX = 'gene:'
+GENE_IDS_KEY = 'genes:ids'
+# Key of the single JSON blob used by earlier versions of the API
+LEGACY_DATA_KEY = 'hgnc_data'
+# Genes fetched or deleted per Redis round trip
+BATCH_SIZE = 1000
+# HGNC complete set; HGNC_SOURCE may name another URL or a local TSV file
+HGNC_URL = 'https://g-a8b222.dd271.03c0.data.globus.org/pub/databases/genenames/hgnc/tsv/hgnc_complete_set.txt'
+# Genes written per pipelined Redis round trip while loading
+LOAD_BATCH_SIZE = int(os.environ.get('HGNC_BATCH_SIZE', 500))
+# Loading progress is logged every this many genes
+PROGRESS_EVERY = 10000
+# Generation of the genes being served. A load points it at the generation it
+# wrote only once every gene is stored, so API workers can tell with one small
+# GET which keys to read and whether their in-process cache is stale.
+DATA_VERSION_KEY = 'genes:version'
+# Counter allocating the generation of each load
+GENERATION_KEY = 'genes:generation'
+# Genes kept in the in-process cache of each worker (0 keeps every gene read)
+GENE_CACHE_SIZE = int(os.environ.get('GENE_CACHE_SIZE', 0))
 
-def parse_hgnc_data(url):
-    response = requests.get(url)
-    response.raise_for_status()
-    decoded_content = response.content.decode('utf-8')
-    csv_reader = csv.DictReader(decoded_content.splitlines(), delimiter='\t')
-    data = [row for row in csv_reader]
-    return data
+
+def gene_key(hgnc_id, version=None):
+    return f'{GENE_KEY_PREFIX}{hgnc_id}' if version is None else f'{GENE_KEY_PREFIX}{version}:{hgnc_id}'
+
+
+def ids_key(version=None):
+    return GENE_IDS_KEY if version is None else f'{GENE_IDS_KEY}:{version}'
+
+
+class GeneCache:
+    """
+    Read-through cache of the gene id list and of hgnc_id -> gene JSON, held
+    in the API process. Every lookup first reads the data version key and
+    reads the genes of that generation; a version other than the one the
+    cache was filled under empties the cache. Genes of the unversioned layout
+    (no version key) are never cached, since deleting them leaves the version
+    unchanged.
+    With max_size, the least recently used genes are dropped beyond that size.
+    """
+
+    def __init__(self, max_size=0):
+        self.max_size = max_size
+        self.version = None
+        self.ids_json = None
+        self.genes = OrderedDict()
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Empty the cache if the stored genes changed since it was filled, and
+        return the current version.
+        """
+        version = redis_client.get(DATA_VERSION_KEY)
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.ids_json = None
+                self.genes.clear()
+        return version
+
+    def get_ids_json(self):
+        """
+        Return the JSON list of all hgnc_ids, or None when no genes are stored.
+        """
+        version = self.refresh()
+        ids_json = self.ids_json
+        if ids_json is None:
+            gene_ids = list(iter_gene_ids(version))
+            if not gene_ids:
+                return None
+            ids_json = json.dumps(gene_ids)
+            with self.lock:
+                # Results read before another request saw a newer version are not kept
+                if version is not None and version == self.version:
+                    self.ids_json = ids_json
+        return ids_json
+
+    def get_gene_json(self, hgnc_id):
+        """
+        Return the stored JSON of one gene, or None when it is not stored.
+        """
+        version = self.refresh()
+        with self.lock:
+            if hgnc_id in self.genes:
+                self.genes.move_to_end(hgnc_id)
+                return self.genes[hgnc_id]
+        gene = redis_client.get(gene_key(hgnc_id, version))
+        if gene is not None:
+            with self.lock:
+                if version is None or version != self.version:
+                    return gene
+                self.genes[hgnc_id] = gene
+                if self.max_size and len(self.genes) > self.max_size:
+                    self.genes.popitem(last=False)
+        return gene
+
+
+gene_cache = GeneCache(GENE_CACHE_SIZE)
+
+
+def parse_hgnc_data(source):
+    """
+    Yield the rows of the HGNC TSV as dicts while it is read, from a URL
+    (streamed line by line) or a local file, so the whole file is never held
+    in memory.
+    """
+    if not source.startswith(('http://', 'https://')):
+        with open(source, encoding='utf-8', newline='') as f:
+            yield from csv.DictReader(f, delimiter='\t')
+        return
+    with requests.get(source, stream=True) as response:
+        response.raise_for_status()
+        response.encoding = 'utf-8'
+        yield from csv.DictReader(response.iter_lines(decode_unicode=True), delimiter='\t')
+
+
+def store_genes(genes, batch_size=None):
+    """
+    Replace the stored genes with the given rows, one key per gene, writing
+    them in pipelined batches of batch_size genes as the rows arrive. The rows
+    go to a new generation of keys that readers only see once every row is
+    stored; then the data version is swapped to it and the replaced generation
+    deleted. If reading the rows fails, the partial generation is deleted and
+    the stored genes are kept. Rows without an hgnc_id are skipped. Returns
+    the number of genes stored.
+    """
+    batch_size = batch_size or LOAD_BATCH_SIZE
+    generation = str(redis_client.incr(GENERATION_KEY))
+    pipeline = redis_client.pipeline(transaction=False)
+    count = 0
+    try:
+        for gene in genes:
+            hgnc_id = gene.get('hgnc_id')
+            if not hgnc_id:
+                continue
+            pipeline.set(gene_key(hgnc_id, generation), json.dumps(gene, separators=(',', ':')))
+            pipeline.zadd(ids_key(generation), {hgnc_id: count})
+            count += 1
+            if count % batch_size == 0:
+                pipeline.execute()
+            if count % PROGRESS_EVERY == 0:
+                logging.info(f'Stored {count} genes.')
+        pipeline.execute()
+    except BaseException:
+        logging.error(f'Loading failed after {count} genes; keeping the stored genes.')
+        clear_genes(generation)
+        raise
+
+    replaced = swap_version(generation)
+    clear_genes(replaced)
+    logging.info(f'Stored {count} genes in total.')
+    return count
+
+
+def swap_version(version):
+    """
+    Atomically point the data version at another generation (None serves no
+    genes) and return the generation it replaced.
+    """
+    pipeline = redis_client.pipeline()
+    pipeline.get(DATA_VERSION_KEY)
+    if version is None:
+        pipeline.delete(DATA_VERSION_KEY)
+    else:
+        pipeline.set(DATA_VERSION_KEY, version)
+    replaced, _ = pipeline.execute()
+    return replaced
+
+
+def clear_genes(version=None):
+    """
+    Delete every gene and the id set of one generation, and the legacy blob.
+    """
+    while True:
+        hgnc_ids = redis_client.zrange(ids_key(version), 0, BATCH_SIZE - 1)
+        if not hgnc_ids:
+            break
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.delete(*[gene_key(hgnc_id, version) for hgnc_id in hgnc_ids])
+        pipeline.zrem(ids_key(version), *hgnc_ids)
+        pipeline.execute()
+    redis_client.delete(ids_key(version), LEGACY_DATA_KEY)
+
+
+def iter_gene_ids(version=None):
+    """
+    Yield the hgnc_ids of one generation in file order, fetched in batches.
+    """
+    start = 0
+    while True:
+        hgnc_ids = redis_client.zrange(ids_key(version), start, start + BATCH_SIZE - 1)
+        yield from hgnc_ids
+        if len(hgnc_ids) < BATCH_SIZE:
+            return
+        start += BATCH_SIZE
+
+
+def iter_genes(version=None):
+    """
+    Yield the genes of one generation as JSON strings in file order, fetched in batches.
+    """
+    batch = []
+    for hgnc_id in iter_gene_ids(version):
+        batch.append(gene_key(hgnc_id, version))
+        if len(batch) == BATCH_SIZE:
+            yield from filter(None, redis_client.mget(batch))
+            batch = []
+    if batch:
+        yield from filter(None, redis_client.mget(batch))
+
+
+def stream_json_array(items):
+    """
+    Stream already serialized JSON values as one JSON array.
+    """
+    yield '['
+    for i, item in enumerate(items):
+        yield item if not i else ',' + item
+    yield ']'
 
 
 @app.route('/data', methods=['POST'])
@@ -23,9 +245,8 @@ def load_data():
     Load HGNC data to Redis database.
     """
     try:
-        hgnc_data = parse_hgnc_data("https://g-a8b222.dd271.03c0.data.globus.org/pub/databases/genenames/hgnc/tsv/hgnc_complete_set.txt")
-        redis_client.set('hgnc_data', json.dumps(hgnc_data))
-        return jsonify({'message': 'Data loaded successfully'}), 200
+        count = store_genes(parse_hgnc_data(os.environ.get('HGNC_SOURCE', HGNC_URL)))
+        return jsonify({'message': 'Data loaded successfully', 'genes': count}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -36,11 +257,11 @@ def get_data():
     Read all data out of Redis and return it as a JSON list.
     """
     try:
-        hgnc_data = redis_client.get('hgnc_data')
-        if hgnc_data:
-            return jsonify(json.loads(hgnc_data)), 200
-        else:
+        version = redis_client.get(DATA_VERSION_KEY)
+        if not redis_client.exists(ids_key(version)):
             return jsonify({'message': 'No data available'}), 404
+        # The genes are streamed in batches instead of being collected first
+        return Response(stream_with_context(stream_json_array(iter_genes(version))), mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -51,7 +272,7 @@ def delete_data():
     Delete all data from Redis.
     """
     try:
-        redis_client.delete('hgnc_data')
+        clear_genes(swap_version(None))
         return jsonify({'message': 'Data deleted successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -63,11 +284,9 @@ def get_gene_ids():
     Return json-formatted list of all hgnc_ids.
     """
     try:
-        hgnc_data = redis_client.get('hgnc_data')
-        if hgnc_data:
-            hgnc_data = json.loads(hgnc_data)
-            gene_ids = [entry['hgnc_id'] for entry in hgnc_data]
-            return jsonify(gene_ids), 200
+        gene_ids = gene_cache.get_ids_json()
+        if gene_ids:
+            return Response(gene_ids, mimetype='application/json'), 200
         else:
             return jsonify({'message': 'No data available'}), 404
     except Exception as e:
@@ -80,12 +299,10 @@ def get_gene_data(hgnc_id):
     Return all data associated with a given <hgnc_id>.
     """
     try:
-        hgnc_data = redis_client.get('hgnc_data')
-        if hgnc_data:
-            hgnc_data = json.loads(hgnc_data)
-            for entry in hgnc_data:
-                if entry['hgnc_id'] == hgnc_id:
-                    return jsonify(entry), 200
+        gene = gene_cache.get_gene_json(hgnc_id)
+        if gene:
+            return Response(gene, mimetype='application/json'), 200
+        elif redis_client.exists(ids_key(redis_client.get(DATA_VERSION_KEY))):
             return jsonify({'message': 'Gene ID not found'}), 404
         else:
             return jsonify({'message': 'No data available'}), 404
@@ -0,0 +1,216 @@
+import gene_api
+import json
+from collections import Counter
+import pytest
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the few Redis commands the API uses.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+        self.executed_batches = []
+        self.reads = Counter()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        self.reads[key] += 1
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def exists(self, key):
+        return int(key in self.values or key in self.sorted_sets)
+
+    def delete(self, *keys):
+        return sum((self.values.pop(key, None) is not None) + (self.sorted_sets.pop(key, None) is not None)
+                   for key in keys)
+
+    def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.sorted_sets.get(key, {}).pop(member, None)
+        if not self.sorted_sets.get(key, True):
+            del self.sorted_sets[key]
+
+    def zrange(self, key, start, end):
+        scores = self.sorted_sets.get(key, {})
+        members = sorted(scores, key=lambda member: (scores[member], member))
+        return members[start:None if end == -1 else end + 1]
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        if self.commands:
+            self.client.executed_batches.append(len(self.commands))
+        results = [getattr(self.client, name)(*args) for name, args in self.commands]
+        self.commands = []
+        return results
+
+
+GENES = [{'hgnc_id': f'HGNC:{i}', 'symbol': f'GENE{i}', 'name': f'gene {i}', 'location': ''}
+         for i in (5, 37133, 24086, 7, 27057)]
+
+
+def write_tsv(path, genes):
+    fields = list(genes[0])
+    lines = ['\t'.join(fields)] + ['\t'.join(gene[field] for field in fields) for gene in genes]
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(gene_api, 'redis_client', FakeRedis())
+    monkeypatch.setattr(gene_api, 'gene_cache', gene_api.GeneCache())
+    monkeypatch.setenv('HGNC_SOURCE', write_tsv(tmp_path / 'hgnc.tsv', GENES))
+    return gene_api.app.test_client()
+
+
+def test_parse_hgnc_data_streams_local_file(tmp_path):
+    rows = gene_api.parse_hgnc_data(write_tsv(tmp_path / 'hgnc.tsv', GENES))
+    assert next(rows) == GENES[0]
+    assert list(rows) == GENES[1:]
+
+
+def test_store_genes_in_pipelined_batches(monkeypatch):
+    monkeypatch.setattr(gene_api, 'redis_client', FakeRedis())
+    assert gene_api.store_genes(iter(GENES + [{'hgnc_id': '', 'symbol': 'none'}]), batch_size=2) == 5
+    # Two commands per gene: batches of two genes, then the last one, then the version swap
+    assert gene_api.redis_client.executed_batches == [4, 4, 2, 2]
+    assert gene_api.redis_client.get(gene_api.DATA_VERSION_KEY) == '1'
+    assert list(gene_api.iter_gene_ids('1')) == [gene['hgnc_id'] for gene in GENES]
+
+
+@pytest.mark.parametrize('rows_before_failure', [0, 3])
+def test_store_genes_keeps_data_when_source_fails(monkeypatch, rows_before_failure):
+    monkeypatch.setattr(gene_api, 'redis_client', FakeRedis())
+    gene_api.store_genes(GENES)
+    stored = dict(gene_api.redis_client.values)
+
+    def failing():
+        yield from [dict(gene, symbol='new') for gene in GENES[:rows_before_failure]]
+        raise OSError('connection reset')
+    with pytest.raises(OSError):
+        gene_api.store_genes(failing(), batch_size=2)
+    # The served genes are untouched and the partial load is removed
+    version = gene_api.redis_client.get(gene_api.DATA_VERSION_KEY)
+    assert list(gene_api.iter_gene_ids(version)) == [gene['hgnc_id'] for gene in GENES]
+    assert {key: value for key, value in gene_api.redis_client.values.items()
+            if key != gene_api.GENERATION_KEY} == {key: value for key, value in stored.items()
+                                                    if key != gene_api.GENERATION_KEY}
+    assert list(gene_api.redis_client.sorted_sets) == [gene_api.ids_key(version)]
+
+
+def test_readers_see_old_genes_until_load_finishes(client, monkeypatch):
+    client.post('/data')
+    seen = []
+
+    def watched():
+        for gene in GENES:
+            # Readers are served the previous load while the new one is streamed
+            seen.append(client.get('/genes').get_json())
+            yield dict(gene, symbol='new')
+    monkeypatch.setattr(gene_api, 'parse_hgnc_data', lambda source: watched())
+    client.post('/data')
+    assert seen == [[gene['hgnc_id'] for gene in GENES]] * len(GENES)
+    assert client.get('/genes/HGNC:5').get_json()['symbol'] == 'new'
+    # Only the served generation is left
+    assert list(gene_api.redis_client.sorted_sets) == [gene_api.ids_key('2')]
+
+
+def test_first_load_replaces_unversioned_layout(monkeypatch):
+    monkeypatch.setattr(gene_api, 'redis_client', FakeRedis())
+    old = gene_api.redis_client
+    old.set('gene:HGNC:1', '{}')
+    old.zadd('genes:ids', {'HGNC:1': 0})
+    old.set(gene_api.LEGACY_DATA_KEY, '[]')
+    # Before any versioned load the earlier layout is still served
+    assert list(gene_api.iter_gene_ids(old.get(gene_api.DATA_VERSION_KEY))) == ['HGNC:1']
+    gene_api.store_genes(GENES)
+    assert set(old.values) == {gene_api.GENERATION_KEY, gene_api.DATA_VERSION_KEY} | {
+        gene_api.gene_key(gene['hgnc_id'], '1') for gene in GENES}
+
+
+def test_unversioned_genes_are_not_served_after_delete(client):
+    old = gene_api.redis_client
+    old.set('gene:HGNC:1', '{"hgnc_id": "HGNC:1"}')
+    old.zadd('genes:ids', {'HGNC:1': 0})
+    for _ in range(2):
+        assert client.get('/genes/HGNC:1').get_json() == {'hgnc_id': 'HGNC:1'}
+        assert client.get('/genes').get_json() == ['HGNC:1']
+    assert client.delete('/data').status_code == 200
+    assert client.get('/genes/HGNC:1').status_code == 404 and client.get('/genes').status_code == 404
+
+
+def test_routes(client):
+    assert client.get('/genes').status_code == 404
+    assert client.get('/genes/HGNC:5').get_json() == {'message': 'No data available'}
+
+    response = client.post('/data')
+    assert response.status_code == 200 and response.get_json()['genes'] == len(GENES)
+    assert client.get('/genes').get_json() == [gene['hgnc_id'] for gene in GENES]
+    assert client.get('/genes/HGNC:24086').get_json() == GENES[2]
+    assert client.get('/genes/HGNC:1').status_code == 404
+    assert json.loads(client.get('/data').data) == GENES
+
+    assert client.delete('/data').status_code == 200
+    assert client.get('/data').status_code == 404
+    assert client.get('/genes').status_code == 404 and client.get('/genes/HGNC:5').status_code == 404
+    assert list(gene_api.redis_client.values) == [gene_api.GENERATION_KEY]
+    assert gene_api.redis_client.sorted_sets == {}
+
+
+def test_gene_cache_reads_through_once_per_version(client, tmp_path, monkeypatch):
+    client.post('/data')
+    reads = gene_api.redis_client.reads
+    reads.clear()
+    for _ in range(3):
+        assert client.get('/genes/HGNC:7').get_json() == GENES[3]
+        assert client.get('/genes').get_json()[0] == 'HGNC:5'
+    assert reads['gene:1:HGNC:7'] == 1 and reads[gene_api.DATA_VERSION_KEY] == 6
+
+    # Reloading swaps in a new version, so every worker drops its cached genes
+    changed = [dict(gene, symbol=gene['symbol'].lower()) for gene in GENES[2:]]
+    monkeypatch.setenv('HGNC_SOURCE', write_tsv(tmp_path / 'changed.tsv', changed))
+    client.post('/data')
+    assert client.get('/genes/HGNC:7').get_json()['symbol'] == 'gene7'
+    assert client.get('/genes').get_json() == [gene['hgnc_id'] for gene in changed]
+    assert reads['gene:2:HGNC:7'] == 1
+
+
+def test_gene_cache_lru_bound(client, monkeypatch):
+    client.post('/data')
+    monkeypatch.setattr(gene_api, 'gene_cache', gene_api.GeneCache(max_size=2))
+    for hgnc_id in ['HGNC:5', 'HGNC:7', 'HGNC:5', 'HGNC:24086']:
+        client.get(f'/genes/{hgnc_id}')
+    # HGNC:7 was the least recently used gene when HGNC:24086 was added
+    assert list(gene_api.gene_cache.genes) == ['HGNC:5', 'HGNC:24086']
+
+
+def test_post_data_reports_unreadable_source(client, monkeypatch):
+    monkeypatch.setenv('HGNC_SOURCE', '/nonexistent/hgnc.tsv')
+    response = client.post('/data')
+    assert response.status_code == 500 and 'error' in response.get_json()
@@ -1,18 +1,211 @@
+import argparse
 import json
+import logging
+import math
+import os
+import re
+import sys
+from array import array
+from json_stream import iter_json_array
 
-def stof( a_list_of_dict, key_string):
-    for item in a_list_of_dict:
-        item[key_string] = float(item[key_string])
-    return a_list_of_dict
+# Fields converted by default, matching the original stof() passes
+DEFAULT_SCHEMA = {'id': 'float', 'mass (g)': 'float', 'reclat': 'float', 'reclong': 'float'}
 
-with open ('Meteorite_Landings.json', 'r') as fin:
-    ml_data = json.load(fin)
+CONVERTERS = {
+    'float': float,
+    'int': int,
+    'str': str,
+}
 
-things_to_change = ['id', 'mass (g)', 'reclat', 'reclong']
-for item in things_to_change:
-    ml_data['meteorite_landings'] = stof( ml_data['meteorite_landings'], item)
+class SchemaConverter:
+    """
+    Applies a per-field type schema to records in one pass. Values that cannot
+    be converted are replaced by None and reported instead of stopping the run.
+    """
 
-with open('Meteorite_Landings_updated.json', 'w') as fout:
-    json.dump(ml_data, fout, indent=2)
+    def __init__(self, schema, max_reports=20):
+        self.schema = {field: CONVERTERS[type_name] for field, type_name in schema.items()}
+        self.max_reports = max_reports
+        self.bad_values = 0
+        self.bad_by_field = {field: 0 for field in schema}
 
+    def convert(self, row_number, item):
+        for field, convert in self.schema.items():
+            value = item.get(field)
+            if value is None:
+                continue
+            try:
+                value = convert(value)
+                if isinstance(value, float) and not math.isfinite(value):
+                    raise ValueError('non-finite value')
+                item[field] = value
+            except (TypeError, ValueError):
+                self.bad_values += 1
+                self.bad_by_field[field] += 1
+                if self.bad_values <= self.max_reports:
+                    logging.warning(f"row {row_number}: cannot convert {field!r} value {value!r} to {convert.__name__}")
+                item[field] = None
+        return item
 
+class JsonWriter:
+    """Writes compact JSON with the records under array_key, one record at a time."""
+
+    def __init__(self, path, array_key='meteorite_landings'):
+        self.f = open(path, 'w', encoding='utf-8')
+        self.f.write('{' + json.dumps(array_key) + ':[')
+        self.first = True
+
+    def write(self, item):
+        if not self.first:
+            self.f.write(',')
+        self.f.write(json.dumps(item, separators=(',', ':'), ensure_ascii=False))
+        self.first = False
+
+    def close(self):
+        self.f.write(']}\n')
+        self.f.close()
+
+class NdjsonWriter:
+    """Writes one compact JSON record per line."""
+
+    def __init__(self, path):
+        self.f = open(path, 'w', encoding='utf-8')
+
+    def write(self, item):
+        self.f.write(json.dumps(item, separators=(',', ':'), ensure_ascii=False))
+        self.f.write('\n')
+
+    def close(self):
+        self.f.close()
+
+class ColumnarWriter:
+    """
+    Writes a directory with one file per field plus a schema.json manifest.
+    Numeric fields are raw little-endian float64 ('.f64', NaN for missing);
+    other fields are one JSON-encoded value per line ('.jsonl'). Columns are
+    buffered in batches, so memory stays flat for any number of rows. The
+    columns are the fields of the schema and the first record; a field first
+    seen in a later record gets its column then, with missing values for the
+    rows before it.
+    """
+
+    def __init__(self, path, schema, batch_size=65536):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.schema = schema
+        self.batch_size = batch_size
+        self.rows = 0
+        self.columns = None
+        self.names = set()
+
+    def _add_column(self, field):
+        numeric = self.schema.get(field) in ('float', 'int')
+        filename = f"{len(self.columns):03d}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', field)}.{'f64' if numeric else 'jsonl'}"
+        mode = 'wb' if numeric else 'w'
+        f = open(os.path.join(self.path, filename), mode, **({} if numeric else {'encoding': 'utf-8'}))
+        # Schema fields get their columns with the first record, so a field
+        # added later is a JSON column; the rows before it do not have it
+        for start in range(0, self.rows, self.batch_size):
+            f.write('null\n' * min(self.batch_size, self.rows - start))
+        self.columns.append({'name': field, 'file': filename, 'numeric': numeric, 'f': f,
+                             'buffer': array('d') if numeric else []})
+        self.names.add(field)
+
+    def write(self, item):
+        if self.columns is None:
+            self.columns = []
+            for field in list(item) + [field for field in self.schema if field not in item]:
+                self._add_column(field)
+        elif not self.names.issuperset(item):
+            for field in item:
+                if field not in self.names:
+                    self._add_column(field)
+        for column in self.columns:
+            value = item.get(column['name'])
+            if column['numeric']:
+                column['buffer'].append(math.nan if value is None else float(value))
+            else:
+                column['buffer'].append(json.dumps(value, ensure_ascii=False))
+        self.rows += 1
+        if self.rows % self.batch_size == 0:
+            self._flush()
+
+    def _flush(self):
+        for column in self.columns or []:
+            if column['numeric']:
+                if sys.byteorder != 'little':
+                    column['buffer'].byteswap()
+                column['buffer'].tofile(column['f'])
+                column['buffer'] = array('d')
+            else:
+                if column['buffer']:
+                    column['f'].write('\n'.join(column['buffer']) + '\n')
+                column['buffer'] = []
+
+    def close(self):
+        self._flush()
+        manifest = {'rows': self.rows, 'columns': []}
+        for column in self.columns or []:
+            column['f'].close()
+            manifest['columns'].append({'name': column['name'], 'file': column['file'],
+                                        'type': 'float64' if column['numeric'] else 'json'})
+        with open(os.path.join(self.path, 'schema.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+# Function to parse '--field name:type' arguments into a schema dictionary
+def parse_schema(field_args, base=None):
+    schema = dict(DEFAULT_SCHEMA if base is None else base)
+    for field_arg in field_args or []:
+        field, _, type_name = field_arg.rpartition(':')
+        if not field or type_name not in CONVERTERS:
+            raise argparse.ArgumentTypeError(f'Invalid field spec {field_arg!r}; use NAME:{"|".join(CONVERTERS)}.')
+        schema[field] = type_name
+    return schema
+
+# Function to convert the input file in one streaming pass
+def convert(input_path, output_path, output_format='json', schema=None, array_key='meteorite_landings', max_reports=20):
+    schema = DEFAULT_SCHEMA if schema is None else schema
+    converter = SchemaConverter(schema, max_reports)
+    if output_format == 'json':
+        writer = JsonWriter(output_path, array_key)
+    elif output_format == 'ndjson':
+        writer = NdjsonWriter(output_path)
+    elif output_format == 'columnar':
+        writer = ColumnarWriter(output_path, schema)
+    else:
+        raise ValueError(f'Unsupported output format {output_format}.')
+
+    rows = 0
+    try:
+        with open(input_path, 'r', encoding='utf-8') as fin:
+            for rows, item in enumerate(iter_json_array(fin, array_key), start=1):
+                writer.write(converter.convert(rows, item))
+    finally:
+        writer.close()
+
+    if converter.bad_values > converter.max_reports:
+        logging.warning(f'{converter.bad_values - converter.max_reports} more bad values not shown.')
+    return {'rows': rows, 'bad_values': converter.bad_values,
+            'bad_values_by_field': {k: v for k, v in converter.bad_by_field.items() if v}}
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert meteorite JSON data to typed JSON, NDJSON or columnar binary output.')
+    parser.add_argument('input', nargs='?', default='Meteorite_Landings.json', help='Input JSON file.')
+    parser.add_argument('output', nargs='?', default='Meteorite_Landings_updated.json',
+                        help='Output file (a directory for --format columnar).')
+    parser.add_argument('--format', choices=('json', 'ndjson', 'columnar'), default='json', help='Output format.')
+    parser.add_argument('--field', action='append', metavar='NAME:TYPE',
+                        help=f'Declare or override the type of a field ({", ".join(CONVERTERS)}). May be repeated.')
+    parser.add_argument('--no-default-schema', action='store_true', help='Only convert the fields given with --field.')
+    parser.add_argument('--array-key', default='meteorite_landings', help='Key of the array holding the records.')
+    parser.add_argument('--max-reports', type=int, default=20, help='Maximum number of bad values reported individually.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    schema = parse_schema(args.field, base={} if args.no_default_schema else None)
+    report = convert(args.input, args.output, args.format, schema, args.array_key, args.max_reports)
+    logging.info(f"Converted {report['rows']} rows with {report['bad_values']} bad values "
+                 f"{report['bad_values_by_field'] or ''}".rstrip())
+
+if __name__ == '__main__':
+    main()
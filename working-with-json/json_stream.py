@@ -0,0 +1,51 @@
+import json
+import re
+
+_DECODER = json.JSONDecoder()
+_SEPARATORS = re.compile(r'[\s,]*')
+
+# Function to yield the items of the array stored under array_key one at a time,
+# reading the file in chunks so memory is bounded by the size of one item
+def iter_json_array(f, array_key='meteorite_landings', chunk_size=65536):
+    marker = f'"{array_key}"'
+    buffer = ''
+    while True:
+        key_pos = buffer.find(marker)
+        if key_pos != -1:
+            bracket_pos = buffer.find('[', key_pos + len(marker))
+            if bracket_pos != -1:
+                buffer = buffer[bracket_pos + 1:]
+                break
+            buffer = buffer[key_pos:]
+        else:
+            buffer = buffer[-len(marker):]
+        chunk = f.read(chunk_size)
+        if not chunk:
+            raise ValueError(f"No '{array_key}' array found in the input.")
+        buffer += chunk
+
+    pos = 0
+    while True:
+        pos = _SEPARATORS.match(buffer, pos).end()
+        if pos == len(buffer):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError('Unexpected end of input inside the array.')
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = _DECODER.raw_decode(buffer, pos)
+            # A number cut off by the end of the buffer (e.g. '4.' of '4.5') continues in the next chunk
+            cut = end == len(buffer) or (type(item) in (int, float) and buffer[end] in '.eE')
+            chunk = f.read(chunk_size) if cut else None
+        except json.JSONDecodeError:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+        if chunk:
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        pos = end
+        yield item
@@ -0,0 +1,101 @@
+from converter import ColumnarWriter, SchemaConverter, convert, parse_schema
+from json_stream import iter_json_array
+from array import array
+import argparse
+import io
+import json
+import math
+import os
+import sys
+import pytest
+
+records = [
+    {'name': 'Aachen', 'id': '1', 'mass (g)': '21', 'reclat': '50.775', 'reclong': '6.08333'},
+    {'name': 'Aarhus', 'id': '2', 'mass (g)': 'unknown', 'reclat': '56.18333', 'reclong': '10.23333',
+     'GeoLocation': '(56.18333, 10.23333)'},
+    {'name': 'Abee', 'id': '6', 'mass (g)': 'nan', 'reclat': '54.21667', 'reclong': '-113'},
+]
+expected = [
+    {'name': 'Aachen', 'id': 1.0, 'mass (g)': 21.0, 'reclat': 50.775, 'reclong': 6.08333},
+    {'name': 'Aarhus', 'id': 2.0, 'mass (g)': None, 'reclat': 56.18333, 'reclong': 10.23333,
+     'GeoLocation': '(56.18333, 10.23333)'},
+    {'name': 'Abee', 'id': 6.0, 'mass (g)': None, 'reclat': 54.21667, 'reclong': -113.0},
+]
+
+def write_input(tmp_path):
+    path = tmp_path / 'ml.json'
+    path.write_text(json.dumps({'meteorite_landings': records}))
+    return str(path)
+
+def read_columns(path):
+    with open(os.path.join(path, 'schema.json')) as f:
+        manifest = json.load(f)
+    columns = {}
+    for column in manifest['columns']:
+        filename = os.path.join(path, column['file'])
+        if column['type'] == 'float64':
+            with open(filename, 'rb') as f:
+                values = array('d', f.read())
+            if sys.byteorder != 'little':
+                values.byteswap()
+            columns[column['name']] = values.tolist()
+        else:
+            with open(filename) as f:
+                columns[column['name']] = [json.loads(line) for line in f]
+    return manifest['rows'], columns
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 65536])
+def test_iter_json_array(chunk_size):
+    text = json.dumps({'meteorite_landings': records + [4.5, None]}, indent=1)
+    assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == records + [4.5, None]
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"other": []}'), chunk_size=chunk_size))
+
+def test_schema_converter_reports_bad_values():
+    converter = SchemaConverter({'mass (g)': 'float', 'id': 'int'})
+    assert converter.convert(1, {'mass (g)': '1e3', 'id': '7'}) == {'mass (g)': 1000.0, 'id': 7}
+    assert converter.convert(2, {'mass (g)': 'inf', 'id': '7.5'}) == {'mass (g)': None, 'id': None}
+    assert converter.convert(3, {'name': 'x'}) == {'name': 'x'}
+    assert converter.bad_values == 2
+    assert converter.bad_by_field == {'mass (g)': 1, 'id': 1}
+
+def test_parse_schema():
+    assert parse_schema(['year:int', 'id:str'])['id'] == 'str'
+    assert parse_schema(['year:int'], base={}) == {'year': 'int'}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_schema(['year:date'])
+
+@pytest.mark.parametrize('output_format', ['json', 'ndjson'])
+def test_convert_json_and_ndjson(tmp_path, output_format):
+    output = tmp_path / 'out'
+    report = convert(write_input(tmp_path), str(output), output_format)
+    assert report == {'rows': 3, 'bad_values': 2, 'bad_values_by_field': {'mass (g)': 2}}
+    if output_format == 'json':
+        assert json.loads(output.read_text()) == {'meteorite_landings': expected}
+    else:
+        assert [json.loads(line) for line in output.read_text().splitlines()] == expected
+
+def test_convert_columnar(tmp_path):
+    output = str(tmp_path / 'columns')
+    convert(write_input(tmp_path), output, 'columnar')
+    rows, columns = read_columns(output)
+    assert rows == 3
+    assert columns['name'] == ['Aachen', 'Aarhus', 'Abee']
+    assert columns['reclong'] == [6.08333, 10.23333, -113.0]
+    assert columns['mass (g)'][0] == 21.0 and all(map(math.isnan, columns['mass (g)'][1:]))
+    # GeoLocation first appears in the second record
+    assert columns['GeoLocation'] == [None, '(56.18333, 10.23333)', None]
+
+def test_columnar_writer_late_fields_across_batches(tmp_path):
+    writer = ColumnarWriter(str(tmp_path), {'mass (g)': 'float', 'year': 'int'}, batch_size=2)
+    for i in range(5):
+        item = {'name': str(i), 'mass (g)': float(i)}
+        if i >= 3:
+            item.update({'year': 1990 + i, 'fall': 'Fell'})
+        writer.write(item)
+    writer.close()
+    rows, columns = read_columns(str(tmp_path))
+    assert rows == 5 and list(columns) == ['name', 'mass (g)', 'year', 'fall']
+    assert columns['mass (g)'] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert all(map(math.isnan, columns['year'][:3])) and columns['year'][3:] == [1993.0, 1994.0]
+    assert columns['fall'] == [None, None, None, 'Fell', 'Fell']